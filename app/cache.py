@@ -0,0 +1,195 @@
+"""
+Caché en memoria (TTL + LRU) con invalidación por tablas
+"""
+# app/cache.py
+# Caché de proceso para datos que cambian poco y se leen en cada petición
+# (catálogo: películas, géneros y salas, ver app/services/catalogo.py; el
+# HTML de los listados web, ver app/templating.py; la tabla de precios de
+# las entradas, ver app/services/precios.py; y el plano de butacas de cada
+# horario, ver app/services/asientos.py).
+#
+#   - Cada entrada caduca a los ttl segundos y, si se llena, se expulsa la
+#     usada hace más tiempo (LRU).
+#   - Cada entrada guarda las tablas de las que depende. Al confirmarse una
+#     transacción que escribe en alguna de ellas, install_invalidation() borra
+#     esas entradas: da igual que la escritura venga de la API, de la web o de
+#     un servicio, todas pasan por una Session.
+#   - Cada worker tiene su propia caché: otro proceso puede servir datos
+#     antiguos como mucho durante ttl segundos.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+
+
+class TTLLRUCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._datos: "OrderedDict[Hashable, tuple[float, frozenset[str], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generacion = 0  # cambia con cada invalidación
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0      # expulsadas por LRU al llenarse
+        self.expirations = 0    # caducadas por TTL
+        self.invalidations = 0  # borradas por una escritura
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is None:
+                self.misses += 1
+                return default
+            caduca, _, valor = entrada
+            if caduca < time.monotonic():
+                del self._datos[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._datos.move_to_end(key)
+            self.hits += 1
+            return valor
+
+    @property
+    def generacion(self) -> int:
+        return self._generacion
+
+    def set(self, key: Hashable, valor: Any, tablas: Iterable[str], generacion: int | None = None) -> None:
+        """
+        Guarda valor. Si se pasa la generacion leída antes de consultar la base
+        de datos y desde entonces ha habido una invalidación, no se guarda:
+        el valor podría ser anterior a esa escritura.
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._datos[key] = (time.monotonic() + self.ttl, frozenset(tablas), valor)
+            self._datos.move_to_end(key)
+            while len(self._datos) > self.max_entries:
+                self._datos.popitem(last=False)
+                self.evictions += 1
+
+    def invalidar(self, *tablas: str) -> int:
+        """Borra las entradas que dependen de alguna de las tablas. Devuelve cuántas."""
+        afectadas = set(tablas)
+        with self._lock:
+            claves = [k for k, (_, deps, _) in self._datos.items() if deps & afectadas]
+            for k in claves:
+                del self._datos[k]
+            self.invalidations += len(claves)
+            self._generacion += 1
+        return len(claves)
+
+    def descartar(self, key: Hashable) -> None:
+        """
+        Borra una entrada tras escribir su dato fuera del ORM. Cambia la
+        generación: una lectura que empezó antes no guarda el valor antiguo.
+        """
+        with self._lock:
+            if self._datos.pop(key, None) is not None:
+                self.invalidations += 1
+            self._generacion += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._datos.clear()
+            self._generacion += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / consultas if consultas else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# caché de catálogo compartida por los routers
+catalogo_cache = TTLLRUCache(
+    max_entries=settings.cache_max_entries,
+    ttl=settings.cache_ttl_seconds,
+)
+
+# HTML renderizado de los listados web (ver render_cacheado en app/templating.py)
+html_cache = TTLLRUCache(
+    max_entries=settings.html_cache_max_entries,
+    ttl=settings.cache_ttl_seconds,
+)
+
+# tabla de precios {horario_id: precio} (ver app/services/precios.py): una sola
+# entrada; con la caché del catálogo desactivada también se desactiva
+precios_cache = TTLLRUCache(
+    max_entries=1 if settings.cache_max_entries > 0 else 0,
+    ttl=settings.cache_ttl_seconds,
+)
+
+# plano de butacas de cada horario {horario_id: Plano} (ver app/services/asientos.py)
+asientos_cache = TTLLRUCache(
+    max_entries=settings.cache_max_entries,
+    ttl=settings.cache_ttl_seconds,
+)
+
+# cachés que se invalidan al confirmar escrituras
+_CACHES: list[TTLLRUCache] = [catalogo_cache, html_cache, precios_cache, asientos_cache]
+
+
+def invalidar(*tablas: str) -> None:
+    for cache in _CACHES:
+        cache.invalidar(*tablas)
+
+
+def _tablas(session: Session) -> set[str]:
+    return session.info.setdefault("tablas_modificadas", set())
+
+
+def install_invalidation() -> None:
+    """
+    Registra los eventos de Session que anotan qué tablas se escriben en cada
+    transacción y las invalidan al hacer commit (se descartan con rollback).
+    Vale también para AsyncSession, que usa una Session por debajo.
+    """
+
+    @event.listens_for(Session, "after_flush")
+    def _after_flush(session, flush_context):
+        tablas = _tablas(session)
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            tabla = getattr(obj, "__tablename__", None)
+            if tabla:
+                tablas.add(tabla)
+
+    @event.listens_for(Session, "do_orm_execute")
+    def _do_orm_execute(orm_execute_state):
+        # insert()/update()/delete() masivos no pasan por el flush
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            tabla = getattr(orm_execute_state.statement, "table", None)
+            if tabla is not None:
+                _tablas(orm_execute_state.session).add(tabla.name)
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        tablas = session.info.pop("tablas_modificadas", None)
+        if tablas:
+            invalidar(*tablas)
+
+    @event.listens_for(Session, "after_rollback")
+    def _after_rollback(session):
+        session.info.pop("tablas_modificadas", None)
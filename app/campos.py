@@ -0,0 +1,106 @@
+"""
+Selección de campos (?fields= / ?exclude=) en las respuestas de la API
+"""
+# app/campos.py
+# VentaResponse lleva dentro el horario y su sala, HorarioResponse la sala y
+# PeliculaResponse el género. Un cliente que sólo necesita ids y totales puede
+# pedir ?fields=id,precio_total (o ?exclude=horario) y:
+#   - el router usa la consulta sin joinedload si no hace falta la relación
+#   - la respuesta se serializa con un modelo reducido que sólo lee esos campos
+#     (nunca toca la relación, así que tampoco hay lazy loading)
+#
+# Sólo se eligen campos de primer nivel. Sin fields ni exclude la respuesta es
+# la de siempre (response_model completo).
+#
+# Uso en un router:
+#   _CAMPOS = campos(VentaResponse)
+#   def find_all(..., sel: Campos = Depends(_CAMPOS), db = ...):
+#       stmt = queries.ventas_pagina(...) if sel.incluye("horario") else queries.pagina(Venta, ...)
+#       return sel.responder(filas)
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+def _separar(valor: str | None) -> list[str]:
+    return [campo.strip() for campo in valor.split(",") if campo.strip()] if valor else []
+
+
+@lru_cache(maxsize=256)
+def _modelo_parcial(esquema: type[BaseModel], seleccion: tuple[str, ...]) -> type[BaseModel]:
+    # mismo tipo y misma definición de cada campo que en el esquema completo
+    definiciones: dict[str, Any] = {
+        nombre: (esquema.model_fields[nombre].annotation, esquema.model_fields[nombre])
+        for nombre in seleccion
+    }
+    return create_model(
+        f"{esquema.__name__}Parcial",
+        __config__=ConfigDict(from_attributes=True),
+        **definiciones,
+    )
+
+
+@lru_cache(maxsize=256)
+def _adaptador_lista(modelo: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[modelo])
+
+
+@dataclass(frozen=True)
+class Campos:
+    esquema: type[BaseModel]
+    seleccion: tuple[str, ...] | None  # None: todos los campos
+    response: Response
+
+    def incluye(self, campo: str) -> bool:
+        return self.seleccion is None or campo in self.seleccion
+
+    def responder(self, datos):
+        """
+        Sin selección devuelve datos tal cual (los serializa el response_model).
+        Con selección devuelve ya el JSON con sólo esos campos, con las
+        cabeceras que hayan puesto las dependencias (ETag, paginación).
+        """
+        if self.seleccion is None:
+            return datos
+        modelo = _modelo_parcial(self.esquema, self.seleccion)
+        if isinstance(datos, list):
+            adaptador = _adaptador_lista(modelo)
+            cuerpo = adaptador.dump_json(adaptador.validate_python(datos, from_attributes=True))
+        else:
+            cuerpo = modelo.model_validate(datos).model_dump_json().encode()
+        return Response(content=cuerpo, media_type="application/json", headers=dict(self.response.headers))
+
+
+def campos(esquema: type[BaseModel]):
+    """
+    Dependencia que lee fields y exclude (nombres de campo de esquema separados
+    por comas). Un nombre desconocido o una selección vacía dan 400.
+    """
+    todos = tuple(esquema.model_fields)
+
+    def dependencia(
+        response: Response,
+        fields: str | None = Query(None, description=f"Campos a devolver, separados por comas: {','.join(todos)}"),
+        exclude: str | None = Query(None, description="Campos a quitar de la respuesta, separados por comas"),
+    ) -> Campos:
+        pedidos, excluidos = _separar(fields), _separar(exclude)
+        desconocidos = [campo for campo in pedidos + excluidos if campo not in esquema.model_fields]
+        if desconocidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Campos desconocidos: {', '.join(desconocidos)}. Disponibles: {', '.join(todos)}",
+            )
+
+        seleccion = tuple(
+            campo for campo in todos
+            if (not pedidos or campo in pedidos) and campo not in excluidos
+        )
+        if not seleccion:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="La selección de campos está vacía")
+        return Campos(esquema, None if seleccion == todos else seleccion, response)
+
+    return dependencia
@@ -1,13 +1,92 @@
 ﻿"Configuración de la base de datos"
-from sqlalchemy import create_engine, select
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from app.cache import install_invalidation
+from app.lazy_session import LazySession, install_usage_events
+from app.settings import Settings, SQLitePragmas, settings
+
+# sqlalchemy.ext.asyncio tarda en importarse: sólo se carga si se usa la pila async
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# métodos HTTP que no modifican datos: se atienden con conexiones de sólo lectura
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _install_sqlite_pragmas(engine: Engine, pragmas: SQLitePragmas, read_only: bool = False) -> None:
+    """
+    Registra un hook 'connect' que aplica los PRAGMAs a cada conexión nueva del pool.
+    """
+    statements = pragmas.as_statements(read_only=read_only)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def _is_memory_url(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+
+def read_only_url(url: str) -> str | None:
+    """
+    Convierte la URL de un fichero SQLite en su versión URI de sólo lectura
+    (file:ruta?mode=ro&uri=true). Devuelve None si no aplica (memoria u otro motor).
+    """
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("sqlite") or _is_memory_url(url):
+        return None
+    if parsed.database.startswith("file:"):
+        database = parsed.database
+    else:
+        database = f"file:{parsed.database}"
+    query = {**parsed.query, "mode": "ro", "uri": "true"}
+    return parsed.set(database=database, query=query).render_as_string(hide_password=False)
+
+
+def create_db_engine(config: Settings, read_only: bool = False) -> Engine:
+    """
+    Crea el motor de conexión según el perfil de configuración (dev/test/prod).
+    Con read_only=True abre el mismo fichero en modo sólo lectura para las consultas.
+    """
+    url = read_only_url(config.database_url) if read_only else config.database_url
+    if url is None:
+        raise ValueError(f"No se puede abrir en sólo lectura: {config.database_url}")
+
+    is_sqlite = url.startswith("sqlite")
+    options = {"echo": config.echo}  # echo True para mostrar SQL solo en desarrollo
+
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}  # Puedes utilizar la conexión desde varios hilos
+    if not (is_sqlite and _is_memory_url(url)):
+        options["pool_size"] = config.read_pool_size if read_only else config.pool_size
+        options["max_overflow"] = config.max_overflow
+
+    new_engine = create_engine(url, **options)
+
+    if is_sqlite and config.pragmas is not None:
+        _install_sqlite_pragmas(new_engine, config.pragmas, read_only=read_only)
+    return new_engine
+
+
+def _read_routing_enabled(config: Settings) -> bool:
+    return config.read_routing and read_only_url(config.database_url) is not None
+
 
-# Configuración Base de datos para Ventas
 # Motor de conexión a BBDD
-engine  = create_engine('sqlite:///cartelera.db', 
-          echo=True, # echo True para mostrar SQL solo en desarrollo
-          connect_args={"check_same_thread": False}  # Puedes utilizar la conexión desde varios hilos
-          )
+engine = create_db_engine(settings)
 
 # Creamos la fábrica de sesiones de base de datos
 SessionLocal = sessionmaker(bind= engine, # Esto conecta las sesiones al motor de la conexión
@@ -16,6 +95,85 @@ SessionLocal = sessionmaker(bind= engine, # Esto conecta las sesiones al motor d
                expire_on_commit= False  # Sirve para que podamos seguir accediendo a los objetos después del commit
                )
 
+# Motor y sesiones de sólo lectura: con WAL los lectores no compiten con el escritor.
+# Si la base de datos está en memoria (o no es SQLite) las lecturas usan el motor normal.
+if _read_routing_enabled(settings):
+    read_engine = create_db_engine(settings, read_only=True)
+    ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, expire_on_commit=False)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+# contadores de espera y retención de conexiones por petición
+install_usage_events(SessionLocal)
+if ReadSessionLocal is not SessionLocal:
+    install_usage_events(ReadSessionLocal)
+
+# los commits que escriben en una tabla invalidan la caché del catálogo
+install_invalidation()
+
+# Motor asíncrono (aiosqlite) para los routers de app/routers/api_async.
+# Se crea bajo demanda: con CARTELERA_API_STACK=sync no hace falta tener aiosqlite instalado.
+_async_engine: AsyncEngine | None = None
+_async_read_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+_async_read_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def create_async_db_engine(config: Settings, read_only: bool = False) -> AsyncEngine:
+    """
+    Versión asíncrona de create_db_engine (mismo echo, pool y PRAGMAs).
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = config.get_async_database_url()
+    if read_only:
+        url = read_only_url(url)
+        if url is None:
+            raise ValueError(f"No se puede abrir en sólo lectura: {config.get_async_database_url()}")
+    options = {"echo": config.echo}
+
+    if not (url.startswith("sqlite") and _is_memory_url(url)):
+        options["pool_size"] = config.read_pool_size if read_only else config.pool_size
+        options["max_overflow"] = config.max_overflow
+
+    new_engine = create_async_engine(url, **options)
+
+    # los eventos de conexión se registran sobre el motor síncrono interno
+    if url.startswith("sqlite") and config.pragmas is not None:
+        _install_sqlite_pragmas(new_engine.sync_engine, config.pragmas, read_only=read_only)
+    return new_engine
+
+
+def get_async_session_factory(read_only: bool = False) -> async_sessionmaker[AsyncSession]:
+    global _async_engine, _async_read_engine, _async_session_factory, _async_read_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_engine = create_async_db_engine(settings)
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine,
+            autoflush=True,
+            expire_on_commit=False,  # igual que SessionLocal: los objetos siguen accesibles tras el commit
+        )
+        if _read_routing_enabled(settings):
+            _async_read_engine = create_async_db_engine(settings, read_only=True)
+            _async_read_session_factory = async_sessionmaker(
+                bind=_async_read_engine, autoflush=False, expire_on_commit=False
+            )
+        else:
+            _async_read_session_factory = _async_session_factory
+    return _async_read_session_factory if read_only else _async_session_factory
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_read_engine, _async_session_factory, _async_read_session_factory
+    for async_engine in (_async_engine, _async_read_engine):
+        if async_engine is not None:
+            await async_engine.dispose()
+    _async_engine = _async_read_engine = None
+    _async_session_factory = _async_read_session_factory = None
+
 # MODELO BASE DE DATOS (sqlalchemy)
 
 #Crear clase Base para los modelos SQLAlchemy
@@ -24,92 +182,94 @@ class Base(DeclarativeBase):
 
 # DEPENDENCIA DE FASTAPI
 
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    # las rutas GET/HEAD reciben una sesión de sólo lectura; el resto, la de escritura
+    factory = ReadSessionLocal if request.method in READ_METHODS else SessionLocal
+    # la sesión real y su conexión sólo se crean si el endpoint la usa (app/lazy_session.py)
+    db = LazySession(factory)
+    request.state.db = db # SessionReleaseMiddleware la cierra en cuanto hay respuesta
     try:
         yield db # entrega la sesión al endpoint
     finally:
         db.close()
 
+async def get_async_db(request: Request):
+    factory = get_async_session_factory(read_only=request.method in READ_METHODS)
+    async with factory() as db:
+        yield db # entrega la sesión asíncrona al endpoint
+
 def init_db():
     """
     Inicializa la base de datos con nuestras entidades por defecto si está vacía.
     Sólo crea las cosas si no existen ya en la base de datos.
+
+    Las tablas ya no se crean aquí: sólo se comprueba la versión del esquema
+    (app/migrations). Para migrar: python -m app.migrations upgrade
+    Se llama desde el lifespan de app/main.py, no al importar la aplicación.
     """
     
+    from app import queries
+    from app.migrations import comprobar_esquema
     from app.models import Pelicula, SalaORM, Horario, Genre, Venta, MetodoPago
     
-    #crear todas las tablas
-    Base.metadata.create_all(engine)
+    #comprobar la versión del esquema (en dev/test aplica las migraciones pendientes)
+    comprobar_esquema(engine, auto_migrate=settings.auto_migrate)
     
     db = SessionLocal()
     try:
-        existing_peliculas = db.execute(select(Pelicula)).scalars().all()
-        
-        
-        if existing_peliculas:
+        # EXISTS se detiene en la primera fila: no carga la tabla entera
+        if db.scalar(queries.hay_peliculas()):
             return
         
+        # géneros primero: las películas los referencian
+        default_genres = [
+            {"id": 1, "name_genre": "Acción"},
+            {"id": 2, "name_genre": "Comedia"},
+            {"id": 3, "name_genre": "Drama"},
+            {"id": 4, "name_genre": "Terror"},
+            {"id": 5, "name_genre": "Anime"},
+            {"id": 6, "name_genre": "Animación"},
+            {"id": 7, "name_genre": "Comedia Negra"},
+        ]
         
-        default_peliculas= [
-            Pelicula(titulo="Dragon ball Super Broly", genero_id=1, duracion=120, disponible=True, imagen="https://m.media-amazon.com/images/I/81vIg0jh3EL._AC_UF1000,1000_QL80_.jpg"),
-            Pelicula(titulo="Agarralo como puedas", genero_id=2, duracion=90, disponible=True, imagen="https://m.media-amazon.com/images/M/MV5BNzI0MjNmZTgtNTAxZC00NzdmLWEwYTItOGMzMWE5MmFkOGIwXkEyXkFqcGc@._V1_.jpg"),
-            Pelicula(titulo="Regreso al Futuro", genero_id=1, duracion=116, disponible=True, imagen="https://pics.filmaffinity.com/Regreso_al_futuro-100822308-large.jpg"),
-            Pelicula(titulo="Frankestein", genero_id=3, duracion=135, disponible=True, imagen="https://m.media-amazon.com/images/M/MV5BYzYzNDYxMTQtMTU4OS00MTdlLThhMTQtZjI4NGJmMTZmNmRiXkEyXkFqcGc@._V1_.jpg"),
+        default_peliculas = [
+            {"titulo": "Dragon ball Super Broly", "genero_id": 1, "duracion": 120, "disponible": True, "imagen": "https://m.media-amazon.com/images/I/81vIg0jh3EL._AC_UF1000,1000_QL80_.jpg"},
+            {"titulo": "Agarralo como puedas", "genero_id": 2, "duracion": 90, "disponible": True, "imagen": "https://m.media-amazon.com/images/M/MV5BNzI0MjNmZTgtNTAxZC00NzdmLWEwYTItOGMzMWE5MmFkOGIwXkEyXkFqcGc@._V1_.jpg"},
+            {"titulo": "Regreso al Futuro", "genero_id": 1, "duracion": 116, "disponible": True, "imagen": "https://pics.filmaffinity.com/Regreso_al_futuro-100822308-large.jpg"},
+            {"titulo": "Frankestein", "genero_id": 3, "duracion": 135, "disponible": True, "imagen": "https://m.media-amazon.com/images/M/MV5BYzYzNDYxMTQtMTU4OS00MTdlLThhMTQtZjI4NGJmMTZmNmRiXkEyXkFqcGc@._V1_.jpg"},
         ]
-        db.add_all(default_peliculas)
-        db.commit() 
-    
         
-    
-    
+        # filas x butacas_por_fila = capacidad (plano de butacas, app/services/asientos.py)
         default_salas = [
-            SalaORM(nombre="Sala1",capacidad=20,tipo="2d",precio=8.90),
-            SalaORM(nombre="Sala2",capacidad=40,tipo="IMAX",precio=11.90),
-            SalaORM(nombre="Sala3",capacidad=25,tipo="3D",precio=9.00),
-            SalaORM(nombre="Sala4",capacidad=20,tipo="2d",precio=8.90),
+            {"nombre": "Sala1", "capacidad": 20, "tipo": "2d", "precio": 8.90, "filas": 4, "butacas_por_fila": 5},
+            {"nombre": "Sala2", "capacidad": 40, "tipo": "IMAX", "precio": 11.90, "filas": 5, "butacas_por_fila": 8},
+            {"nombre": "Sala3", "capacidad": 25, "tipo": "3D", "precio": 9.00, "filas": 5, "butacas_por_fila": 5},
+            {"nombre": "Sala4", "capacidad": 20, "tipo": "2d", "precio": 8.90, "filas": 4, "butacas_por_fila": 5},
         ]
-        db.add_all(default_salas)
-        db.commit() 
-    
-    
+        
+        # vendidas: las butacas de default_ventas (aforo, app/services/aforo.py)
         default_horarios = [
-         Horario(pelicula_id=1, sala_id=1, hora = "22:00", disponible=True ),
-         Horario(pelicula_id=2, sala_id=2, hora = "16:00", disponible=False ),
-         Horario(pelicula_id=3, sala_id=3, hora = "18:30", disponible=True ),
-         Horario(pelicula_id=4, sala_id=4, hora = "19:50", disponible=False ),
+            {"pelicula_id": 1, "sala_id": 1, "hora": "22:00", "disponible": True, "vendidas": 2},
+            {"pelicula_id": 2, "sala_id": 2, "hora": "16:00", "disponible": False, "vendidas": 5},
+            {"pelicula_id": 3, "sala_id": 3, "hora": "18:30", "disponible": True, "vendidas": 4},
+            {"pelicula_id": 4, "sala_id": 4, "hora": "19:50", "disponible": False, "vendidas": 0},
         ]
-        db.add_all(default_horarios)
-        db.commit() 
-    
-    
-    
-        default_genres = [
-            Genre(id=1, name_genre="Acción"),
-            Genre(id=2, name_genre="Comedia"),
-            Genre(id=3, name_genre="Drama"),
-            Genre(id=4, name_genre="Terror"),
-            Genre(id=5, name_genre="Anime"),
-            Genre(id=6, name_genre="Animación"),
-            Genre(id=7, name_genre="Comedia Negra")
-]
-        
-        
-    
-        db.add_all(default_genres)
-        db.commit()
-        
         
         default_ventas = [
-            Venta(horario_id=1, precio_total=20.60,cantidad=2, metodo_pago=MetodoPago.EFECTIVO),
-            Venta(horario_id=2, precio_total=30.60,cantidad=5, metodo_pago=MetodoPago.TARJETA),
-            Venta(horario_id=3, precio_total=40.60,cantidad=4, metodo_pago=MetodoPago.EFECTIVO)           
+            {"horario_id": 1, "precio_total": 20.60, "cantidad": 2, "metodo_pago": MetodoPago.EFECTIVO},
+            {"horario_id": 2, "precio_total": 30.60, "cantidad": 5, "metodo_pago": MetodoPago.TARJETA},
+            {"horario_id": 3, "precio_total": 40.60, "cantidad": 4, "metodo_pago": MetodoPago.EFECTIVO},
         ]
         
-        db.add_all(default_ventas)
+        # un INSERT por tabla (executemany) y un único commit para toda la semilla
+        for model, rows in (
+            (Genre, default_genres),
+            (Pelicula, default_peliculas),
+            (SalaORM, default_salas),
+            (Horario, default_horarios),
+            (Venta, default_ventas),
+        ):
+            db.execute(insert(model), rows)
         db.commit()
     finally:
          db.close()
-
-
-
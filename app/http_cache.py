@@ -0,0 +1,105 @@
+"""
+GET condicionales (ETag / Last-Modified) a partir de las versiones por tabla
+"""
+# app/http_cache.py
+# Los kioscos y la web consultan los listados cada pocos segundos. Con estas
+# dependencias cada GET de la API lleva ETag y Last-Modified, y si el cliente
+# manda If-None-Match / If-Modified-Since y nada ha cambiado se responde 304
+# antes de ejecutar el endpoint: ni consulta ORM ni serialización Pydantic.
+#
+# Las versiones salen de tabla_versiones (migración v0004), que los triggers de
+# SQLite actualizan con cada escritura. Comprobarlas cuesta una lectura de una
+# tabla de pocas filas con la misma sesión que usará después el endpoint. Las
+# versiones leídas se quedan en la sesión: las claves de catalogo_cache las
+# llevan (app/services/catalogo.py) y así no se vuelven a leer.
+#
+# Uso en un router:
+#   _CONDICIONAL = Depends(condicional("peliculas", "genres"))
+#   @router.get("", response_model=..., dependencies=[_CONDICIONAL])
+#
+# El ETag es fuerte: depende de la ruta, la query string y la versión de cada
+# tabla de la que sale la respuesta. Last-Modified tiene resolución de segundos;
+# si llegan los dos validadores manda If-None-Match (RFC 9110), así que dos
+# escrituras en el mismo segundo no dejan datos viejos en los navegadores.
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.database import get_async_db, get_db
+from app.services.catalogo import recordar_versiones
+
+
+def _validadores(request: Request, filas, tablas: tuple[str, ...]) -> tuple[str, int]:
+    versiones = {tabla: (version, modificado) for tabla, version, modificado in filas}
+    clave = [request.url.path, request.url.query]
+    modificado = 0
+    for tabla in tablas:
+        version, cambio = versiones.get(tabla, (0, 0))
+        clave.append(f"{tabla}:{version}")
+        modificado = max(modificado, cambio)
+    digest = hashlib.blake2s("|".join(clave).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"', modificado
+
+
+def _no_modificado(request: Request, etag: str, modificado: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # comparación débil, como pide la RFC para If-None-Match
+        etiquetas = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+        return etag in etiquetas
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return modificado <= desde
+    return False
+
+
+def _comprobar(request: Request, response: Response, filas, tablas: tuple[str, ...]) -> None:
+    etag, modificado = _validadores(request, filas, tablas)
+    cabeceras = {
+        "ETag": etag,
+        "Last-Modified": formatdate(modificado, usegmt=True),
+        # el cliente puede guardar la respuesta pero debe revalidarla siempre
+        "Cache-Control": "no-cache",
+    }
+    if _no_modificado(request, etag, modificado):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+    response.headers.update(cabeceras)
+
+
+def condicional(*tablas: str):
+    """
+    Dependencia para GET de la API síncrona. tablas son todas las tablas de las
+    que sale la respuesta (p. ej. peliculas y genres para PeliculaResponse).
+    """
+
+    def dependencia(request: Request, response: Response, db: Session = Depends(get_db)) -> None:
+        filas = db.execute(queries.versiones_tablas()).all()
+        recordar_versiones(db, filas)
+        _comprobar(request, response, filas, tablas)
+
+    return dependencia
+
+
+def condicional_async(*tablas: str):
+    """
+    Igual que condicional() para la API asíncrona (AsyncSession).
+    """
+
+    # db sin anotar: AsyncSession sólo se importa con CARTELERA_API_STACK=async
+    async def dependencia(request: Request, response: Response, db=Depends(get_async_db)) -> None:
+        filas = (await db.execute(queries.versiones_tablas())).all()
+        recordar_versiones(db, filas)
+        _comprobar(request, response, filas, tablas)
+
+    return dependencia
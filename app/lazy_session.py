@@ -0,0 +1,193 @@
+"""
+Sesiones perezosas por petición y contadores de uso del pool
+"""
+# app/lazy_session.py
+# get_db entrega un LazySession en lugar de una Session:
+#   - la Session real (y la conexión del pool) sólo se crea cuando el endpoint
+#     la usa por primera vez; /genres/new o /salas/new no tocan el pool.
+#   - release() termina la transacción y devuelve la conexión antes de
+#     renderizar la plantilla (los objetos cargados siguen accesibles porque
+#     las sesiones usan expire_on_commit=False).
+#   - SessionReleaseMiddleware cierra la sesión en cuanto la respuesta empieza
+#     a enviarse, sin esperar al cierre de la dependencia (que FastAPI ejecuta
+#     después de mandar el cuerpo), y añade la cabecera Server-Timing.
+#
+# Cada petición acumula en SessionUsage cuánto esperó por una conexión del
+# pool (checkout) y cuánto tiempo la tuvo retenida; ESTADISTICAS_SESIONES
+# agrega esos valores para GET /api/estadisticas.
+
+import threading
+import time
+from dataclasses import dataclass
+
+from anyio.to_thread import run_sync
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+
+@dataclass
+class SessionUsage:
+    checkouts: int = 0          # transacciones que han necesitado una conexión
+    checkout_wait_ms: float = 0.0
+    hold_ms: float = 0.0
+
+    def server_timing(self) -> str:
+        return (
+            f'db-wait;dur={self.checkout_wait_ms:.2f};desc="espera pool ({self.checkouts})", '
+            f'db-hold;dur={self.hold_ms:.2f};desc="conexion retenida"'
+        )
+
+
+class LazySession:
+    """
+    Proxy de Session que la crea en el primer uso. Se usa igual que una
+    Session (db.execute, db.add, db.commit...).
+    """
+
+    def __init__(self, factory: sessionmaker):
+        self._factory = factory
+        self._session: Session | None = None
+        self.used = False  # se llegó a crear la Session real
+        self.usage = SessionUsage()
+        self._requested_at: float | None = None  # primer uso sin conexión
+        self._held_since: float | None = None    # conexión obtenida
+
+    def _get(self) -> Session:
+        if self._session is None:
+            self._session = self._factory(info={"lazy_session": self})
+            self.used = True
+        if self._held_since is None:
+            # la próxima operación puede pedir una conexión al pool: after_begin mide la espera
+            self._requested_at = time.perf_counter()
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def release(self) -> None:
+        """
+        Confirma la transacción en curso y devuelve la conexión al pool sin
+        cerrar la sesión. Pensado para rutas de lectura, justo antes de renderizar.
+        """
+        if self._session is not None and self._session.in_transaction():
+            self._session.commit()
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    # --- eventos de la Session real (ver install_usage_events) ---
+
+    def _on_begin(self) -> None:
+        ahora = time.perf_counter()
+        self.usage.checkouts += 1
+        if self._requested_at is not None:
+            self.usage.checkout_wait_ms += (ahora - self._requested_at) * 1000
+            self._requested_at = None
+        self._held_since = ahora
+
+    def _on_end(self) -> None:
+        if self._held_since is not None:
+            self.usage.hold_ms += (time.perf_counter() - self._held_since) * 1000
+            self._held_since = None
+
+
+def install_usage_events(factory: sessionmaker) -> None:
+    """
+    Registra en la fábrica los eventos que alimentan SessionUsage. Las sesiones
+    que no vienen de un LazySession (p. ej. el escritor de ventas) se ignoran.
+    """
+
+    @event.listens_for(factory, "after_begin")
+    def _after_begin(session, transaction, connection):
+        lazy = session.info.get("lazy_session")
+        if lazy is not None:
+            lazy._on_begin()
+
+    @event.listens_for(factory, "after_transaction_end")
+    def _after_transaction_end(session, transaction):
+        lazy = session.info.get("lazy_session")
+        if lazy is not None and transaction.parent is None:
+            lazy._on_end()
+
+
+class SessionStats:
+    """
+    Totales de uso de sesiones de todas las peticiones (thread-safe).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.unused = 0
+            self.checkouts = 0
+            self.checkout_wait_ms = 0.0
+            self.max_checkout_wait_ms = 0.0
+            self.hold_ms = 0.0
+            self.max_hold_ms = 0.0
+
+    def record(self, lazy: LazySession) -> None:
+        usage = lazy.usage
+        with self._lock:
+            self.requests += 1
+            if not lazy.used:
+                self.unused += 1
+            self.checkouts += usage.checkouts
+            self.checkout_wait_ms += usage.checkout_wait_ms
+            self.max_checkout_wait_ms = max(self.max_checkout_wait_ms, usage.checkout_wait_ms)
+            self.hold_ms += usage.hold_ms
+            self.max_hold_ms = max(self.max_hold_ms, usage.hold_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            usadas = self.requests - self.unused
+            return {
+                "peticiones": self.requests,
+                "sin_sesion": self.unused,
+                "checkouts": self.checkouts,
+                "espera_media_ms": self.checkout_wait_ms / usadas if usadas else 0.0,
+                "espera_max_ms": self.max_checkout_wait_ms,
+                "retencion_media_ms": self.hold_ms / usadas if usadas else 0.0,
+                "retencion_max_ms": self.max_hold_ms,
+            }
+
+
+ESTADISTICAS_SESIONES = SessionStats()
+
+
+class SessionReleaseMiddleware:
+    """
+    Middleware ASGI: cuando el endpoint ya ha generado la respuesta (llega
+    http.response.start) cierra el LazySession de la petición, registra sus
+    contadores y añade Server-Timing a la respuesta.
+
+    Las respuestas en streaming no deben usar la sesión de get_db: se cierra
+    antes de enviar el cuerpo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                lazy = scope.get("state", {}).get("db")
+                if lazy is not None:
+                    if lazy.used:
+                        await run_sync(lazy.close)
+                    ESTADISTICAS_SESIONES.record(lazy)
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", lazy.usage.server_timing().encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,66 @@
+"""
+Altas en lote (POST /api/<recurso>/batch)
+"""
+# app/lotes.py
+# Las taquillas y el planificador de sesiones crean decenas de horarios o ventas
+# de golpe. Los endpoints /batch reciben la lista entera y:
+#   1. Pydantic valida todos los elementos (si uno falla, 422 y no se crea nada)
+#   2. se comprueba con una consulta por tabla que existen las filas referenciadas
+#      (SQLite no aplica las claves foráneas: PRAGMA foreign_keys está apagado)
+#   3. un único INSERT ... RETURNING id con todas las filas y un único commit
+#   4. una sola consulta recarga las filas creadas con sus relaciones
+#
+# Uso en un router:
+#   errores = referencias_inexistentes(dtos, "sala_id", existentes, "la sala")
+#   comprobar_referencias(errores)
+#   ids = db.execute(insertar_lote(Horario), filas).scalars().all()
+#   return en_orden(ids, db.execute(queries.horarios_por_ids(ids)).scalars().unique())
+
+from typing import Iterable, Sequence
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import insert
+from sqlalchemy.sql.dml import ReturningInsert
+
+# elementos por petición
+LOTE_MAXIMO = 1000
+
+
+def insertar_lote(modelo) -> ReturningInsert:
+    # executemany con RETURNING: SQLAlchemy lo agrupa en INSERT de varias filas
+    # (insertmanyvalues) y devuelve los ids en el orden de los parámetros
+    return insert(modelo).returning(modelo.id, sort_by_parameter_order=True)
+
+
+def referencias_inexistentes(
+    dtos: Sequence[BaseModel], campo: str, existentes: Iterable[int], nombre: str
+) -> list[dict]:
+    """
+    Errores (con el formato de validación de FastAPI) de los elementos cuyo
+    campo apunta a un id que no está en existentes.
+    """
+    existentes = set(existentes)
+    return [
+        {
+            "type": "value_error",
+            "loc": ["body", i, campo],
+            "msg": f"No existe {nombre} con id {getattr(dto, campo)}",
+            "input": getattr(dto, campo),
+        }
+        for i, dto in enumerate(dtos)
+        if getattr(dto, campo) not in existentes
+    ]
+
+
+def comprobar_referencias(errores: list[dict]) -> None:
+    if errores:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errores)
+
+
+def en_orden(ids: Sequence[int], filas: Iterable) -> list:
+    """
+    Las filas recargadas en el orden de ids (el de la petición).
+    """
+    por_id = {fila.id: fila for fila in filas}
+    return [por_id[id] for id in ids]
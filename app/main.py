@@ -7,25 +7,86 @@ Configuración de la aplicación FastAPI
 # Punto de entrada principal de la aplicación FastAPI.
 # Contiene solo:
 #  - Instancia de la app
-#  - Inicialización de base de datos
+#  - Inicialización de base de datos (en el lifespan, no al importar)
 #  - Montaje de estáticos
+#  - Middleware que libera la sesión de base de datos de cada petición
 #  - Manejador global de errores
 #  - Inclusión de routers
 #  - Endpoint raíz que delega la lógica de Películas a utils_pelicula.py
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from app.database import init_db
-from app.routers.api import router as api_router
+from sqlalchemy.exc import IntegrityError
+from app.database import ReadSessionLocal, dispose_async_engine, init_db
+from app.lazy_session import SessionReleaseMiddleware
+from app.services import precios, reservas
+from app.services.venta_writer import venta_write_queue
+from app.settings import settings
 from app.routers.web import router as web_router
 
-# crea la instancia de la aplicacion FastAPI
-app = FastAPI(title="Claquet APP", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # arranque: comprobar el esquema y sembrar los datos por defecto si hace falta
+    init_db()
+    # tabla de precios en memoria antes de la primera venta (app/services/precios.py)
+    with ReadSessionLocal() as db:
+        precios.precargar(db)
+    # caducidad de las reservas que ya hay (app/services/reservas.py)
+    reservas.caducidad.cargar()
+    yield
+    # parada: vaciar la cola de ventas, parar la caducidad de reservas y
+    # cerrar las conexiones asíncronas
+    venta_write_queue.stop()
+    reservas.caducidad.stop()
+    await dispose_async_engine()
+
+
+# título de película repetido (índice único de titulo_normalizado, migración v0006): 409
+# el resto de errores de integridad se registran y devuelven un 500 en JSON
+async def integrity_error_handler(request: Request, exc: IntegrityError):
+    if "peliculas.titulo_normalizado" in str(exc.orig):
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": "Ya existe una película con ese título"},
+        )
+    logger.error("Error de integridad en %s %s", request.method, request.url.path, exc_info=exc)
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": "Error de integridad en la base de datos"},
+    )
+
+
+def crear_app(api_stack: str = settings.api_stack) -> FastAPI:
+    """
+    Aplicación con la pila de la API indicada: síncrona (threadpool + Session)
+    o asíncrona (AsyncSession + aiosqlite). Los tests montan las dos.
+    """
+    if api_stack == "async":
+        from app.routers.api_async import router as api_router
+    else:
+        from app.routers.api import router as api_router
+
+    # crea la instancia de la aplicacion FastAPI
+    app = FastAPI(title="Claquet APP", version="1.0.0", lifespan=lifespan)
+
+    app.mount("/static",StaticFiles(directory="app/static"), name="static")
+
+    # cierra la sesión de cada petición en cuanto hay respuesta y añade Server-Timing
+    app.add_middleware(SessionReleaseMiddleware)
+
+    app.add_exception_handler(IntegrityError, integrity_error_handler)
+
+    #registra los routers
+    app.include_router(api_router)
+    app.include_router(web_router)
+    return app
 
-app.mount("/static",StaticFiles(directory="app/static"), name="static")
 
-# inicializa la base de datos
-init_db()
-#registra los routers
-app.include_router(api_router)
-app.include_router(web_router)
\ No newline at end of file
+app = crear_app()
@@ -0,0 +1,97 @@
+"""
+Migraciones versionadas del esquema de la base de datos
+"""
+# app/migrations/__init__.py
+# Cada migración es un módulo vNNNN_descripcion.py con:
+#   - VERSION: número entero consecutivo
+#   - DESCRIPCION: texto corto que muestra el comando
+#   - upgrade(engine): aplica el cambio. Debe poder repetirse sin romper nada
+#     (IF NOT EXISTS, comprobar antes de reconstruir...) por si se corta a mitad.
+#
+# La versión aplicada se guarda en la cabecera del fichero SQLite
+# (PRAGMA user_version), así que no hace falta una tabla extra.
+#
+# Uso:
+#   python -m app.migrations upgrade     aplica las pendientes
+#   python -m app.migrations current     muestra la versión actual y la esperada
+
+from sqlalchemy.engine import Engine
+
+from app.migrations.base import transaccion
+from app.migrations import (
+    v0001_esquema_inicial,
+    v0002_fk_horarios_pelicula,
+    v0003_indices,
+    v0004_versiones_tablas,
+    v0005_cartelera_view,
+    v0006_titulo_normalizado,
+    v0007_horarios_vendidas,
+    v0008_plano_butacas,
+    v0009_reservas,
+    v0010_reservas_versiones,
+)
+
+# en orden: añadir aquí cada migración nueva
+MIGRACIONES = [
+    v0001_esquema_inicial,
+    v0002_fk_horarios_pelicula,
+    v0003_indices,
+    v0004_versiones_tablas,
+    v0005_cartelera_view,
+    v0006_titulo_normalizado,
+    v0007_horarios_vendidas,
+    v0008_plano_butacas,
+    v0009_reservas,
+    v0010_reservas_versiones,
+]
+
+VERSION_ESPERADA = MIGRACIONES[-1].VERSION
+
+
+class EsquemaDesactualizado(RuntimeError):
+    """La versión del esquema de la base de datos no coincide con la que espera el código."""
+
+
+def version_actual(engine: Engine) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def pendientes(engine: Engine) -> list:
+    actual = version_actual(engine)
+    return [m for m in MIGRACIONES if m.VERSION > actual]
+
+
+def upgrade(engine: Engine, verbose: bool = False) -> int:
+    """
+    Aplica las migraciones pendientes en orden. Devuelve la versión final.
+    """
+    for migracion in pendientes(engine):
+        if verbose:
+            print(f"-> {migracion.VERSION:04d} {migracion.DESCRIPCION}")
+        migracion.upgrade(engine)
+        # la versión sólo avanza cuando la migración ha terminado entera
+        with transaccion(engine) as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(migracion.VERSION)}")
+    return version_actual(engine)
+
+
+def comprobar_esquema(engine: Engine, auto_migrate: bool = False) -> None:
+    """
+    Comprobación de arranque: sólo lee la versión del esquema. Si está atrasada
+    migra (auto_migrate, pensado para dev/test) o lanza EsquemaDesactualizado.
+    """
+    actual = version_actual(engine)
+    if actual == VERSION_ESPERADA:
+        return
+    if actual > VERSION_ESPERADA:
+        raise EsquemaDesactualizado(
+            f"La base de datos está en la versión {actual} y el código sólo conoce hasta la {VERSION_ESPERADA}"
+        )
+    if auto_migrate:
+        upgrade(engine)
+        return
+    raise EsquemaDesactualizado(
+        f"Esquema en la versión {actual}, se necesita la {VERSION_ESPERADA}. "
+        "Ejecuta: python -m app.migrations upgrade"
+    )
@@ -0,0 +1,36 @@
+# app/migrations/__main__.py
+# Comando de migraciones:
+#   python -m app.migrations upgrade
+#   python -m app.migrations current
+# Usa la base de datos de la configuración activa (CARTELERA_ENV / CARTELERA_DATABASE_URL).
+
+import argparse
+import sys
+
+from app.database import engine
+from app.migrations import MIGRACIONES, VERSION_ESPERADA, pendientes, upgrade, version_actual
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Migraciones del esquema")
+    parser.add_argument("comando", choices=["upgrade", "current"])
+    args = parser.parse_args()
+
+    if args.comando == "current":
+        actual = version_actual(engine)
+        print(f"versión actual: {actual} / esperada: {VERSION_ESPERADA}")
+        for migracion in MIGRACIONES:
+            marca = "x" if migracion.VERSION <= actual else " "
+            print(f"  [{marca}] {migracion.VERSION:04d} {migracion.DESCRIPCION}")
+        return 0 if actual == VERSION_ESPERADA else 1
+
+    if not pendientes(engine):
+        print(f"Nada que migrar (versión {VERSION_ESPERADA})")
+        return 0
+    version = upgrade(engine, verbose=True)
+    print(f"Esquema en la versión {version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
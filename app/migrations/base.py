@@ -0,0 +1,25 @@
+# app/migrations/base.py
+# Utilidades compartidas por las migraciones.
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.engine import Connection, Engine
+
+
+@contextmanager
+def transaccion(engine: Engine) -> Iterator[Connection]:
+    """
+    Transacción explícita (BEGIN IMMEDIATE). El driver sqlite3 de Python no abre
+    transacción antes de un CREATE/DROP/ALTER, así que sin esto una reconstrucción
+    de tabla a medias quedaría confirmada.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+
@@ -0,0 +1,71 @@
+# app/migrations/v0001_esquema_inicial.py
+# Esquema original, tal como lo creaba Base.metadata.create_all().
+# En una base de datos anterior a las migraciones (user_version = 0 pero con
+# tablas) no cambia nada gracias a IF NOT EXISTS.
+
+from sqlalchemy.engine import Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 1
+DESCRIPCION = "esquema inicial (genres, salas, peliculas, horarios, ventas)"
+
+TABLAS = [
+    """
+    CREATE TABLE IF NOT EXISTS genres (
+        id INTEGER NOT NULL,
+        name_genre VARCHAR(200) NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS salas (
+        id INTEGER NOT NULL,
+        nombre VARCHAR NOT NULL,
+        capacidad INTEGER NOT NULL,
+        tipo VARCHAR(4) NOT NULL,
+        precio FLOAT NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS horarios (
+        id INTEGER NOT NULL,
+        pelicula_id INTEGER NOT NULL,
+        sala_id INTEGER NOT NULL,
+        hora VARCHAR NOT NULL,
+        disponible BOOLEAN NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(sala_id) REFERENCES salas (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS peliculas (
+        id INTEGER NOT NULL,
+        titulo VARCHAR(255) NOT NULL,
+        genero_id INTEGER NOT NULL,
+        duracion INTEGER NOT NULL,
+        disponible BOOLEAN NOT NULL,
+        imagen VARCHAR(500),
+        PRIMARY KEY (id),
+        FOREIGN KEY(genero_id) REFERENCES genres (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ventas (
+        id INTEGER NOT NULL,
+        horario_id INTEGER NOT NULL,
+        precio_total FLOAT NOT NULL,
+        cantidad INTEGER NOT NULL,
+        metodo_pago VARCHAR(8) NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(horario_id) REFERENCES horarios (id)
+    )
+    """,
+]
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        for ddl in TABLAS:
+            conn.exec_driver_sql(ddl)
@@ -0,0 +1,44 @@
+# app/migrations/v0002_fk_horarios_pelicula.py
+# horarios.pelicula_id pasa a ser clave foránea de peliculas.id.
+# SQLite no permite añadir una FOREIGN KEY con ALTER TABLE, así que se
+# reconstruye la tabla (crear nueva -> copiar -> borrar -> renombrar) en una
+# única transacción. Si la tabla ya tiene la FK (creada con create_all) no se toca.
+
+from sqlalchemy.engine import Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 2
+DESCRIPCION = "clave foránea horarios.pelicula_id -> peliculas.id"
+
+
+def _tiene_fk(conn) -> bool:
+    return any(
+        fila[2] == "peliculas" and fila[3] == "pelicula_id"
+        for fila in conn.exec_driver_sql("PRAGMA foreign_key_list(horarios)")
+    )
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        if _tiene_fk(conn):
+            return
+        conn.exec_driver_sql("DROP TABLE IF EXISTS horarios_nueva")
+        conn.exec_driver_sql("""
+            CREATE TABLE horarios_nueva (
+                id INTEGER NOT NULL,
+                pelicula_id INTEGER NOT NULL,
+                sala_id INTEGER NOT NULL,
+                hora VARCHAR NOT NULL,
+                disponible BOOLEAN NOT NULL,
+                PRIMARY KEY (id),
+                FOREIGN KEY(pelicula_id) REFERENCES peliculas (id),
+                FOREIGN KEY(sala_id) REFERENCES salas (id)
+            )
+        """)
+        conn.exec_driver_sql("""
+            INSERT INTO horarios_nueva (id, pelicula_id, sala_id, hora, disponible)
+            SELECT id, pelicula_id, sala_id, hora, disponible FROM horarios
+        """)
+        conn.exec_driver_sql("DROP TABLE horarios")
+        conn.exec_driver_sql("ALTER TABLE horarios_nueva RENAME TO horarios")
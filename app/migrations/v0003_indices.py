@@ -0,0 +1,27 @@
+# app/migrations/v0003_indices.py
+# Índices de las claves foráneas y filtros frecuentes declarados en los modelos
+# (index=True). Los nombres son los que genera SQLAlchemy (ix_<tabla>_<columna>)
+# para que coincidan con una base de datos creada con create_all.
+
+from sqlalchemy.engine import Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 3
+DESCRIPCION = "índices de claves foráneas y filtros frecuentes"
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS ix_salas_nombre ON salas (nombre)",
+    "CREATE INDEX IF NOT EXISTS ix_peliculas_disponible ON peliculas (disponible)",
+    "CREATE INDEX IF NOT EXISTS ix_peliculas_genero_id ON peliculas (genero_id)",
+    "CREATE INDEX IF NOT EXISTS ix_horarios_pelicula_id ON horarios (pelicula_id)",
+    "CREATE INDEX IF NOT EXISTS ix_horarios_sala_id ON horarios (sala_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ventas_horario_id ON ventas (horario_id)",
+]
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        for ddl in INDICES:
+            conn.exec_driver_sql(ddl)
+        conn.exec_driver_sql("ANALYZE")
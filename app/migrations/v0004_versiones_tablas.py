@@ -0,0 +1,48 @@
+# app/migrations/v0004_versiones_tablas.py
+# Contador de versión por tabla para los GET condicionales (app/http_cache.py).
+#
+# tabla_versiones guarda, para cada tabla de datos, un número que sube con cada
+# fila insertada, modificada o borrada y el instante (segundos Unix) del último
+# cambio. Lo mantienen triggers de SQLite, así que cuentan todas las escrituras:
+# ORM, insert()/update() masivos, otros procesos o SQL a mano.
+#
+# Si una migración futura reconstruye alguna de estas tablas (CREATE nueva +
+# DROP vieja) tiene que volver a crear sus triggers con crear_triggers().
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 4
+DESCRIPCION = "versiones por tabla para ETag / Last-Modified"
+
+TABLAS = ["genres", "peliculas", "salas", "horarios", "ventas"]
+
+_AHORA = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def crear_triggers(conn: Connection, tabla: str) -> None:
+    for operacion in ("INSERT", "UPDATE", "DELETE"):
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS tr_{tabla}_version_{operacion.lower()} "
+            f"AFTER {operacion} ON {tabla} BEGIN "
+            f"UPDATE tabla_versiones SET version = version + 1, modificado = {_AHORA} "
+            f"WHERE tabla = '{tabla}'; "
+            f"END"
+        )
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS tabla_versiones ("
+            "tabla VARCHAR(50) NOT NULL PRIMARY KEY, "
+            "version INTEGER NOT NULL, "
+            "modificado INTEGER NOT NULL)"
+        )
+        for tabla in TABLAS:
+            conn.exec_driver_sql(
+                f"INSERT OR IGNORE INTO tabla_versiones (tabla, version, modificado) "
+                f"VALUES ('{tabla}', 1, {_AHORA})"
+            )
+            crear_triggers(conn, tabla)
@@ -0,0 +1,142 @@
+# app/migrations/v0005_cartelera_view.py
+# Modelo de lectura desnormalizado para GET /api/cartelera.
+#
+# cartelera_view tiene una fila por horario con todo lo que enseña la cartelera
+# (título, género, sala, precio, hora y butacas vendidas), de modo que el
+# endpoint lee una sola tabla sin joins ni cargas perezosas.
+#
+# La mantienen triggers de SQLite de forma incremental: cada escritura en
+# horarios, peliculas, genres, salas o ventas actualiza sólo las filas
+# afectadas, venga del ORM, de un insert() masivo o de otro proceso.
+# Las ventas sólo suman o restan su cantidad en la fila de su horario.
+#
+# Si una migración futura reconstruye alguna de estas tablas tiene que volver
+# a crear sus triggers con crear_triggers().
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 5
+DESCRIPCION = "tabla cartelera_view mantenida por triggers"
+
+TABLA = """
+CREATE TABLE IF NOT EXISTS cartelera_view (
+    horario_id INTEGER NOT NULL PRIMARY KEY,
+    hora VARCHAR NOT NULL,
+    disponible BOOLEAN NOT NULL,
+    pelicula_id INTEGER NOT NULL,
+    titulo VARCHAR(255),
+    genero VARCHAR(200),
+    sala_id INTEGER NOT NULL,
+    sala_nombre VARCHAR,
+    sala_tipo VARCHAR(4),
+    precio FLOAT,
+    capacidad INTEGER,
+    vendidas INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS ix_cartelera_view_hora ON cartelera_view (hora)",
+    "CREATE INDEX IF NOT EXISTS ix_cartelera_view_pelicula_id ON cartelera_view (pelicula_id)",
+    "CREATE INDEX IF NOT EXISTS ix_cartelera_view_sala_id ON cartelera_view (sala_id)",
+]
+
+# fila completa de un horario; {filtro} se sustituye por la condición sobre h
+_FILA = """
+INSERT OR REPLACE INTO cartelera_view (
+    horario_id, hora, disponible, pelicula_id, titulo, genero,
+    sala_id, sala_nombre, sala_tipo, precio, capacidad, vendidas
+)
+SELECT h.id, h.hora, h.disponible, h.pelicula_id, p.titulo, g.name_genre,
+       h.sala_id, s.nombre, s.tipo, s.precio, s.capacidad,
+       (SELECT COALESCE(SUM(v.cantidad), 0) FROM ventas v WHERE v.horario_id = h.id)
+FROM horarios h
+LEFT JOIN peliculas p ON p.id = h.pelicula_id
+LEFT JOIN genres g ON g.id = p.genero_id
+LEFT JOIN salas s ON s.id = h.sala_id
+WHERE {filtro}
+"""
+
+TRIGGERS = {
+    # --- horarios: la fila entera ---
+    "tr_cartelera_horarios_insert": (
+        "AFTER INSERT ON horarios",
+        _FILA.format(filtro="h.id = NEW.id"),
+    ),
+    "tr_cartelera_horarios_update": (
+        "AFTER UPDATE ON horarios",
+        "DELETE FROM cartelera_view WHERE horario_id = OLD.id AND OLD.id <> NEW.id;\n"
+        + _FILA.format(filtro="h.id = NEW.id"),
+    ),
+    "tr_cartelera_horarios_delete": (
+        "AFTER DELETE ON horarios",
+        "DELETE FROM cartelera_view WHERE horario_id = OLD.id",
+    ),
+    # --- peliculas y genres: título y nombre del género ---
+    "tr_cartelera_peliculas_update": (
+        "AFTER UPDATE OF titulo, genero_id ON peliculas",
+        "UPDATE cartelera_view SET titulo = NEW.titulo, "
+        "genero = (SELECT name_genre FROM genres WHERE id = NEW.genero_id) "
+        "WHERE pelicula_id = NEW.id",
+    ),
+    "tr_cartelera_peliculas_delete": (
+        "AFTER DELETE ON peliculas",
+        "UPDATE cartelera_view SET titulo = NULL, genero = NULL WHERE pelicula_id = OLD.id",
+    ),
+    "tr_cartelera_genres_update": (
+        "AFTER UPDATE OF name_genre ON genres",
+        "UPDATE cartelera_view SET genero = NEW.name_genre "
+        "WHERE pelicula_id IN (SELECT id FROM peliculas WHERE genero_id = NEW.id)",
+    ),
+    "tr_cartelera_genres_delete": (
+        "AFTER DELETE ON genres",
+        "UPDATE cartelera_view SET genero = NULL "
+        "WHERE pelicula_id IN (SELECT id FROM peliculas WHERE genero_id = OLD.id)",
+    ),
+    # --- salas ---
+    "tr_cartelera_salas_update": (
+        "AFTER UPDATE ON salas",
+        "UPDATE cartelera_view SET sala_nombre = NEW.nombre, sala_tipo = NEW.tipo, "
+        "precio = NEW.precio, capacidad = NEW.capacidad WHERE sala_id = NEW.id",
+    ),
+    "tr_cartelera_salas_delete": (
+        "AFTER DELETE ON salas",
+        "UPDATE cartelera_view SET sala_nombre = NULL, sala_tipo = NULL, "
+        "precio = NULL, capacidad = NULL WHERE sala_id = OLD.id",
+    ),
+    # --- ventas: sólo el contador de butacas vendidas ---
+    "tr_cartelera_ventas_insert": (
+        "AFTER INSERT ON ventas",
+        "UPDATE cartelera_view SET vendidas = vendidas + NEW.cantidad "
+        "WHERE horario_id = NEW.horario_id",
+    ),
+    "tr_cartelera_ventas_update": (
+        "AFTER UPDATE OF horario_id, cantidad ON ventas",
+        "UPDATE cartelera_view SET vendidas = vendidas - OLD.cantidad "
+        "WHERE horario_id = OLD.horario_id;\n"
+        "UPDATE cartelera_view SET vendidas = vendidas + NEW.cantidad "
+        "WHERE horario_id = NEW.horario_id",
+    ),
+    "tr_cartelera_ventas_delete": (
+        "AFTER DELETE ON ventas",
+        "UPDATE cartelera_view SET vendidas = vendidas - OLD.cantidad "
+        "WHERE horario_id = OLD.horario_id",
+    ),
+}
+
+
+def crear_triggers(conn: Connection) -> None:
+    for nombre, (evento, cuerpo) in TRIGGERS.items():
+        conn.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {nombre} {evento} BEGIN {cuerpo}; END")
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        conn.exec_driver_sql(TABLA)
+        for ddl in INDICES:
+            conn.exec_driver_sql(ddl)
+        crear_triggers(conn)
+        # carga inicial (INSERT OR REPLACE: se puede repetir)
+        conn.exec_driver_sql(_FILA.format(filtro="1"))
@@ -0,0 +1,42 @@
+# app/migrations/v0006_titulo_normalizado.py
+# Clave de título normalizado para la importación masiva de películas.
+#
+# peliculas.titulo_normalizado es una columna generada (VIRTUAL) con
+# lower(trim(titulo)): SQLite la calcula al leerla, así que no hay que
+# rellenarla ni mantenerla desde ningún camino de escritura. El índice único
+# es el destino del INSERT ... ON CONFLICT DO UPDATE de la importación y
+# sustituye a la búsqueda por título en minúsculas fila a fila.
+#
+# Si ya hay títulos repetidos (sin distinguir mayúsculas) el índice único no
+# se puede crear: la migración se detiene y los enumera para resolverlos a mano.
+
+from sqlalchemy.engine import Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 6
+DESCRIPCION = "columna peliculas.titulo_normalizado con índice único"
+
+# la misma expresión que el Computed() de app/models/pelicula.py
+EXPRESION = "lower(trim(titulo))"
+
+COLUMNA = f"ALTER TABLE peliculas ADD COLUMN titulo_normalizado VARCHAR(255) GENERATED ALWAYS AS ({EXPRESION}) VIRTUAL"
+INDICE = "CREATE UNIQUE INDEX IF NOT EXISTS ix_peliculas_titulo_normalizado ON peliculas (titulo_normalizado)"
+
+
+def _tiene_columna(conn) -> bool:
+    # table_xinfo incluye las columnas generadas (table_info no)
+    return any(fila[1] == "titulo_normalizado" for fila in conn.exec_driver_sql("PRAGMA table_xinfo(peliculas)"))
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        repetidos = conn.exec_driver_sql(
+            f"SELECT {EXPRESION} AS clave, COUNT(*) FROM peliculas GROUP BY clave HAVING COUNT(*) > 1"
+        ).all()
+        if repetidos:
+            lista = ", ".join(f"{clave!r} ({n})" for clave, n in repetidos)
+            raise RuntimeError(f"Hay títulos de película repetidos, renómbralos antes de migrar: {lista}")
+        if not _tiene_columna(conn):
+            conn.exec_driver_sql(COLUMNA)
+        conn.exec_driver_sql(INDICE)
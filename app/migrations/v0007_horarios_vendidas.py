@@ -0,0 +1,66 @@
+# app/migrations/v0007_horarios_vendidas.py
+# Contador de butacas vendidas por horario para no vender por encima del aforo.
+#
+# horarios.vendidas es la suma de ventas.cantidad de cada horario. Cada venta
+# lo sube con un único UPDATE condicional (vendidas + n <= capacidad de la
+# sala, ver app/services/aforo.py) en la misma transacción que el INSERT de la
+# venta, así que no hace falta sumar las ventas en cada petición.
+#
+# vendidas no sale en ninguna respuesta de horarios: los triggers de
+# UPDATE de horarios (versión para el ETag, v0004, y cartelera_view, v0005) se
+# limitan a las demás columnas para que cada venta no cambie el ETag de
+# /api/horarios ni reconstruya su fila de la cartelera (que ya suma la venta
+# por su trigger de ventas). Si una migración futura añade columnas visibles a
+# horarios, tiene que añadirlas a COLUMNAS y volver a crear los triggers.
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations.base import transaccion
+from app.migrations.v0004_versiones_tablas import _AHORA
+from app.migrations.v0005_cartelera_view import _FILA
+
+VERSION = 7
+DESCRIPCION = "contador horarios.vendidas para el aforo"
+
+COLUMNA = "ALTER TABLE horarios ADD COLUMN vendidas INTEGER NOT NULL DEFAULT 0"
+
+# columnas de horarios que ve la API (todas menos vendidas)
+COLUMNAS = "id, pelicula_id, sala_id, hora, disponible"
+
+TRIGGERS = {
+    "tr_horarios_version_update": (
+        f"AFTER UPDATE OF {COLUMNAS} ON horarios",
+        f"UPDATE tabla_versiones SET version = version + 1, modificado = {_AHORA} "
+        f"WHERE tabla = 'horarios'",
+    ),
+    "tr_cartelera_horarios_update": (
+        f"AFTER UPDATE OF {COLUMNAS} ON horarios",
+        "DELETE FROM cartelera_view WHERE horario_id = OLD.id AND OLD.id <> NEW.id;\n"
+        + _FILA.format(filtro="h.id = NEW.id"),
+    ),
+}
+
+RELLENO = (
+    "UPDATE horarios SET vendidas = "
+    "(SELECT COALESCE(SUM(v.cantidad), 0) FROM ventas v WHERE v.horario_id = horarios.id)"
+)
+
+
+def _tiene_columna(conn: Connection) -> bool:
+    return any(fila[1] == "vendidas" for fila in conn.exec_driver_sql("PRAGMA table_info(horarios)"))
+
+
+def crear_triggers(conn: Connection) -> None:
+    for nombre, (evento, cuerpo) in TRIGGERS.items():
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nombre}")
+        conn.exec_driver_sql(f"CREATE TRIGGER {nombre} {evento} BEGIN {cuerpo}; END")
+
+
+def upgrade(engine: Engine) -> None:
+    # todo en una transacción: el contador queda igual a las ventas que hay al confirmar
+    with transaccion(engine) as conn:
+        if not _tiene_columna(conn):
+            conn.exec_driver_sql(COLUMNA)
+        # primero los triggers: así el relleno no cambia versiones ni la cartelera
+        crear_triggers(conn)
+        conn.exec_driver_sql(RELLENO)
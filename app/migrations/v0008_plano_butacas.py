@@ -0,0 +1,41 @@
+# app/migrations/v0008_plano_butacas.py
+# Plano de butacas: filas x butacas por fila en cada sala y un mapa de bits de
+# ocupación por horario.
+#
+#   - salas.filas, salas.butacas_por_fila: el plano de la sala. NULL en las
+#     salas sin plano (sólo venden entradas sin butaca, como hasta ahora).
+#   - horarios.ocupacion: un bit por butaca (butaca i = fila * butacas_por_fila
+#     + columna; byte i >> 3, bit i & 7). NULL = ninguna ocupada. Una sala IMAX
+#     de 400 butacas son 50 bytes, y reservar k butacas mira y cambia k bits
+#     (ver app/services/asientos.py), sin una fila por butaca.
+#   - ventas.asientos: las butacas de la venta ("A1,A2"), para devolverlas al
+#     borrarla. NULL en las ventas sin butaca.
+#
+# ocupacion no está en las COLUMNAS de v0007: los triggers de UPDATE de
+# horarios no se disparan al reservar butacas (no cambia el ETag de
+# /api/horarios ni la cartelera).
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 8
+DESCRIPCION = "plano de butacas de las salas y ocupación por horario"
+
+COLUMNAS = [
+    ("salas", "filas", "INTEGER"),
+    ("salas", "butacas_por_fila", "INTEGER"),
+    ("horarios", "ocupacion", "BLOB"),
+    ("ventas", "asientos", "VARCHAR"),
+]
+
+
+def _tiene_columna(conn: Connection, tabla: str, columna: str) -> bool:
+    return any(fila[1] == columna for fila in conn.exec_driver_sql(f"PRAGMA table_info({tabla})"))
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        for tabla, columna, tipo in COLUMNAS:
+            if not _tiene_columna(conn, tabla, columna):
+                conn.exec_driver_sql(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
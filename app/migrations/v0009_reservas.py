@@ -0,0 +1,36 @@
+# app/migrations/v0009_reservas.py
+# Reservas temporales de butacas (app/services/reservas.py): el pago en línea
+# retiene las butacas unos minutos antes de convertirlas en una venta.
+#
+# Una reserva ya ha restado sus butacas de horarios.vendidas y, si eligió
+# butacas, las ha marcado en horarios.ocupacion: el aforo y el plano cuentan
+# las reservas activas sin consultar esta tabla. expira_en (segundos desde
+# epoch) sólo se lee al arrancar para llenar el montículo de caducidad; el
+# resto de accesos son por id.
+
+from sqlalchemy.engine import Engine
+
+from app.migrations.base import transaccion
+
+VERSION = 9
+DESCRIPCION = "reservas temporales de butacas"
+
+TABLA = """
+    CREATE TABLE IF NOT EXISTS reservas (
+        id INTEGER NOT NULL,
+        horario_id INTEGER NOT NULL,
+        cantidad INTEGER NOT NULL,
+        asientos VARCHAR,
+        expira_en FLOAT NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(horario_id) REFERENCES horarios (id)
+    )
+"""
+
+INDICE = "CREATE INDEX IF NOT EXISTS ix_reservas_horario_id ON reservas (horario_id)"
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        conn.exec_driver_sql(TABLA)
+        conn.exec_driver_sql(INDICE)
@@ -0,0 +1,82 @@
+# app/migrations/v0010_reservas_versiones.py
+# Las reservas (v0009) cambian la disponibilidad de un horario sin tocar
+# ninguna columna que vigilen los triggers: restan de horarios.vendidas y
+# marcan horarios.ocupacion, que no están en las COLUMNAS de v0007. Así, tras
+# POST /api/reservas o al caducar una, el ETag del plano y de la cartelera no
+# cambiaba y los clientes recibían 304 con butacas que ya no estaban libres.
+#
+#   - reservas tiene su versión en tabla_versiones (triggers de v0004): los GET
+#     que enseñan disponibilidad la incluyen en su condicional()
+#   - cartelera_view.vendidas cuenta también las reservas activas: sus
+#     triggers suman la cantidad al crearlas y la restan al borrarlas
+#     (confirmar, cancelar o caducar). Al confirmar, el trigger de ventas la
+#     vuelve a sumar, así que la fila no cambia.
+#
+# Si una migración futura vuelve a crear los triggers de horarios de la
+# cartelera tiene que usar _FILA de este módulo, no la de v0005.
+
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations import v0004_versiones_tablas, v0005_cartelera_view, v0007_horarios_vendidas
+from app.migrations.base import transaccion
+from app.migrations.v0004_versiones_tablas import _AHORA
+
+VERSION = 10
+DESCRIPCION = "versión de reservas para el ETag y reservas en la cartelera"
+
+TABLA = "reservas"
+
+# butacas vendidas o retenidas de h.id
+_VENDIDAS = (
+    "(SELECT COALESCE(SUM(v.cantidad), 0) FROM ventas v WHERE v.horario_id = h.id)"
+    " + (SELECT COALESCE(SUM(r.cantidad), 0) FROM reservas r WHERE r.horario_id = h.id)"
+)
+
+_FILA = v0005_cartelera_view._FILA.replace(
+    "(SELECT COALESCE(SUM(v.cantidad), 0) FROM ventas v WHERE v.horario_id = h.id)", _VENDIDAS
+)
+
+TRIGGERS = {
+    # filas completas de horarios: como en v0005 y v0007, con las reservas
+    "tr_cartelera_horarios_insert": (
+        "AFTER INSERT ON horarios",
+        _FILA.format(filtro="h.id = NEW.id"),
+    ),
+    "tr_cartelera_horarios_update": (
+        f"AFTER UPDATE OF {v0007_horarios_vendidas.COLUMNAS} ON horarios",
+        "DELETE FROM cartelera_view WHERE horario_id = OLD.id AND OLD.id <> NEW.id;\n"
+        + _FILA.format(filtro="h.id = NEW.id"),
+    ),
+    # reservas: sólo el contador de butacas
+    "tr_cartelera_reservas_insert": (
+        "AFTER INSERT ON reservas",
+        "UPDATE cartelera_view SET vendidas = vendidas + NEW.cantidad "
+        "WHERE horario_id = NEW.horario_id",
+    ),
+    "tr_cartelera_reservas_delete": (
+        "AFTER DELETE ON reservas",
+        "UPDATE cartelera_view SET vendidas = vendidas - OLD.cantidad "
+        "WHERE horario_id = OLD.horario_id",
+    ),
+}
+
+RELLENO = (
+    f"UPDATE cartelera_view SET vendidas = {_VENDIDAS.replace('h.id', 'cartelera_view.horario_id')}"
+)
+
+
+def crear_triggers(conn: Connection) -> None:
+    for nombre, (evento, cuerpo) in TRIGGERS.items():
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nombre}")
+        conn.exec_driver_sql(f"CREATE TRIGGER {nombre} {evento} BEGIN {cuerpo}; END")
+
+
+def upgrade(engine: Engine) -> None:
+    with transaccion(engine) as conn:
+        conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO tabla_versiones (tabla, version, modificado) "
+            f"VALUES ('{TABLA}', 1, {_AHORA})"
+        )
+        v0004_versiones_tablas.crear_triggers(conn, TABLA)
+        crear_triggers(conn)
+        conn.exec_driver_sql(RELLENO)
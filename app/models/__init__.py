@@ -12,6 +12,8 @@ from app.models.venta import MetodoPago
 from app.models.sala import SalaORM
 
 from app.models.pelicula import Pelicula
+from app.models.cartelera import CarteleraFila
+from app.models.reserva import Reserva
 
-__all__ = [Pelicula,Horario, SalaORM, Genre, Venta, MetodoPago] 
+__all__ = [Pelicula,Horario, SalaORM, Genre, Venta, MetodoPago, CarteleraFila, Reserva] 
 
@@ -0,0 +1,23 @@
+from sqlalchemy import Boolean, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+# Modelo de lectura de la cartelera: una fila por horario.
+# La tabla la crean y la mantienen los triggers de la migración v0005
+# (app/migrations/v0005_cartelera_view.py); la aplicación nunca escribe en ella.
+class CarteleraFila(Base):
+    __tablename__ = "cartelera_view"
+
+    horario_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # indexada: el listado se ordena por hora
+    hora: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    disponible: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    pelicula_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    titulo: Mapped[str | None] = mapped_column(String(255))
+    genero: Mapped[str | None] = mapped_column(String(200))
+    sala_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    sala_nombre: Mapped[str | None] = mapped_column(String)
+    sala_tipo: Mapped[str | None] = mapped_column(String(4))
+    precio: Mapped[float | None] = mapped_column(Float)
+    capacidad: Mapped[int | None] = mapped_column(Integer)
+    vendidas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, String, Boolean
+from sqlalchemy import ForeignKey, Integer, LargeBinary, String, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 from app.models.sala import SalaORM
@@ -7,11 +7,14 @@ class Horario(Base):
     __tablename__ = "horarios" #nombre de la tabla en bd
     #clave primaria
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    #relacion ManyToOne con Peliculas
-    pelicula_id: Mapped[int] = mapped_column(Integer,nullable=False)
-    #relacion ManyToOne con Salas
-    sala_id: Mapped[int] = mapped_column(ForeignKey("salas.id"), nullable=False)
+    #relacion ManyToOne con Peliculas (indexada: horarios por película)
+    pelicula_id: Mapped[int] = mapped_column(ForeignKey("peliculas.id"), nullable=False, index=True)
+    #relacion ManyToOne con Salas (indexada: horarios por sala)
+    sala_id: Mapped[int] = mapped_column(ForeignKey("salas.id"), nullable=False, index=True)
     sala: Mapped["SalaORM"] = relationship("SalaORM")
     hora: Mapped[str] = mapped_column(String, nullable=False)
     disponible:Mapped[bool] = mapped_column(Boolean, nullable=False)
-    
\ No newline at end of file
+    #butacas vendidas: lo mantiene app/services/aforo.py (migración v0007)
+    vendidas: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    #mapa de bits de butacas ocupadas: lo mantiene app/services/asientos.py (migración v0008)
+    ocupacion: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True, deferred=True)
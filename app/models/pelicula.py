@@ -2,7 +2,7 @@
 # app/models/pelicula.py
 # Define la tabla 'peliculas' en la BBDD
 
-from sqlalchemy import String, Integer, Boolean, ForeignKey, JSON
+from sqlalchemy import String, Integer, Boolean, ForeignKey, JSON, Computed
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base # Importamos la Base declarativa
 from app.models.genre import Genre
@@ -14,13 +14,18 @@ class Pelicula(Base):
     # --- Columnas Requeridas ---
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     titulo: Mapped[str] = mapped_column(String(255), nullable=False)
+    # columna generada por SQLite (migración v0006): clave única de la importación
+    titulo_normalizado: Mapped[str] = mapped_column(
+        String(255), Computed("lower(trim(titulo))", persisted=False), index=True, unique=True
+    )
     
     # --- Relación ManyToOne con Genero ---
     # Esto cumple con "genero_id: int"
-    genero_id: Mapped[int] = mapped_column(ForeignKey("genres.id"), nullable=False)
+    genero_id: Mapped[int] = mapped_column(ForeignKey("genres.id"), nullable=False, index=True)
     genero: Mapped["Genre"] = relationship("Genre")
     duracion: Mapped[int] = mapped_column(Integer, nullable=False) # int, no float
-    disponible: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # indexada: filtro "ver películas disponibles"
+    disponible: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
     imagen: Mapped[str] = mapped_column(String(500), nullable=True)  # URL de la imagen
 
     
@@ -0,0 +1,16 @@
+from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+# reserva temporal de butacas antes del pago (app/services/reservas.py, migración v0009)
+class Reserva(Base):
+    __tablename__ = "reservas"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # indexada: comprobar si un horario tiene butacas reservadas
+    horario_id: Mapped[int] = mapped_column(ForeignKey("horarios.id"), nullable=False, index=True)
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False)
+    # butacas elegidas ("A1,A2"), o None si sólo reserva cantidad
+    asientos: Mapped[str | None] = mapped_column(String, nullable=True)
+    # segundos desde epoch (time.time())
+    expira_en: Mapped[float] = mapped_column(Float, nullable=False)
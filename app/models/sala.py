@@ -8,8 +8,12 @@ class SalaORM(Base):
     __tablename__ = "salas"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    nombre: Mapped[str] = mapped_column(nullable=False)
+    # indexada: comprobación de nombre duplicado al crear una sala
+    nombre: Mapped[str] = mapped_column(nullable=False, index=True)
     capacidad: Mapped[int] = mapped_column(Integer, nullable=False)
     tipo: Mapped[str] = mapped_column(Enum("2D", "3D", "IMAX", "2d", "3d", "imax", "Imax", name="tipo_enum"), nullable=False)
     precio: Mapped[float] = mapped_column(Float, nullable=False)
-    
\ No newline at end of file
+    # plano de butacas (migración v0008): filas x butacas_por_fila = capacidad.
+    # None en las salas sin plano, que sólo venden entradas sin butaca
+    filas: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    butacas_por_fila: Mapped[int | None] = mapped_column(Integer, nullable=True)
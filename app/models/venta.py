@@ -1,4 +1,4 @@
-from sqlalchemy import Float, ForeignKey,Integer
+from sqlalchemy import Float, ForeignKey,Integer, String
 from app.database import Base
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped,mapped_column,relationship
@@ -19,8 +19,8 @@ class Venta(Base):
     
     # Clave primaria, se genera automáticamente
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    # requierido, RELACION CON IDs de horario
-    horario_id:Mapped[int] = mapped_column(ForeignKey("horarios.id"), nullable=False)
+    # requierido, RELACION CON IDs de horario (indexada: ventas por horario)
+    horario_id:Mapped[int] = mapped_column(ForeignKey("horarios.id"), nullable=False, index=True)
     horario: Mapped["Horario"] = relationship("Horario")
     # requierido, Precio total (haremos el cálculo con el precio base de las salas y la cantidad)
     precio_total: Mapped[float] = mapped_column(Float, nullable=False)
@@ -28,4 +28,6 @@ class Venta(Base):
     cantidad: Mapped[int]= mapped_column(Integer, nullable=False)
     # requerido
     metodo_pago: Mapped[MetodoPago] = mapped_column(SQLEnum(MetodoPago, name="metodo_pago_enum"),
-    nullable=False)
\ No newline at end of file
+    nullable=False)
+    # butacas de la venta ("A1,A2") si se eligieron en el plano (app/services/asientos.py)
+    asientos: Mapped[str | None] = mapped_column(String, nullable=True)
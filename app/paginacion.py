@@ -0,0 +1,93 @@
+"""
+Paginación por cursor (keyset) para los listados de la API
+"""
+# app/paginacion.py
+# Los listados de la API aceptan ?limit=&after= y devuelven como mucho limit
+# filas ordenadas por una clave indexada (el id, o hora + id en la cartelera).
+# En lugar de OFFSET, la consulta pide "clave > última clave vista", así que
+# cada página cuesta lo mismo sea cual sea el tamaño de la tabla.
+#
+# El cuerpo sigue siendo una lista JSON. Si hay más filas, la respuesta lleva
+# el cursor de la siguiente página en X-Next-Cursor y en Link (rel="next").
+# El cursor es opaco para el cliente (base64 de la clave de la última fila).
+#
+# Uso en un router:
+#   _PAGINA = paginacion((0,))      # clave (id,), empieza antes del id 1
+#   def find_all(pagina: Pagina = Depends(_PAGINA), db = ...):
+#       filas = db.execute(queries.x_pagina(*pagina.despues, pagina.limite + 1)).scalars().all()
+#       return pagina.recortar(filas, lambda x: (x.id,))
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+from fastapi import HTTPException, Query, Request, Response, status
+
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 1000
+
+
+def codificar_cursor(clave: tuple) -> str:
+    datos = json.dumps(list(clave), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, inicio: tuple) -> tuple:
+    """
+    Devuelve la clave del cursor. Tiene que tener la misma forma que inicio
+    (mismo número de valores y mismos tipos); si no, 400.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        clave = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        clave = None
+    if (
+        not isinstance(clave, list)
+        or len(clave) != len(inicio)
+        or any(type(valor) is not type(tipo) for valor, tipo in zip(clave, inicio))
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor de paginación no válido")
+    return tuple(clave)
+
+
+@dataclass
+class Pagina:
+    limite: int
+    despues: tuple  # clave de la última fila de la página anterior
+    request: Request
+    response: Response
+
+    def recortar(self, filas: Sequence, clave: Callable[[object], tuple]) -> list:
+        """
+        filas debe venir de una consulta con limit = limite + 1: si sobra una
+        fila hay página siguiente y se añaden sus cabeceras.
+        """
+        filas = list(filas)
+        if len(filas) > self.limite:
+            filas = filas[:self.limite]
+            cursor = codificar_cursor(clave(filas[-1]))
+            siguiente = self.request.url.include_query_params(after=cursor, limit=self.limite)
+            self.response.headers["X-Next-Cursor"] = cursor
+            self.response.headers["Link"] = f'<{siguiente}>; rel="next"'
+        return filas
+
+
+def paginacion(inicio: tuple):
+    """
+    Dependencia que lee limit y after. inicio es la clave anterior a la
+    primera fila (p. ej. (0,) para ids o ("", 0) para hora + id).
+    """
+
+    def dependencia(
+        request: Request,
+        response: Response,
+        limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO, description="Filas por página"),
+        after: str | None = Query(None, description="Cursor devuelto en X-Next-Cursor"),
+    ) -> Pagina:
+        despues = decodificar_cursor(after, inicio) if after else inicio
+        return Pagina(limite=limit, despues=despues, request=request, response=response)
+
+    return dependencia
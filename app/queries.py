@@ -0,0 +1,323 @@
+"""
+Consultas compartidas por los routers (sentencias lambda cacheadas)
+"""
+# app/queries.py
+# Las consultas por id, los listados y las comprobaciones de existencia que
+# repiten los routers (API síncrona, API asíncrona y web) se construyen aquí
+# con lambda_stmt. SQLAlchemy analiza cada lambda una sola vez: en las
+# llamadas siguientes no se vuelve a montar el select(...).where(...).options(...)
+# ni a calcular su clave de caché; sólo se sustituyen los parámetros (el id).
+#
+# Todas devuelven la sentencia, así que valen para Session y AsyncSession:
+#   db.execute(queries.pelicula_por_id(id)).scalar_one_or_none()
+#   (await db.execute(queries.pelicula_por_id(id))).scalar_one_or_none()
+#
+# Las funciones *_pagina son los listados de la API paginados por cursor
+# (app/paginacion.py): "clave > after ORDER BY clave LIMIT n" sobre la clave
+# primaria, que no necesita OFFSET ni recorrer la tabla entera.
+#
+# scripts/bench_queries.py mide lo que se ahorra frente a construir el select cada vez.
+
+from sqlalchemy import exists, lambda_stmt, select, text, tuple_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.models import CarteleraFila, Horario, Pelicula, SalaORM, Venta
+
+
+# --- genéricas (sin relaciones) ---
+
+def por_id(modelo, id: int) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(modelo).where(modelo.id == id))
+
+
+def todos(modelo) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(modelo))
+
+
+def pagina(modelo, after: int, limite: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(modelo).where(modelo.id > after).order_by(modelo.id).limit(limite)
+    )
+
+
+def ids_existentes(modelo, ids: list[int]) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(modelo.id).where(modelo.id.in_(ids)))
+
+
+def existe(modelo, id: int) -> StatementLambdaElement:
+    """SELECT EXISTS(...): usar con db.scalar()."""
+    return lambda_stmt(lambda: select(exists().where(modelo.id == id)))
+
+
+# --- películas (con su género) ---
+
+def pelicula_por_id(id: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Pelicula).where(Pelicula.id == id).options(joinedload(Pelicula.genero))
+    )
+
+
+def peliculas() -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(Pelicula).options(joinedload(Pelicula.genero)))
+
+
+def ultimas_peliculas(limite: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Pelicula)
+        .options(joinedload(Pelicula.genero))
+        .order_by(Pelicula.id.desc())
+        .limit(limite)
+    )
+
+
+def peliculas_pagina(after: int, limite: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Pelicula)
+        .options(joinedload(Pelicula.genero))
+        .where(Pelicula.id > after)
+        .order_by(Pelicula.id)
+        .limit(limite)
+    )
+
+
+def hay_peliculas() -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(select(Pelicula.id).exists()))
+
+
+# --- salas ---
+
+def sala_por_nombre(nombre: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(SalaORM).where(SalaORM.nombre == nombre))
+
+
+# --- horarios (con su sala) ---
+
+def horario_por_id(id: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Horario).where(Horario.id == id).options(joinedload(Horario.sala))
+    )
+
+
+def horarios() -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(Horario).options(joinedload(Horario.sala)))
+
+
+def horarios_pagina(after: int, limite: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Horario)
+        .options(joinedload(Horario.sala))
+        .where(Horario.id > after)
+        .order_by(Horario.id)
+        .limit(limite)
+    )
+
+
+def horarios_por_ids(ids: list[int]) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Horario)
+        .where(Horario.id.in_(ids))
+        .options(joinedload(Horario.sala))
+    )
+
+
+def horarios_desde(after: int) -> StatementLambdaElement:
+    # sin límite: para leer con yield_per (NDJSON, app/streaming.py)
+    return lambda_stmt(
+        lambda: select(Horario)
+        .options(joinedload(Horario.sala))
+        .where(Horario.id > after)
+        .order_by(Horario.id)
+    )
+
+
+# --- ventas (con horario y sala, lo que incluye VentaResponse) ---
+
+def venta_por_id(id: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Venta)
+        .where(Venta.id == id)
+        .options(joinedload(Venta.horario).joinedload(Horario.sala))
+    )
+
+
+def ventas_pagina(after: int, limite: int) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Venta)
+        .options(joinedload(Venta.horario).joinedload(Horario.sala))
+        .where(Venta.id > after)
+        .order_by(Venta.id)
+        .limit(limite)
+    )
+
+
+def ventas_desde(after: int) -> StatementLambdaElement:
+    # sin límite: para leer con yield_per (NDJSON, app/streaming.py)
+    return lambda_stmt(
+        lambda: select(Venta)
+        .options(joinedload(Venta.horario).joinedload(Horario.sala))
+        .where(Venta.id > after)
+        .order_by(Venta.id)
+    )
+
+
+def ventas_por_ids(ids: list[int]) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Venta)
+        .where(Venta.id.in_(ids))
+        .options(joinedload(Venta.horario).joinedload(Horario.sala))
+    )
+
+
+# --- precios (horario -> sala, app/services/precios.py) ---
+
+def precios_horarios() -> StatementLambdaElement:
+    # tabla completa {horario_id: precio}: SELECT horarios.id, salas.precio ... JOIN
+    return lambda_stmt(
+        lambda: select(Horario.id, SalaORM.precio).join(SalaORM, SalaORM.id == Horario.sala_id)
+    )
+
+
+def precios_por_horarios(ids: list[int]) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Horario.id, SalaORM.precio)
+        .join(SalaORM, SalaORM.id == Horario.sala_id)
+        .where(Horario.id.in_(ids))
+    )
+
+
+# --- cartelera (tabla desnormalizada, migración v0005) ---
+
+def cartelera_pagina(hora: str, horario_id: int, limite: int) -> StatementLambdaElement:
+    # ordenada por hora: la clave del cursor es (hora, horario_id)
+    return lambda_stmt(
+        lambda: select(CarteleraFila)
+        .where(tuple_(CarteleraFila.hora, CarteleraFila.horario_id) > tuple_(hora, horario_id))
+        .order_by(CarteleraFila.hora, CarteleraFila.horario_id)
+        .limit(limite)
+    )
+
+
+# --- versiones por tabla (migración v0004, GET condicionales de app/http_cache.py) ---
+
+_VERSIONES_TABLAS = text("SELECT tabla, version, modificado FROM tabla_versiones")
+
+
+def versiones_tablas() -> TextClause:
+    return _VERSIONES_TABLAS
+
+
+# --- aforo (horarios.vendidas, migración v0007, app/services/aforo.py) ---
+# text() y no update(Horario): vendidas no sale en ninguna respuesta, así que
+# estas escrituras no deben invalidar las cachés que dependen de horarios
+# (install_invalidation en app/cache.py sólo anota los update() del ORM)
+
+_RESERVAR_BUTACAS = text(
+    "UPDATE horarios SET vendidas = vendidas + :n "
+    "WHERE id = :horario_id "
+    "AND vendidas + :n <= (SELECT capacidad FROM salas WHERE salas.id = horarios.sala_id)"
+)
+
+_LIBERAR_BUTACAS = text(
+    "UPDATE horarios SET vendidas = max(vendidas - :n, 0) WHERE id = :horario_id"
+)
+
+
+# horarios con más butacas vendidas o reservadas que la capacidad de su sala,
+# tras mover el horario de sala o cambiar la capacidad (en la misma transacción)
+_SOBRE_AFORO = (
+    "SELECT h.id, h.vendidas, s.capacidad FROM horarios h JOIN salas s ON s.id = h.sala_id "
+    "WHERE {filtro} AND h.vendidas > s.capacidad LIMIT 1"
+)
+_HORARIO_SOBRE_AFORO = text(_SOBRE_AFORO.format(filtro="h.id = :horario_id"))
+_SALA_SOBRE_AFORO = text(_SOBRE_AFORO.format(filtro="h.sala_id = :sala_id"))
+
+
+def reservar_butacas() -> TextClause:
+    # no cambia ninguna fila si no caben: rowcount 0
+    return _RESERVAR_BUTACAS
+
+
+def liberar_butacas() -> TextClause:
+    return _LIBERAR_BUTACAS
+
+
+def horario_sobre_aforo() -> TextClause:
+    return _HORARIO_SOBRE_AFORO
+
+
+def sala_sobre_aforo() -> TextClause:
+    return _SALA_SOBRE_AFORO
+
+
+# --- plano de butacas (horarios.ocupacion, migración v0008, app/services/asientos.py) ---
+# text() por lo mismo que el aforo: ocupacion no sale en las respuestas de
+# horarios y reservar butacas no debe invalidar las cachés de horarios
+
+_PLANO_HORARIO = text(
+    "SELECT s.filas, s.butacas_por_fila, h.ocupacion "
+    "FROM horarios h JOIN salas s ON s.id = h.sala_id WHERE h.id = :horario_id"
+)
+
+_GUARDAR_OCUPACION = text("UPDATE horarios SET ocupacion = :ocupacion WHERE id = :horario_id")
+
+# ventas y reservas (app/services/reservas.py) con butacas elegidas
+_HORARIO_CON_ASIENTOS = text(
+    "SELECT EXISTS (SELECT 1 FROM ventas WHERE horario_id = :horario_id AND asientos IS NOT NULL) "
+    "OR EXISTS (SELECT 1 FROM reservas WHERE horario_id = :horario_id AND asientos IS NOT NULL)"
+)
+
+_SALA_CON_ASIENTOS = text(
+    "SELECT EXISTS (SELECT 1 FROM ventas v JOIN horarios h ON h.id = v.horario_id "
+    "WHERE h.sala_id = :sala_id AND v.asientos IS NOT NULL) "
+    "OR EXISTS (SELECT 1 FROM reservas r JOIN horarios h ON h.id = r.horario_id "
+    "WHERE h.sala_id = :sala_id AND r.asientos IS NOT NULL)"
+)
+
+
+def plano_horario() -> TextClause:
+    # (filas, butacas_por_fila, ocupacion) o ninguna fila si el horario no existe
+    return _PLANO_HORARIO
+
+
+def guardar_ocupacion() -> TextClause:
+    return _GUARDAR_OCUPACION
+
+
+def horario_con_asientos() -> TextClause:
+    return _HORARIO_CON_ASIENTOS
+
+
+def sala_con_asientos() -> TextClause:
+    return _SALA_CON_ASIENTOS
+
+
+# --- reservas temporales (migración v0009, app/services/reservas.py) ---
+# confirmar y caducar borran la reserva con la condición de tiempo contraria:
+# si coinciden, sólo una de las dos encuentra la fila
+
+_TOMAR_RESERVA = text(
+    "DELETE FROM reservas WHERE id = :id AND expira_en > :ahora "
+    "RETURNING horario_id, cantidad, asientos"
+)
+
+_CADUCAR_RESERVA = text(
+    "DELETE FROM reservas WHERE id = :id AND expira_en <= :ahora "
+    "RETURNING horario_id, cantidad, asientos"
+)
+
+_RESERVAS_PENDIENTES = text("SELECT id, expira_en FROM reservas")
+
+
+def tomar_reserva() -> TextClause:
+    # confirmar o cancelar: sólo si no ha caducado
+    return _TOMAR_RESERVA
+
+
+def caducar_reserva() -> TextClause:
+    return _CADUCAR_RESERVA
+
+
+def reservas_pendientes() -> TextClause:
+    return _RESERVAS_PENDIENTES
@@ -1,18 +1,8 @@
 """
-Router de páginas web
-Contienen los endpoints que renderizan HTMLs
-"""
-
-from app.routers.web import horarios
-from app.routers.web import genre
-from app.routers.web import salas
-from app.routers.web import ventas
-
-from fastapi import APIRouter
+Routers de la aplicación
+  - app/routers/api: API REST (JSON)
+  - app/routers/api_async: la misma API con AsyncSession
+  - app/routers/web: páginas HTML
 
-router = APIRouter()
-
-router.include_router(horarios.router)
-router.include_router(genre.router)
-router.include_router(salas.router)
-router.include_router(ventas.router)
+app/main.py importa sólo los que monta; este paquete no registra nada al importarse.
+"""
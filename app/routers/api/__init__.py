@@ -11,6 +11,9 @@ from app.routers.api import horarios
 from app.routers.api import genre
 from app.routers.api import salas
 from app.routers.api import ventas
+from app.routers.api import cartelera
+from app.routers.api import reservas
+from app.routers.api import estadisticas
 from fastapi import APIRouter
 
 # router principal
@@ -24,3 +27,6 @@ router.include_router(salas.router)
 router.include_router(ventas.router)
 router.include_router(horarios.router)
 router.include_router(genre.router)
+router.include_router(cartelera.router)
+router.include_router(reservas.router)
+router.include_router(estadisticas.router)
@@ -0,0 +1,25 @@
+from fastapi import Depends, APIRouter
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app import queries
+from app.http_cache import condicional
+from app.paginacion import Pagina, paginacion
+from app.schemas import CarteleraResponse
+
+# Cartelera: una fila por sesión con película, género, sala y butacas libres.
+# Lee sólo la tabla cartelera_view, que mantienen los triggers de la migración v0005.
+router = APIRouter(prefix="/api/cartelera", tags=["cartelera"])
+
+
+# ETag / Last-Modified: la cartelera cambia con cualquiera de sus tablas de origen
+# (las reservas activas cuentan como vendidas, migración v0010)
+_CONDICIONAL = Depends(condicional("peliculas", "genres", "salas", "horarios", "ventas", "reservas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion(("", 0))
+
+
+#GET - cartelera ordenada por hora, paginada por (hora, horario_id)
+@router.get("", response_model=list[CarteleraResponse], dependencies=[_CONDICIONAL])
+def find_all(pagina: Pagina = Depends(_PAGINA), db: Session = Depends(get_db)):
+    filas = db.execute(queries.cartelera_pagina(*pagina.despues, pagina.limite + 1)).scalars().all()
+    return pagina.recortar(filas, lambda f: (f.hora, f.horario_id))
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, status
+from app.database import engine, read_engine
+from app.cache import catalogo_cache, html_cache, precios_cache
+from app.lazy_session import ESTADISTICAS_SESIONES
+from app.services.reservas import caducidad
+from app.templating import ESTADISTICAS_RENDER
+
+router = APIRouter(prefix="/api/estadisticas", tags=["estadisticas"])
+
+
+def _estado_pool(motor) -> dict:
+    pool = motor.pool
+    # los pools de SQLite en memoria no tienen tamaño fijo
+    if not hasattr(pool, "checkedout"):
+        return {"estado": pool.status()}
+    return {
+        "tamano": pool.size(),
+        "en_uso": pool.checkedout(),
+        "libres": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+# GET - uso de sesiones, conexiones del pool y cachés desde el arranque
+@router.get("")
+def find_all():
+    pools = {"escritura": _estado_pool(engine)}
+    if read_engine is not engine:
+        pools["lectura"] = _estado_pool(read_engine)
+    return {
+        "sesiones": ESTADISTICAS_SESIONES.snapshot(),
+        "pools": pools,
+        "cache_catalogo": catalogo_cache.stats(),
+        "cache_html": {**html_cache.stats(), **ESTADISTICAS_RENDER.snapshot()},
+        "cache_precios": precios_cache.stats(),
+        "reservas": caducidad.stats(),
+    }
+
+
+# DELETE - poner a cero los contadores
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+def reset():
+    ESTADISTICAS_SESIONES.reset()
+    catalogo_cache.reset_stats()
+    html_cache.reset_stats()
+    precios_cache.reset_stats()
+    ESTADISTICAS_RENDER.reset()
+    return None
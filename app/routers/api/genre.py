@@ -1,20 +1,30 @@
 from fastapi import Depends, HTTPException, status, APIRouter
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app import queries
+from app.http_cache import condicional
+from app.paginacion import Pagina, paginacion
+from app.services import catalogo
 from app.models import Genre
 from app.schemas import GenreResponse, GenreCreate, GenreUpdate, GenrePatch
 
 router = APIRouter(prefix="/api/genres",tags=["genres"])
 
-@router.get("", response_model=list[GenreResponse])
-def find_all(db:Session = Depends(get_db)):
-    return db.execute(select(Genre)).scalars().all()
 
-@router.get("/{id}", response_model=GenreResponse)
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional("genres"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+
+@router.get("", response_model=list[GenreResponse], dependencies=[_CONDICIONAL])
+def find_all(pagina: Pagina = Depends(_PAGINA), db:Session = Depends(get_db)):
+    genres = catalogo.genres_pagina(db, *pagina.despues, pagina.limite + 1)
+    return pagina.recortar(genres, lambda g: (g.id,))
+
+@router.get("/{id}", response_model=GenreResponse, dependencies=[_CONDICIONAL])
 def find_by_id(id:int, db:Session = Depends(get_db)):
     # aquí esta una de mis dudas... es genre o name_genre
-    genre = db.execute(select(Genre).where(Genre.id ==id)).scalar_one_or_none()
+    genre = catalogo.genre(db, id)
     
     if not genre:
         raise HTTPException(status_code= status.HTTP_404_NOT_FOUND, detail=f"No se ha encontrado el género con el id {id}")
@@ -36,7 +46,7 @@ def create(genre_dto: GenreCreate, db:Session = Depends(get_db)):
 def update_full(id: int, genre_dto:GenreUpdate, db: Session = Depends(get_db)):
     
     genre = db.execute(
-        select(Genre).where(Genre.id == id)
+        queries.por_id(Genre, id)
     ).scalar_one_or_none()
 
     if not genre:
@@ -48,18 +58,18 @@ def update_full(id: int, genre_dto:GenreUpdate, db: Session = Depends(get_db)):
     update_data = genre_dto.model_dump()
     
     for field, value in update_data.items():
-        setattr(name_genre, field, value)
+        setattr(genre, field, value)
         
     db.commit()
     db.refresh(genre)
-    return Genre
+    return genre
 
 #patch
 @router.patch("/{id}", response_model= GenreResponse)
 def update_partial(id: int, genre_dto: GenrePatch, db: Session = Depends(get_db)):
     
     genre = db.execute(
-        select(Genre).where(Genre.id ==id)
+        queries.por_id(Genre, id)
     ).scalar_one_or_none()
     
     if not genre:
@@ -82,7 +92,7 @@ def update_partial(id: int, genre_dto: GenrePatch, db: Session = Depends(get_db)
 def delete_by_id(id: int, db: Session = Depends(get_db)):
     
     genre = db.execute(
-        select(Genre).where(Genre.id == id)
+        queries.por_id(Genre, id)
     ).scalar_one_or_none()
     
     if not genre:
@@ -1,9 +1,17 @@
-from fastapi import Depends, HTTPException, status, APIRouter
-from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from fastapi import Depends, HTTPException, status, APIRouter, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import Horario
-from app.schemas import HorarioResponse, HorarioCreate, HorarioUpdate, HorarioPatch
+from app import queries
+from app.http_cache import condicional
+from app.lotes import LOTE_MAXIMO, comprobar_referencias, en_orden, insertar_lote, referencias_inexistentes
+from app.campos import Campos, campos
+from app.paginacion import Pagina, paginacion
+from app.streaming import ndjson
+from app.services import aforo, asientos, asignacion, precios
+from app.models import Horario, MetodoPago, Pelicula, SalaORM, Venta
+from app.schemas import HorarioResponse, HorarioCreate, HorarioUpdate, HorarioPatch, PlanoResponse, ReservaAsientos
+from app.schemas.venta import VentaResponse
 
 
 
@@ -12,11 +20,26 @@ from app.schemas import HorarioResponse, HorarioCreate, HorarioUpdate, HorarioPa
 router = APIRouter(prefix="/api/horarios", tags=["horarios"])
 
 
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional("horarios", "salas"))
+# el plano de butacas cambia con cada venta y cada reserva
+_CONDICIONAL_ASIENTOS = Depends(condicional("ventas", "reservas", "horarios", "salas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+# selección de campos ?fields=&exclude= (app/campos.py)
+_CAMPOS = campos(HorarioResponse)
+
 #GET-Obtener todas los horarios
-@router.get("", response_model=list[HorarioResponse])
-def find_all(db: Session = Depends(get_db)):
-    return db.execute(select(Horario).options(joinedload(Horario.sala))
-        ).scalars().unique().all()
+@router.get("", response_model=list[HorarioResponse], dependencies=[_CONDICIONAL])
+def find_all(pagina: Pagina = Depends(_PAGINA), sel: Campos = Depends(_CAMPOS), db: Session = Depends(get_db)):
+    # sin el campo sala no hace falta el JOIN con salas
+    stmt = (
+        queries.horarios_pagina(*pagina.despues, pagina.limite + 1) if sel.incluye("sala")
+        else queries.pagina(Horario, *pagina.despues, pagina.limite + 1)
+    )
+    horarios = db.execute(stmt).scalars().unique().all()
+    return sel.responder(pagina.recortar(horarios, lambda h: (h.id,)))
 
 #db.execute(): ejecuta la consulta
     #select(Song): crea consulta SELECT * FROM Song
@@ -24,13 +47,18 @@ def find_all(db: Session = Depends(get_db)):
     #.all(): obtiene los resultados como lista
 
 
+# GET - todos los horarios en NDJSON, uno por línea, sin paginar (app/streaming.py)
+# va antes de /{id} para que "stream" no se tome como id
+@router.get("/stream", response_class=StreamingResponse, dependencies=[_CONDICIONAL])
+def stream(response: Response, after: int = Query(0, ge=0, description="Empezar después de este id")):
+    return ndjson(queries.horarios_desde(after), HorarioResponse, response)
+
 #GET - Obtener un horario por id
 
-@router.get("/{id}",response_model=HorarioResponse)
-def find_by_id(id:int, db: Session = Depends(get_db)):
+@router.get("/{id}",response_model=HorarioResponse, dependencies=[_CONDICIONAL])
+def find_by_id(id:int, sel: Campos = Depends(_CAMPOS), db: Session = Depends(get_db)):
     horario = db.execute(
-        select(Horario).where(Horario.id == id)
-        .options(joinedload(Horario.sala))
+        queries.horario_por_id(id) if sel.incluye("sala") else queries.por_id(Horario, id)
     ).scalar_one_or_none()
     
     if not horario:
@@ -39,7 +67,70 @@ def find_by_id(id:int, db: Session = Depends(get_db)):
             detail=f"No se ha encontrado un horario con la id {id}"
         )
         
-    return horario
+    return sel.responder(horario)
+
+
+# GET - plano de butacas del horario (app/services/asientos.py)
+# sale de la copia en memoria del mapa de bits, sin consultar la base de datos
+@router.get("/{id}/asientos", response_model=PlanoResponse, dependencies=[_CONDICIONAL_ASIENTOS])
+def ver_asientos(id: int, db: Session = Depends(get_db)):
+    plano = asientos.plano(db, id)
+    return PlanoResponse(
+        horario_id=id,
+        filas=plano.filas,
+        butacas_por_fila=plano.butacas_por_fila,
+        libres=plano.total - plano.ocupadas(),
+        plano=[plano.fila(f) for f in range(plano.filas)],
+    )
+
+
+def _precio_o_404(db: Session, id: int) -> float:
+    precio = precios.precio_unitario(db, id)
+    if precio is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se ha encontrado un horario con la id {id}"
+        )
+    return precio
+
+
+def _vender_butacas(db: Session, id: int, precio: float, butacas: str, metodo_pago: MetodoPago) -> Venta:
+    # butacas ya marcadas en la transacción: inserta la venta y confirma
+    cantidad = butacas.count(",") + 1
+    venta = Venta(
+        horario_id=id,
+        precio_total=precios.precio_total(precio, cantidad),
+        cantidad=cantidad,
+        metodo_pago=metodo_pago,
+        asientos=butacas,
+    )
+    db.add(venta)
+    db.commit()
+    asientos.descartar(id)
+
+    return db.execute(queries.venta_por_id(venta.id)).scalar_one()
+
+
+# POST - comprar butacas concretas: todas o ninguna (409 si alguna ya está ocupada)
+@router.post("/{id}/asientos", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+def reservar_asientos(id: int, reserva: ReservaAsientos, db: Session = Depends(get_db)):
+    precio = _precio_o_404(db, id)
+    # marca las butacas y resta del aforo en la transacción de la venta
+    butacas = asientos.reclamar(db, id, reserva.asientos)
+    return _vender_butacas(db, id, precio, butacas, reserva.metodo_pago)
+
+
+# POST - comprar las mejores n butacas juntas (app/services/asignacion.py)
+@router.post("/{id}/allocate", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+def asignar_asientos(
+    id: int,
+    n: int = Query(..., ge=1, le=100, description="Butacas juntas"),
+    metodo_pago: MetodoPago = Query(MetodoPago.TARJETA),
+    db: Session = Depends(get_db),
+):
+    precio = _precio_o_404(db, id)
+    butacas = asignacion.asignar(db, id, n)
+    return _vender_butacas(db, id, precio, butacas, metodo_pago)
 
 
 #POST - Crear un nuevo horario
@@ -59,18 +150,35 @@ def create(horario_dto: HorarioCreate, db: Session = Depends(get_db)):
     db.refresh(horario)
     
     horario_con_sala = db.execute(
-        select(Horario)
-        .where(Horario.id == horario.id)
-        .options(joinedload(Horario.sala))
+        queries.horario_por_id(horario.id)
     ).scalar_one()
     
     return horario_con_sala
 
+#POST - Crear varios horarios en una sola transacción (app/lotes.py)
+@router.post("/batch", response_model=list[HorarioResponse], status_code=status.HTTP_201_CREATED)
+def create_batch(
+    horarios_dto: list[HorarioCreate] = Body(..., min_length=1, max_length=LOTE_MAXIMO),
+    db: Session = Depends(get_db),
+):
+    # una consulta por tabla para comprobar las referencias de todo el lote
+    peliculas = db.execute(queries.ids_existentes(Pelicula, list({h.pelicula_id for h in horarios_dto}))).scalars()
+    salas = db.execute(queries.ids_existentes(SalaORM, list({h.sala_id for h in horarios_dto}))).scalars()
+    comprobar_referencias(
+        referencias_inexistentes(horarios_dto, "pelicula_id", peliculas, "la película")
+        + referencias_inexistentes(horarios_dto, "sala_id", salas, "la sala")
+    )
+
+    ids = db.execute(insertar_lote(Horario), [h.model_dump() for h in horarios_dto]).scalars().all()
+    db.commit()
+
+    return en_orden(ids, db.execute(queries.horarios_por_ids(ids)).scalars().unique())
+
 #PUT - actualizar completamente un horario
 @router.put("/{id}", response_model=HorarioResponse)
 def update_full(id: int, horario_dto: HorarioUpdate, db: Session = Depends(get_db)):
     horario = db.execute(
-        select(Horario).where(Horario.id == id).options(joinedload(Horario.sala))
+        queries.horario_por_id(id)
     ).scalar_one_or_none()
     
     # si no existe, devuelve 404
@@ -81,14 +189,23 @@ def update_full(id: int, horario_dto: HorarioUpdate, db: Session = Depends(get_d
             detail=f"No se ha encontrado la canción con id {id}"
         )
         
+    # el mapa de butacas es del plano de la sala: no se cambia de sala con butacas vendidas
+    if horario_dto.sala_id != horario.sala_id and asientos.horario_con_asientos(db, id):
+        raise asientos.con_asientos_asignados(f"El horario {id}")
+
     # guarda el diccionario sacado de song_dto
     update_data = horario_dto.model_dump()
+    sala_anterior = horario.sala_id
     
    #bucle para asignar el valor del diccionario a cada atributo
         
     for field, value in update_data.items():
         setattr(horario, field, value)
-    
+
+    # en otra sala, las butacas ya vendidas o reservadas tienen que caber (app/services/aforo.py)
+    if horario.sala_id != sala_anterior:
+        aforo.comprobar_horario(db, id)
+
     db.commit()
     db.refresh(horario)
     return horario
@@ -99,8 +216,7 @@ def update_parcial(id:int, horario_dto: HorarioPatch, db: Session = Depends(get_
     # buscar el horario por id
     
     horario = db.execute(
-        select(Horario).where(Horario.id == id)
-        .options(joinedload(Horario.sala))
+        queries.horario_por_id(id)
     ).scalar_one_or_none()
     
     # si no existe, error 404
@@ -112,10 +228,20 @@ def update_parcial(id:int, horario_dto: HorarioPatch, db: Session = Depends(get_
         )
     
     update_data = horario_dto.model_dump(exclude_unset=True)
+
+    # el mapa de butacas es del plano de la sala: no se cambia de sala con butacas vendidas
+    if (update_data.get("sala_id", horario.sala_id) != horario.sala_id
+            and asientos.horario_con_asientos(db, id)):
+        raise asientos.con_asientos_asignados(f"El horario {id}")
     
+    sala_anterior = horario.sala_id
     for field, value in update_data.items():
         setattr(horario, field, value)
-        
+
+    # en otra sala, las butacas ya vendidas o reservadas tienen que caber (app/services/aforo.py)
+    if horario.sala_id != sala_anterior:
+        aforo.comprobar_horario(db, id)
+
     db.commit()
     db.refresh(horario)
     return horario
@@ -126,7 +252,7 @@ def update_parcial(id:int, horario_dto: HorarioPatch, db: Session = Depends(get_
 def delete_by_id(id: int, db: Session= Depends(get_db)):
     #busca el horario por id
     horario = db.execute(
-        select(Horario).where(Horario.id == id)
+        queries.por_id(Horario, id)
     ).scalar_one_or_none()
     
     #si no existe, error 404
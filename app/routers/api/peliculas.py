@@ -1,28 +1,68 @@
-from fastapi import Depends, HTTPException, status, APIRouter
-from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from typing import Any
+from fastapi import Depends, File, HTTPException, status, APIRouter, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 from app.database import get_db
+from app import queries
+from app.http_cache import condicional
+from app.campos import Campos, campos
+from app.paginacion import Pagina, paginacion
+from app.services import catalogo, exportacion, importacion
 from app.models import Pelicula
-from app.schemas import PeliculaResponse, PeliculaCreate, PeliculaPatch, PeliculaUpdate
+from app.schemas import ImportacionResponse, PeliculaResponse, PeliculaCreate, PeliculaPatch, PeliculaUpdate
 #crear router para endpoints
 router = APIRouter(prefix="/api/peliculas", tags=["peliculas"])
 
 
 
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional("peliculas", "genres"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+# selección de campos ?fields=&exclude= (app/campos.py)
+_CAMPOS = campos(PeliculaResponse)
+
 #GET-Obtener todas los peliculas
-@router.get("", response_model=list[PeliculaResponse])
-def find_all(db: Session = Depends(get_db)):
-    return db.execute(select(Pelicula).options(joinedload(Pelicula.genero))
-        ).scalars().unique().all()
+@router.get("", response_model=list[PeliculaResponse], dependencies=[_CONDICIONAL])
+def find_all(pagina: Pagina = Depends(_PAGINA), sel: Campos = Depends(_CAMPOS), db: Session = Depends(get_db)):
+    # el género ya viene en la caché del catálogo: ?fields= sólo reduce la respuesta
+    peliculas = catalogo.peliculas_pagina(db, *pagina.despues, pagina.limite + 1)
+    return sel.responder(pagina.recortar(peliculas, lambda p: (p.id,)))
+
+# GET - catálogo en CSV o JSON, por lotes y con gzip si el cliente lo acepta
+# (app/services/exportacion.py). Filtros: ?q=&genero_id=&duracion_max=&disponible=
+@router.get("/export/csv", response_class=StreamingResponse)
+def export_csv(request: Request, filtros: list = Depends(exportacion.filtros)):
+    return exportacion.csv(request, filtros)
+
+@router.get("/export/json", response_class=StreamingResponse)
+def export_json(request: Request, filtros: list = Depends(exportacion.filtros)):
+    return exportacion.json(request, filtros)
+
+# POST - importar películas: inserta las nuevas y actualiza por título las que
+# ya existen; las filas con errores se devuelven y no impiden importar el resto
+# (app/services/importacion.py)
+@router.post("/import", response_model=ImportacionResponse)
+def importar(filas: list[Any], db: Session = Depends(get_db)):
+    return importacion.importar(db, filas)
+
+# POST - importar un fichero CSV (con las columnas de /export/csv) o una lista
+# JSON. Se lee sin cargarlo entero; si está mal formado responde 400 y no se
+# importa nada
+@router.post("/import/csv", response_model=ImportacionResponse)
+def importar_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return importacion.importar_fichero(db, importacion.filas_csv(file.file))
+
+@router.post("/import/json", response_model=ImportacionResponse)
+def importar_json(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    return importacion.importar_fichero(db, importacion.filas_json(file.file))
 
 #GET - Obtener una pelicula por id
 
-@router.get("/{id}",response_model=PeliculaResponse)
-def find_by_id(id:int, db: Session = Depends(get_db)):
-    pelicula = db.execute(
-        select(Pelicula).where(Pelicula.id == id)
-        .options(joinedload(Pelicula.genero))
-    ).scalar_one_or_none()
+@router.get("/{id}",response_model=PeliculaResponse, dependencies=[_CONDICIONAL])
+def find_by_id(id:int, sel: Campos = Depends(_CAMPOS), db: Session = Depends(get_db)):
+    pelicula = catalogo.pelicula(db, id)
     
     if not pelicula:
         raise HTTPException(
@@ -30,14 +70,14 @@ def find_by_id(id:int, db: Session = Depends(get_db)):
             detail=f"No se ha encontrado una pelicula con la id {id}"
         )
         
-    return pelicula
+    return sel.responder(pelicula)
 
 #POST - Crear un nuevo pelicula
 @router.post("", response_model=PeliculaResponse, status_code=status.HTTP_201_CREATED)
 def create(pelicula_dto: PeliculaCreate, db: Session = Depends(get_db)):
 
     #Crear el objeto pelicula
-    pelicula = pelicula(
+    pelicula = Pelicula(
         titulo=pelicula_dto.titulo,
         genero_id=pelicula_dto.genero_id,
         duracion=pelicula_dto.duracion,
@@ -49,9 +89,7 @@ def create(pelicula_dto: PeliculaCreate, db: Session = Depends(get_db)):
     db.refresh(pelicula)
     
     pelicula_con_genero = db.execute(
-        select(Pelicula)
-        .where(Pelicula.id == Pelicula.id)
-        .options(joinedload(Pelicula.genero))
+        queries.pelicula_por_id(pelicula.id)
     ).scalar_one()
     
     return pelicula_con_genero
@@ -60,7 +98,7 @@ def create(pelicula_dto: PeliculaCreate, db: Session = Depends(get_db)):
 @router.put("/{id}", response_model=PeliculaResponse)
 def update_full(id: int, pelicula_dto: PeliculaUpdate, db: Session = Depends(get_db)):
     pelicula = db.execute(
-        select(Pelicula).where(Pelicula.id == id).options(joinedload(Pelicula.genero))
+        queries.pelicula_por_id(id)
     ).scalar_one_or_none()
     
     # si no existe, devuelve 404
@@ -89,8 +127,7 @@ def update_parcial(id:int, pelicula_dto: PeliculaPatch, db: Session = Depends(ge
     # buscar el pelicula por id
     
     pelicula = db.execute(
-        select(pelicula).where(Pelicula.id == id)
-        .options(joinedload(Pelicula.genero))
+        queries.pelicula_por_id(id)
     ).scalar_one_or_none()
     
     # si no existe, error 404
@@ -116,7 +153,7 @@ def update_parcial(id:int, pelicula_dto: PeliculaPatch, db: Session = Depends(ge
 def delete_by_id(id: int, db: Session= Depends(get_db)):
     #busca el pelicula por id
     pelicula = db.execute(
-        select(Pelicula).where(Pelicula.id == id)
+        queries.por_id(Pelicula, id)
     ).scalar_one_or_none()
     
     #si no existe, error 404
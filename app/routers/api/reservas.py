@@ -0,0 +1,52 @@
+import time
+from fastapi import status, Depends, APIRouter
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app import queries
+from app.models import Reserva
+from app.schemas import ReservaConfirmar, ReservaCreate, ReservaResponse
+from app.schemas.venta import VentaResponse
+from app.services import asientos, precios, reservas
+
+# reservas temporales de butacas antes del pago (app/services/reservas.py)
+router = APIRouter(
+    prefix="/api/reservas",
+    tags=["reservas"]
+    )
+
+
+# GET - una reserva activa (404 si ya ha caducado)
+@router.get("/{id}", response_model=ReservaResponse)
+def find_by_id(id: int, db: Session = Depends(get_db)):
+    reserva = db.execute(queries.por_id(Reserva, id)).scalar_one_or_none()
+    if reserva is None or reserva.expira_en <= time.time():
+        raise reservas.no_encontrada(id)
+    return reserva
+
+# POST - retener butacas (una cantidad o butacas concretas) durante settings.reserva_segundos
+@router.post("", response_model=ReservaResponse, status_code=status.HTTP_201_CREATED)
+def create(reserva_dto: ReservaCreate, db: Session = Depends(get_db)):
+    if precios.precio_unitario(db, reserva_dto.horario_id) is None:
+        raise precios.horario_inexistente(reserva_dto.horario_id)
+
+    # resta las butacas del aforo (y las marca en el plano) en la transacción de la reserva
+    reserva = reservas.crear(db, reserva_dto)
+    db.commit()
+    reservas.programar(reserva) # caduca sola a los reserva_segundos
+    return reserva
+
+# POST - pagar: la reserva se convierte en una venta con las mismas butacas
+@router.post("/{id}/confirmar", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+def confirmar(id: int, pago: ReservaConfirmar, db: Session = Depends(get_db)):
+    venta = reservas.confirmar(db, id, pago.metodo_pago)
+    db.commit()
+    return db.execute(queries.venta_por_id(venta.id)).scalar_one()
+
+# DELETE - cancelar: las butacas vuelven a estar a la venta
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancelar(id: int, db: Session = Depends(get_db)):
+    fila = reservas.cancelar(db, id)
+    db.commit()
+    if fila.asientos:
+        asientos.descartar(fila.horario_id)
+    return None
@@ -1,23 +1,30 @@
 from fastapi import Depends, HTTPException, status, APIRouter
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from app.database import get_db
+from app import queries
+from app.http_cache import condicional
+from app.paginacion import Pagina, paginacion
+from app.services import aforo, asientos, catalogo
 from app.models import SalaORM
 from app.schemas import SalaResponse, SalaCreate, SalaUpdate
 
 # Crear router para endpoints
 router = APIRouter(prefix="/api/salas", tags=["salas"]) 
 
-@router.get("/salas", response_model=list[SalaResponse])
-def obtener_salas(db: Session = Depends(get_db)):
-    salas = db.execute(select(SalaORM)).scalars().all()
-    return salas
 
-@router.get("/salas/{sala_id}", response_model=SalaResponse)
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional("salas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+
+@router.get("/salas", response_model=list[SalaResponse], dependencies=[_CONDICIONAL])
+def obtener_salas(pagina: Pagina = Depends(_PAGINA), db: Session = Depends(get_db)):
+    salas = catalogo.salas_pagina(db, *pagina.despues, pagina.limite + 1)
+    return pagina.recortar(salas, lambda s: (s.id,))
+
+@router.get("/salas/{sala_id}", response_model=SalaResponse, dependencies=[_CONDICIONAL])
 def obtener_sala(sala_id: int, db: Session = Depends(get_db)):
-    sala = db.execute(
-        select(SalaORM).where(SalaORM.id == sala_id)
-        ).scalar_one_or_none()
+    sala = catalogo.sala(db, sala_id)
     if sala is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,  detail="Sala no encontrada")
     return sala 
@@ -26,7 +33,7 @@ def obtener_sala(sala_id: int, db: Session = Depends(get_db)):
 def crear_sala(sala: SalaCreate, db: Session = Depends(get_db)):
     #if existe ya la sala es un error
     if db.execute(
-        select(SalaORM).where(SalaORM.nombre == sala.nombre)
+        queries.sala_por_nombre(sala.nombre)
         ).scalar_one_or_none() is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ya existe una sala con ese nombre")
     
@@ -44,16 +51,27 @@ def crear_sala(sala: SalaCreate, db: Session = Depends(get_db)):
 @router.patch("/salas/{sala_id}", response_model=SalaResponse)
 def actualizar_sala(sala_id: int, sala: SalaUpdate, db: Session =  Depends(get_db)):
     sala_existente = db.execute(
-        select(SalaORM).where(SalaORM.id == sala_id)
+        queries.por_id(SalaORM, sala_id)
         ).scalar_one_or_none()
     if sala_existente is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sala no encontrada")
+
+    # PATCH: sólo los campos enviados; el plano y la capacidad se comprueban
+    # con los que quedan. Los mapas de butacas de sus horarios dependen del
+    # plano (app/services/asientos.py)
+    cambios = sala.model_dump(exclude_unset=True)
+    if asientos.cambia_plano(sala_existente, cambios) and asientos.sala_con_asientos(db, sala_id):
+        raise asientos.con_asientos_asignados(f"La sala {sala_id}")
     
-    update_data = sala.model_dump()
+    capacidad_anterior = sala_existente.capacidad
     
-    for field, value in update_data.items():
+    for field, value in cambios.items():
         setattr(sala_existente, field, value)
-    
+
+    # con menos capacidad, las butacas ya vendidas o reservadas tienen que caber (app/services/aforo.py)
+    if sala_existente.capacidad is not None and sala_existente.capacidad < capacidad_anterior:
+        aforo.comprobar_sala(db, sala_id)
+
     db.commit()
     db.refresh(sala_existente)
     return sala_existente
@@ -61,7 +79,7 @@ def actualizar_sala(sala_id: int, sala: SalaUpdate, db: Session =  Depends(get_d
 @router.delete("/salas/{sala_id}", status_code=status.HTTP_204_NO_CONTENT)
 def eliminar_sala(sala_id: int, db: Session = Depends(get_db)):
     sala_existente = db.execute(
-        select(SalaORM).where(SalaORM.id == sala_id)
+        queries.por_id(SalaORM, sala_id)
         ).scalar_one_or_none()
     if sala_existente is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sala no encontrada")
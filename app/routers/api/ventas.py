@@ -1,33 +1,64 @@
+from collections import Counter
 from app.schemas.venta import VentaResponse, VentaCreate, VentaUpdate, VentaPatch
-from fastapi import HTTPException,status,Depends,APIRouter
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from fastapi import HTTPException,status,Depends,APIRouter, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 from app.models.venta import Venta
 from app.database import get_db
+from app import queries
+from app.http_cache import condicional
+from app.lotes import LOTE_MAXIMO, comprobar_referencias, en_orden, insertar_lote, referencias_inexistentes
+from app.campos import Campos, campos
+from app.paginacion import Pagina, paginacion
+from app.streaming import ndjson
+from app.services import aforo, asientos, precios
+from app.services.venta_writer import venta_write_queue
+from app.settings import settings
 
 router = APIRouter(
     prefix="/api/ventas",
     tags=["ventas"]
     )
 
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional("ventas", "horarios", "salas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+# selección de campos ?fields=&exclude= (app/campos.py)
+_CAMPOS = campos(VentaResponse)
+
 # ENDPOINTS CRUD
 
 # GET - obtener TODAS las ventas
-@router.get("", response_model=list[VentaResponse])
-def find_all(db: Session = Depends(get_db)):
+@router.get("", response_model=list[VentaResponse], dependencies=[_CONDICIONAL])
+def find_all(pagina: Pagina = Depends(_PAGINA), sel: Campos = Depends(_CAMPOS), db: Session = Depends(get_db)):
     # db.execute(): ejecuta la consulta
-    # select(Venta): crea consulta SELECT * FROM venta
+    # ventas_pagina: SELECT ... WHERE id > after ORDER BY id LIMIT limite + 1
+    #   (sin el campo horario, pagina(): la misma consulta sin JOIN con horarios y salas)
     # .scarlars(): extrae los objetos Venta
-    # .all(): obtiene los resultados como lista
-    return db.execute(select(Venta).options(joinedload(Venta.horario))).scalars().unique().all()
+    # recortar(): deja limite ventas y añade el cursor de la página siguiente
+    # responder(): aplica ?fields= / ?exclude=
+    stmt = (
+        queries.ventas_pagina(*pagina.despues, pagina.limite + 1) if sel.incluye("horario")
+        else queries.pagina(Venta, *pagina.despues, pagina.limite + 1)
+    )
+    ventas = db.execute(stmt).scalars().unique().all()
+    return sel.responder(pagina.recortar(ventas, lambda v: (v.id,)))
+
+# GET - todas las ventas en NDJSON, una por línea, sin paginar (app/streaming.py)
+# va antes de /{id} para que "stream" no se tome como id
+@router.get("/stream", response_class=StreamingResponse, dependencies=[_CONDICIONAL])
+def stream(response: Response, after: int = Query(0, ge=0, description="Empezar después de este id")):
+    return ndjson(queries.ventas_desde(after), VentaResponse, response)
+
 # GET - obtener UNA venta por id
-@router.get("/{id}", response_model=VentaResponse)
-def find_by_id(id: int, db: Session = Depends(get_db)):
+@router.get("/{id}", response_model=VentaResponse, dependencies=[_CONDICIONAL])
+def find_by_id(id: int, sel: Campos = Depends(_CAMPOS), db: Session = Depends(get_db)):
     # busca la venta con el id de la ruta
     # .scalar_one_or_none(): devuelve el objeto o None si no existe
     venta = db.execute(
-        select(Venta).where(Venta.id == id)
-        .options(joinedload(Venta.horario))
+        queries.venta_por_id(id) if sel.incluye("horario") else queries.por_id(Venta, id)
     ).scalar_one_or_none()
     
     if not venta:
@@ -35,41 +66,85 @@ def find_by_id(id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No se ha encontrado la venta con id {id}"
         )
-    return venta
+    return sel.responder(venta)
 
 # POST - crear una nueva venta
 @router.post("", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
 def create(venta_dto: VentaCreate, db: Session = Depends(get_db)):
-    # TODO: obtener precio_unitario a partir de horario_id
-    precio_total = 8 * venta_dto.cantidad
+    # precio de la sala del horario: sale de la tabla de precios en memoria
+    # (app/services/precios.py), sin consultar la base de datos
+    precio = precios.precio_unitario(db, venta_dto.horario_id)
+    if precio is None:
+        raise precios.horario_inexistente(venta_dto.horario_id)
+    
+    datos = {
+        "horario_id": venta_dto.horario_id,
+        "precio_total": precios.precio_total(precio, venta_dto.cantidad),
+        "cantidad": venta_dto.cantidad,
+        "metodo_pago": venta_dto.metodo_pago,
+    }
+    
+    # con group commit la venta se confirma junto a las de otras peticiones
+    # en una sola transacción del escritor único (app/services/venta_writer.py)
+    if settings.ventas_group_commit:
+        return venta_write_queue.submit(datos).result()
+    
+    # resta las butacas del aforo en la misma transacción que la venta:
+    # 409 si no quedan (app/services/aforo.py)
+    aforo.reservar_o_409(db, venta_dto.horario_id, venta_dto.cantidad)
     
     # Crea objeto venta con datos validados
-    venta= Venta(
-        horario_id=venta_dto.horario_id,
-        precio_total=precio_total,
-        cantidad=venta_dto.cantidad,
-        metodo_pago=venta_dto.metodo_pago
-    )
+    venta= Venta(**datos)
     
     db.add(venta) # Agrega el objeto a la sesion
     db.commit() # confirma la creación en base de datos
     db.refresh(venta) # refresca el objeto para obtener el id generado
     
     venta_with_horario = db.execute(
-        select(Venta)
-        .where(Venta.id == venta.id)
-        .options(joinedload(Venta.horario))
+        queries.venta_por_id(venta.id)
     ).scalar_one()
     
     return venta_with_horario
 
+# POST - crear varias ventas en una sola transacción (app/lotes.py)
+# no pasa por la cola de group commit: el lote ya es un único commit
+@router.post("/batch", response_model=list[VentaResponse], status_code=status.HTTP_201_CREATED)
+def create_batch(
+    ventas_dto: list[VentaCreate] = Body(..., min_length=1, max_length=LOTE_MAXIMO),
+    db: Session = Depends(get_db),
+):
+    # los horarios sin precio son los que no existen
+    precio_por_horario = precios.precios_unitarios(db, (v.horario_id for v in ventas_dto))
+    comprobar_referencias(referencias_inexistentes(ventas_dto, "horario_id", precio_por_horario, "el horario"))
+
+    # un UPDATE condicional por horario con las butacas de todo el lote
+    butacas = Counter()
+    for v in ventas_dto:
+        butacas[v.horario_id] += v.cantidad
+    for horario_id, n in butacas.items():
+        aforo.reservar_o_409(db, horario_id, n)
+
+    filas = [
+        {
+            "horario_id": v.horario_id,
+            "precio_total": precios.precio_total(precio_por_horario[v.horario_id], v.cantidad),
+            "cantidad": v.cantidad,
+            "metodo_pago": v.metodo_pago,
+        }
+        for v in ventas_dto
+    ]
+    ids = db.execute(insertar_lote(Venta), filas).scalars().all()
+    db.commit()
+
+    return en_orden(ids, db.execute(queries.ventas_por_ids(ids)).scalars().unique())
+
 # PUT -actualizar COMPLETAMENTE una venta
 @router.put("/{id}", response_model=VentaResponse)
 def update_full(id: int, venta_dto: VentaUpdate, db: Session = Depends(get_db)):
     
     # Busca la venta por id
     venta=db.execute(
-        select(Venta).where(Venta.id==id).options(joinedload(Venta.horario))
+        queries.venta_por_id(id)
     ).scalar_one_or_none()
     
 
@@ -80,15 +155,27 @@ def update_full(id: int, venta_dto: VentaUpdate, db: Session = Depends(get_db)):
             detail=f"No se ha encontrado la venta con id {id}"
         )
     
+    # precio de la sala del nuevo horario (app/services/precios.py)
+    precio = precios.precio_unitario(db, venta_dto.horario_id)
+    if precio is None:
+        raise precios.horario_inexistente(venta_dto.horario_id)
+
+    # las butacas elegidas en el plano no se mueven de horario (app/services/asientos.py)
+    if venta.asientos and (venta_dto.horario_id, venta_dto.cantidad) != (venta.horario_id, venta.cantidad):
+        raise asientos.venta_con_asientos(id)
+
+    # devuelve las butacas de la venta y reserva las nuevas (409 si no caben)
+    aforo.liberar(db, venta.horario_id, venta.cantidad)
+    aforo.reservar_o_409(db, venta_dto.horario_id, venta_dto.cantidad)
+
     # guarda el diccionario sacado de song_dto
-    update_data = venta_dto.model_dump()
+    # (sin precio_total: el precio lo pone el servidor, no el cliente)
+    update_data = venta_dto.model_dump(exclude={"precio_total"})
     
     # bucle para asignar el valor del diccionario a cada atributo
     for field, value in update_data.items():
         setattr(venta, field, value)
-    # Crea objeto venta con datos validados
-    # TODO: calcular precio REAL según base de datos de horarios
-    venta.precio_total = 8 * venta.cantidad  
+    venta.precio_total = precios.precio_total(precio, venta.cantidad)
     db.commit() # confirma la creación en base de datos
     db.refresh(venta) # refresca el objeto para obtener el id generado
     return venta # devuelve la venta creada    
@@ -98,8 +185,7 @@ def update_full(id: int, venta_dto: VentaUpdate, db: Session = Depends(get_db)):
 def update_venta(id: int, venta_dto: VentaPatch, db: Session = Depends(get_db)):
     # Busca la venta por id
     venta=db.execute(
-        select(Venta).where(Venta.id==id)
-        .options(joinedload(Venta.horario))
+        queries.venta_por_id(id)
     ).scalar_one_or_none()
 
 # Si no existe
@@ -109,15 +195,27 @@ def update_venta(id: int, venta_dto: VentaPatch, db: Session = Depends(get_db)):
             detail=f"No se ha encontrado la venta con id {id}"
         )
 # 2. Extraer solo los campos enviados en el PATCH
-    update_data = venta_dto.model_dump(exclude_unset=True)
+    # (sin precio_total: el precio lo pone el servidor, no el cliente)
+    update_data = venta_dto.model_dump(exclude_unset=True, exclude={"precio_total"})
 
-    # 3. Actualizar SOLO esos campos
+    # 3. Recalcular el precio si cambia el horario o la cantidad
+    if "horario_id" in update_data or "cantidad" in update_data:
+        horario_id = update_data.get("horario_id", venta.horario_id)
+        cantidad = update_data.get("cantidad", venta.cantidad)
+        # las butacas elegidas en el plano no se mueven de horario (app/services/asientos.py)
+        if venta.asientos and (horario_id, cantidad) != (venta.horario_id, venta.cantidad):
+            raise asientos.venta_con_asientos(id)
+        precio = precios.precio_unitario(db, horario_id)
+        if precio is None:
+            raise precios.horario_inexistente(horario_id)
+        # devuelve las butacas de la venta y reserva las nuevas (409 si no caben)
+        aforo.liberar(db, venta.horario_id, venta.cantidad)
+        aforo.reservar_o_409(db, horario_id, cantidad)
+        venta.precio_total = precios.precio_total(precio, cantidad)
+
+    # 4. Actualizar SOLO esos campos
     for attr, value in update_data.items():
         setattr(venta, attr, value)
-        
-    if "horario_id" in update_data or "cantidad" in update_data:
-    # TODO: obtener precio_unitario real a partir de horario_id
-        venta.precio_total = 8 * venta.cantidad    
      
     db.commit() # confirma la creación en base de datos
     db.refresh(venta) # refresca el objeto para obtener el id generado
@@ -129,7 +227,7 @@ def borrar_venta(id: int, db: Session = Depends(get_db)):
     # busca la venta con el id de la ruta
     # .scalar_one_or_none(): devuelve el objeto o None si no existe
     venta = db.execute(
-        select(Venta).where(Venta.id == id)
+        queries.por_id(Venta, id)
     ).scalar_one_or_none()
     
     if not venta:
@@ -137,6 +235,12 @@ def borrar_venta(id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No se ha encontrado la venta con id {id}"
         )
+    aforo.liberar(db, venta.horario_id, venta.cantidad) # devuelve sus butacas al aforo
+    horario_id, butacas = venta.horario_id, venta.asientos
+    if butacas:
+        asientos.liberar(db, horario_id, butacas) # y las deja libres en el plano
     db.delete(venta) # Borra la venta por id
     db.commit() # confirma que hemos borrado la venta
+    if butacas:
+        asientos.descartar(horario_id)
     return None # No devuelve nada porque está borrado  
\ No newline at end of file
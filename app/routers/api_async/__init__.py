@@ -0,0 +1,27 @@
+"""
+Routers de API REST asíncronos
+Mismos endpoints que app/routers/api pero con async def y AsyncSession (aiosqlite).
+Se montan en lugar de los síncronos con CARTELERA_API_STACK=async
+"""
+
+from app.routers.api_async import peliculas
+from app.routers.api_async import horarios
+from app.routers.api_async import genre
+from app.routers.api_async import salas
+from app.routers.api_async import ventas
+from app.routers.api_async import cartelera
+from app.routers.api_async import reservas
+from app.routers.api import estadisticas  # no usa la base de datos: vale el mismo
+from fastapi import APIRouter
+
+# router principal
+router = APIRouter()
+
+router.include_router(peliculas.router)
+router.include_router(salas.router)
+router.include_router(ventas.router)
+router.include_router(horarios.router)
+router.include_router(genre.router)
+router.include_router(cartelera.router)
+router.include_router(reservas.router)
+router.include_router(estadisticas.router)
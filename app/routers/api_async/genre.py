@@ -0,0 +1,103 @@
+from fastapi import Depends, HTTPException, status, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app import queries
+from app.http_cache import condicional_async
+from app.paginacion import Pagina, paginacion
+from app.services import catalogo
+from app.models import Genre
+from app.schemas import GenreResponse, GenreCreate, GenreUpdate, GenrePatch
+
+router = APIRouter(prefix="/api/genres",tags=["genres"])
+
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional_async("genres"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+
+@router.get("", response_model=list[GenreResponse], dependencies=[_CONDICIONAL])
+async def find_all(pagina: Pagina = Depends(_PAGINA), db: AsyncSession = Depends(get_async_db)):
+    genres = await catalogo.genres_pagina_async(db, *pagina.despues, pagina.limite + 1)
+    return pagina.recortar(genres, lambda g: (g.id,))
+
+@router.get("/{id}", response_model=GenreResponse, dependencies=[_CONDICIONAL])
+async def find_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
+    genre = await catalogo.genre_async(db, id)
+
+    if not genre:
+        raise HTTPException(status_code= status.HTTP_404_NOT_FOUND, detail=f"No se ha encontrado el género con el id {id}")
+    return genre
+
+# POST
+@router.post("", response_model=GenreResponse, status_code=status.HTTP_201_CREATED)
+async def create(genre_dto: GenreCreate, db: AsyncSession = Depends(get_async_db)):
+    genre = Genre(
+        name_genre= genre_dto.name_genre
+    )
+
+    db.add(genre)
+    await db.commit()
+    await db.refresh(genre)
+    return genre
+
+#put
+@router.put("/{id}", response_model=GenreResponse)
+async def update_full(id: int, genre_dto: GenreUpdate, db: AsyncSession = Depends(get_async_db)):
+    genre = (await db.execute(
+        queries.por_id(Genre, id)
+    )).scalar_one_or_none()
+
+    if not genre:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se ha encontrado el género id {id}"
+        )
+
+    update_data = genre_dto.model_dump()
+
+    for field, value in update_data.items():
+        setattr(genre, field, value)
+
+    await db.commit()
+    await db.refresh(genre)
+    return genre
+
+#patch
+@router.patch("/{id}", response_model= GenreResponse)
+async def update_partial(id: int, genre_dto: GenrePatch, db: AsyncSession = Depends(get_async_db)):
+    genre = (await db.execute(
+        queries.por_id(Genre, id)
+    )).scalar_one_or_none()
+
+    if not genre:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se ha encontrado el género con id {id}"
+        )
+
+    update_data = genre_dto.model_dump(exclude_unset=True)
+
+    for field, value in update_data.items():
+        setattr(genre, field, value)
+
+    await db.commit()
+    await db.refresh(genre)
+    return genre
+
+# DELETE
+@router.delete("/{id}", status_code= status.HTTP_204_NO_CONTENT)
+async def delete_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
+    genre = (await db.execute(
+        queries.por_id(Genre, id)
+    )).scalar_one_or_none()
+
+    if not genre:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No se ha encontrado el género con id {id}"
+        )
+
+    await db.delete(genre)
+    await db.commit()
+    return None
@@ -0,0 +1,241 @@
+from fastapi import Depends, HTTPException, status, APIRouter, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app import queries
+from app.http_cache import condicional_async
+from app.lotes import LOTE_MAXIMO, comprobar_referencias, en_orden, insertar_lote, referencias_inexistentes
+from app.campos import Campos, campos
+from app.paginacion import Pagina, paginacion
+from app.streaming import ndjson_async
+from app.services import aforo, asientos, asignacion, precios
+from app.models import Horario, MetodoPago, Pelicula, SalaORM, Venta
+from app.schemas import HorarioResponse, HorarioCreate, HorarioUpdate, HorarioPatch, PlanoResponse, ReservaAsientos
+from app.schemas.venta import VentaResponse
+
+
+#crear router para endpoints
+
+router = APIRouter(prefix="/api/horarios", tags=["horarios"])
+
+
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional_async("horarios", "salas"))
+# el plano de butacas cambia con cada venta y cada reserva
+_CONDICIONAL_ASIENTOS = Depends(condicional_async("ventas", "reservas", "horarios", "salas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+# selección de campos ?fields=&exclude= (app/campos.py)
+_CAMPOS = campos(HorarioResponse)
+
+# con AsyncSession no hay lazy loading: la sala se carga siempre en la misma consulta
+async def _get_horario(db: AsyncSession, id: int) -> Horario | None:
+    result = await db.execute(
+        queries.horario_por_id(id),
+        # en execute(), no en la sentencia: .execution_options() sobre un lambda_stmt
+        # devuelve el select ya resuelto con el id de la primera llamada
+        execution_options={"populate_existing": True},
+    )
+    return result.scalar_one_or_none()
+
+
+def _not_found(id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"No se ha encontrado un horario con la id {id}"
+    )
+
+
+#GET-Obtener todas los horarios
+@router.get("", response_model=list[HorarioResponse], dependencies=[_CONDICIONAL])
+async def find_all(pagina: Pagina = Depends(_PAGINA), sel: Campos = Depends(_CAMPOS), db: AsyncSession = Depends(get_async_db)):
+    # sin el campo sala no hace falta el JOIN con salas
+    stmt = (
+        queries.horarios_pagina(*pagina.despues, pagina.limite + 1) if sel.incluye("sala")
+        else queries.pagina(Horario, *pagina.despues, pagina.limite + 1)
+    )
+    result = await db.execute(stmt)
+    return sel.responder(pagina.recortar(result.scalars().unique().all(), lambda h: (h.id,)))
+
+
+# GET - todos los horarios en NDJSON, uno por línea, sin paginar (app/streaming.py)
+# va antes de /{id} para que "stream" no se tome como id
+@router.get("/stream", response_class=StreamingResponse, dependencies=[_CONDICIONAL])
+async def stream(response: Response, after: int = Query(0, ge=0, description="Empezar después de este id")):
+    return ndjson_async(queries.horarios_desde(after), HorarioResponse, response)
+
+#GET - Obtener un horario por id
+@router.get("/{id}",response_model=HorarioResponse, dependencies=[_CONDICIONAL])
+async def find_by_id(id:int, sel: Campos = Depends(_CAMPOS), db: AsyncSession = Depends(get_async_db)):
+    if sel.incluye("sala"):
+        horario = await _get_horario(db, id)
+    else:
+        horario = (await db.execute(queries.por_id(Horario, id))).scalar_one_or_none()
+
+    if not horario:
+        raise _not_found(id)
+
+    return sel.responder(horario)
+
+
+# GET - plano de butacas del horario (app/services/asientos.py)
+# sale de la copia en memoria del mapa de bits, sin consultar la base de datos
+@router.get("/{id}/asientos", response_model=PlanoResponse, dependencies=[_CONDICIONAL_ASIENTOS])
+async def ver_asientos(id: int, db: AsyncSession = Depends(get_async_db)):
+    plano = await asientos.plano_async(db, id)
+    return PlanoResponse(
+        horario_id=id,
+        filas=plano.filas,
+        butacas_por_fila=plano.butacas_por_fila,
+        libres=plano.total - plano.ocupadas(),
+        plano=[plano.fila(f) for f in range(plano.filas)],
+    )
+
+
+async def _precio_o_404(db: AsyncSession, id: int) -> float:
+    precio = await precios.precio_unitario_async(db, id)
+    if precio is None:
+        raise _not_found(id)
+    return precio
+
+
+async def _vender_butacas(db: AsyncSession, id: int, precio: float, butacas: str, metodo_pago: MetodoPago) -> Venta:
+    # butacas ya marcadas en la transacción: inserta la venta y confirma
+    cantidad = butacas.count(",") + 1
+    venta = Venta(
+        horario_id=id,
+        precio_total=precios.precio_total(precio, cantidad),
+        cantidad=cantidad,
+        metodo_pago=metodo_pago,
+        asientos=butacas,
+    )
+    db.add(venta)
+    await db.commit()
+    asientos.descartar(id)
+
+    result = await db.execute(queries.venta_por_id(venta.id))
+    return result.scalar_one()
+
+
+# POST - comprar butacas concretas: todas o ninguna (409 si alguna ya está ocupada)
+@router.post("/{id}/asientos", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+async def reservar_asientos(id: int, reserva: ReservaAsientos, db: AsyncSession = Depends(get_async_db)):
+    precio = await _precio_o_404(db, id)
+    # marca las butacas y resta del aforo en la transacción de la venta
+    butacas = await asientos.reclamar_async(db, id, reserva.asientos)
+    return await _vender_butacas(db, id, precio, butacas, reserva.metodo_pago)
+
+
+# POST - comprar las mejores n butacas juntas (app/services/asignacion.py)
+@router.post("/{id}/allocate", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+async def asignar_asientos(
+    id: int,
+    n: int = Query(..., ge=1, le=100, description="Butacas juntas"),
+    metodo_pago: MetodoPago = Query(MetodoPago.TARJETA),
+    db: AsyncSession = Depends(get_async_db),
+):
+    precio = await _precio_o_404(db, id)
+    butacas = await asignacion.asignar_async(db, id, n)
+    return await _vender_butacas(db, id, precio, butacas, metodo_pago)
+
+
+#POST - Crear un nuevo horario
+@router.post("", response_model=HorarioResponse, status_code=status.HTTP_201_CREATED)
+async def create(horario_dto: HorarioCreate, db: AsyncSession = Depends(get_async_db)):
+    horario = Horario(
+        pelicula_id=horario_dto.pelicula_id,
+        sala_id=horario_dto.sala_id,
+        hora=horario_dto.hora,
+        disponible=horario_dto.disponible
+    )
+
+    db.add(horario)
+    await db.commit()
+
+    return await _get_horario(db, horario.id)
+
+
+#POST - Crear varios horarios en una sola transacción (app/lotes.py)
+@router.post("/batch", response_model=list[HorarioResponse], status_code=status.HTTP_201_CREATED)
+async def create_batch(
+    horarios_dto: list[HorarioCreate] = Body(..., min_length=1, max_length=LOTE_MAXIMO),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # una consulta por tabla para comprobar las referencias de todo el lote
+    peliculas = (await db.execute(queries.ids_existentes(Pelicula, list({h.pelicula_id for h in horarios_dto})))).scalars()
+    salas = (await db.execute(queries.ids_existentes(SalaORM, list({h.sala_id for h in horarios_dto})))).scalars()
+    comprobar_referencias(
+        referencias_inexistentes(horarios_dto, "pelicula_id", peliculas, "la película")
+        + referencias_inexistentes(horarios_dto, "sala_id", salas, "la sala")
+    )
+
+    ids = (await db.execute(insertar_lote(Horario), [h.model_dump() for h in horarios_dto])).scalars().all()
+    await db.commit()
+
+    result = await db.execute(queries.horarios_por_ids(ids))
+    return en_orden(ids, result.scalars().unique())
+
+#PUT - actualizar completamente un horario
+@router.put("/{id}", response_model=HorarioResponse)
+async def update_full(id: int, horario_dto: HorarioUpdate, db: AsyncSession = Depends(get_async_db)):
+    horario = await _get_horario(db, id)
+
+    if not horario:
+        raise _not_found(id)
+
+    # el mapa de butacas es del plano de la sala: no se cambia de sala con butacas vendidas
+    if horario_dto.sala_id != horario.sala_id and await asientos.horario_con_asientos_async(db, id):
+        raise asientos.con_asientos_asignados(f"El horario {id}")
+
+    sala_anterior = horario.sala_id
+    for field, value in horario_dto.model_dump().items():
+        setattr(horario, field, value)
+
+    # en otra sala, las butacas ya vendidas o reservadas tienen que caber (app/services/aforo.py)
+    if horario.sala_id != sala_anterior:
+        await aforo.comprobar_horario_async(db, id)
+
+    await db.commit()
+    return await _get_horario(db, id)
+
+
+@router.patch("/{id}", response_model=HorarioResponse)
+async def update_parcial(id:int, horario_dto: HorarioPatch, db: AsyncSession = Depends(get_async_db)):
+    horario = await _get_horario(db, id)
+
+    if not horario:
+        raise _not_found(id)
+
+    update_data = horario_dto.model_dump(exclude_unset=True)
+
+    # el mapa de butacas es del plano de la sala: no se cambia de sala con butacas vendidas
+    if (update_data.get("sala_id", horario.sala_id) != horario.sala_id
+            and await asientos.horario_con_asientos_async(db, id)):
+        raise asientos.con_asientos_asignados(f"El horario {id}")
+
+    sala_anterior = horario.sala_id
+    for field, value in update_data.items():
+        setattr(horario, field, value)
+
+    # en otra sala, las butacas ya vendidas o reservadas tienen que caber (app/services/aforo.py)
+    if horario.sala_id != sala_anterior:
+        await aforo.comprobar_horario_async(db, id)
+
+    await db.commit()
+    return await _get_horario(db, id)
+
+
+#Delete - eliminar un horario por id
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
+    horario = (await db.execute(
+        queries.por_id(Horario, id)
+    )).scalar_one_or_none()
+
+    if not horario:
+        raise _not_found(id)
+
+    await db.delete(horario)
+    await db.commit()
+    return None
@@ -0,0 +1,150 @@
+from typing import Any
+from fastapi import Depends, File, HTTPException, status, APIRouter, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.database import SessionLocal, get_async_db
+from app import queries
+from app.http_cache import condicional_async
+from app.campos import Campos, campos
+from app.paginacion import Pagina, paginacion
+from app.services import catalogo, exportacion, importacion
+from app.models import Pelicula
+from app.schemas import ImportacionResponse, PeliculaResponse, PeliculaCreate, PeliculaPatch, PeliculaUpdate
+
+#crear router para endpoints
+router = APIRouter(prefix="/api/peliculas", tags=["peliculas"])
+
+
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional_async("peliculas", "genres"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+# selección de campos ?fields=&exclude= (app/campos.py)
+_CAMPOS = campos(PeliculaResponse)
+
+# con AsyncSession no hay lazy loading: el género se carga siempre en la misma consulta
+async def _get_pelicula(db: AsyncSession, id: int) -> Pelicula | None:
+    result = await db.execute(
+        queries.pelicula_por_id(id),
+        # en execute(), no en la sentencia: .execution_options() sobre un lambda_stmt
+        # devuelve el select ya resuelto con el id de la primera llamada
+        execution_options={"populate_existing": True},
+    )
+    return result.scalar_one_or_none()
+
+
+def _not_found(id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"No se ha encontrado una pelicula con la id {id}"
+    )
+
+
+#GET-Obtener todas los peliculas
+@router.get("", response_model=list[PeliculaResponse], dependencies=[_CONDICIONAL])
+async def find_all(pagina: Pagina = Depends(_PAGINA), sel: Campos = Depends(_CAMPOS), db: AsyncSession = Depends(get_async_db)):
+    # el género ya viene en la caché del catálogo: ?fields= sólo reduce la respuesta
+    peliculas = await catalogo.peliculas_pagina_async(db, *pagina.despues, pagina.limite + 1)
+    return sel.responder(pagina.recortar(peliculas, lambda p: (p.id,)))
+
+# GET - catálogo en CSV o JSON, por lotes y con gzip si el cliente lo acepta
+# (app/services/exportacion.py). Filtros: ?q=&genero_id=&duracion_max=&disponible=
+@router.get("/export/csv", response_class=StreamingResponse)
+async def export_csv(request: Request, filtros: list = Depends(exportacion.filtros)):
+    return exportacion.csv_async(request, filtros)
+
+@router.get("/export/json", response_class=StreamingResponse)
+async def export_json(request: Request, filtros: list = Depends(exportacion.filtros)):
+    return exportacion.json_async(request, filtros)
+
+# POST - importar películas: inserta las nuevas y actualiza por título las que
+# ya existen; las filas con errores se devuelven y no impiden importar el resto
+# (app/services/importacion.py, síncrono: se ejecuta con la Session de debajo)
+@router.post("/import", response_model=ImportacionResponse)
+async def importar(filas: list[Any], db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(importacion.importar, filas)
+
+# POST - importar un fichero CSV (con las columnas de /export/csv) o una lista
+# JSON. Se lee sin cargarlo entero; si está mal formado responde 400 y no se
+# importa nada. Leer el fichero bloquea: todo va al threadpool con una Session síncrona
+def _importar_fichero(filas) -> ImportacionResponse:
+    with SessionLocal() as db:
+        return importacion.importar_fichero(db, filas)
+
+@router.post("/import/csv", response_model=ImportacionResponse)
+async def importar_csv(file: UploadFile = File(...)):
+    return await run_in_threadpool(_importar_fichero, importacion.filas_csv(file.file))
+
+@router.post("/import/json", response_model=ImportacionResponse)
+async def importar_json(file: UploadFile = File(...)):
+    return await run_in_threadpool(_importar_fichero, importacion.filas_json(file.file))
+
+#GET - Obtener una pelicula por id
+@router.get("/{id}",response_model=PeliculaResponse, dependencies=[_CONDICIONAL])
+async def find_by_id(id:int, sel: Campos = Depends(_CAMPOS), db: AsyncSession = Depends(get_async_db)):
+    pelicula = await catalogo.pelicula_async(db, id)
+
+    if not pelicula:
+        raise _not_found(id)
+
+    return sel.responder(pelicula)
+
+#POST - Crear un nuevo pelicula
+@router.post("", response_model=PeliculaResponse, status_code=status.HTTP_201_CREATED)
+async def create(pelicula_dto: PeliculaCreate, db: AsyncSession = Depends(get_async_db)):
+    pelicula = Pelicula(
+        titulo=pelicula_dto.titulo,
+        genero_id=pelicula_dto.genero_id,
+        duracion=pelicula_dto.duracion,
+        disponible=pelicula_dto.disponible
+    )
+
+    db.add(pelicula)
+    await db.commit()
+
+    return await _get_pelicula(db, pelicula.id)
+
+#PUT - actualizar completamente un pelicula
+@router.put("/{id}", response_model=PeliculaResponse)
+async def update_full(id: int, pelicula_dto: PeliculaUpdate, db: AsyncSession = Depends(get_async_db)):
+    pelicula = await _get_pelicula(db, id)
+
+    if not pelicula:
+        raise _not_found(id)
+
+    # el género anidado del DTO no es una columna: sólo se copia genero_id
+    for field, value in pelicula_dto.model_dump(exclude={"genero"}).items():
+        setattr(pelicula, field, value)
+
+    await db.commit()
+    return await _get_pelicula(db, id)
+
+
+@router.patch("/{id}", response_model=PeliculaResponse)
+async def update_parcial(id:int, pelicula_dto: PeliculaPatch, db: AsyncSession = Depends(get_async_db)):
+    pelicula = await _get_pelicula(db, id)
+
+    if not pelicula:
+        raise _not_found(id)
+
+    for field, value in pelicula_dto.model_dump(exclude_unset=True).items():
+        setattr(pelicula, field, value)
+
+    await db.commit()
+    return await _get_pelicula(db, id)
+
+#Delete - eliminar un pelicula por id
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
+    pelicula = (await db.execute(
+        queries.por_id(Pelicula, id)
+    )).scalar_one_or_none()
+
+    if not pelicula:
+        raise _not_found(id)
+
+    await db.delete(pelicula)
+    await db.commit()
+    return None
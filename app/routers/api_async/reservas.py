@@ -0,0 +1,53 @@
+import time
+from fastapi import status, Depends, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app import queries
+from app.models import Reserva
+from app.schemas import ReservaConfirmar, ReservaCreate, ReservaResponse
+from app.schemas.venta import VentaResponse
+from app.services import asientos, precios, reservas
+
+# reservas temporales de butacas antes del pago (app/services/reservas.py)
+router = APIRouter(
+    prefix="/api/reservas",
+    tags=["reservas"]
+    )
+
+
+# GET - una reserva activa (404 si ya ha caducado)
+@router.get("/{id}", response_model=ReservaResponse)
+async def find_by_id(id: int, db: AsyncSession = Depends(get_async_db)):
+    reserva = (await db.execute(queries.por_id(Reserva, id))).scalar_one_or_none()
+    if reserva is None or reserva.expira_en <= time.time():
+        raise reservas.no_encontrada(id)
+    return reserva
+
+# POST - retener butacas (una cantidad o butacas concretas) durante settings.reserva_segundos
+@router.post("", response_model=ReservaResponse, status_code=status.HTTP_201_CREATED)
+async def create(reserva_dto: ReservaCreate, db: AsyncSession = Depends(get_async_db)):
+    if await precios.precio_unitario_async(db, reserva_dto.horario_id) is None:
+        raise precios.horario_inexistente(reserva_dto.horario_id)
+
+    # resta las butacas del aforo (y las marca en el plano) en la transacción de la reserva
+    reserva = await reservas.crear_async(db, reserva_dto)
+    await db.commit()
+    reservas.programar(reserva)
+    return reserva
+
+# POST - pagar: la reserva se convierte en una venta con las mismas butacas
+@router.post("/{id}/confirmar", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+async def confirmar(id: int, pago: ReservaConfirmar, db: AsyncSession = Depends(get_async_db)):
+    venta = await reservas.confirmar_async(db, id, pago.metodo_pago)
+    await db.commit()
+    result = await db.execute(queries.venta_por_id(venta.id))
+    return result.scalar_one()
+
+# DELETE - cancelar: las butacas vuelven a estar a la venta
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancelar(id: int, db: AsyncSession = Depends(get_async_db)):
+    fila = await reservas.cancelar_async(db, id)
+    await db.commit()
+    if fila.asientos:
+        asientos.descartar(fila.horario_id)
+    return None
@@ -0,0 +1,86 @@
+from fastapi import Depends, HTTPException, status, APIRouter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app import queries
+from app.http_cache import condicional_async
+from app.paginacion import Pagina, paginacion
+from app.services import aforo, asientos, catalogo
+from app.models import SalaORM
+from app.schemas import SalaResponse, SalaCreate, SalaUpdate
+
+# Crear router para endpoints
+router = APIRouter(prefix="/api/salas", tags=["salas"])
+
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional_async("salas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+
+@router.get("/salas", response_model=list[SalaResponse], dependencies=[_CONDICIONAL])
+async def obtener_salas(pagina: Pagina = Depends(_PAGINA), db: AsyncSession = Depends(get_async_db)):
+    salas = await catalogo.salas_pagina_async(db, *pagina.despues, pagina.limite + 1)
+    return pagina.recortar(salas, lambda s: (s.id,))
+
+@router.get("/salas/{sala_id}", response_model=SalaResponse, dependencies=[_CONDICIONAL])
+async def obtener_sala(sala_id: int, db: AsyncSession = Depends(get_async_db)):
+    sala = await catalogo.sala_async(db, sala_id)
+    if sala is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,  detail="Sala no encontrada")
+    return sala
+
+@router.post("/salas", response_model=SalaResponse, status_code=status.HTTP_201_CREATED)
+async def crear_sala(sala: SalaCreate, db: AsyncSession = Depends(get_async_db)):
+    #if existe ya la sala es un error
+    existente = (await db.execute(
+        queries.sala_por_nombre(sala.nombre)
+        )).scalar_one_or_none()
+    if existente is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ya existe una sala con ese nombre")
+
+    nueva_sala = SalaORM()
+    for field, value in sala.model_dump().items():
+        setattr(nueva_sala, field, value)
+
+    db.add(nueva_sala)
+    await db.commit()
+    await db.refresh(nueva_sala)
+    return nueva_sala
+
+@router.patch("/salas/{sala_id}", response_model=SalaResponse)
+async def actualizar_sala(sala_id: int, sala: SalaUpdate, db: AsyncSession = Depends(get_async_db)):
+    sala_existente = (await db.execute(
+        queries.por_id(SalaORM, sala_id)
+        )).scalar_one_or_none()
+    if sala_existente is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sala no encontrada")
+
+    # PATCH: sólo los campos enviados; el plano y la capacidad se comprueban
+    # con los que quedan. Los mapas de butacas de sus horarios dependen del
+    # plano (app/services/asientos.py)
+    cambios = sala.model_dump(exclude_unset=True)
+    if asientos.cambia_plano(sala_existente, cambios) and await asientos.sala_con_asientos_async(db, sala_id):
+        raise asientos.con_asientos_asignados(f"La sala {sala_id}")
+
+    capacidad_anterior = sala_existente.capacidad
+    for field, value in cambios.items():
+        setattr(sala_existente, field, value)
+
+    # con menos capacidad, las butacas ya vendidas o reservadas tienen que caber (app/services/aforo.py)
+    if sala_existente.capacidad is not None and sala_existente.capacidad < capacidad_anterior:
+        await aforo.comprobar_sala_async(db, sala_id)
+
+    await db.commit()
+    await db.refresh(sala_existente)
+    return sala_existente
+
+@router.delete("/salas/{sala_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def eliminar_sala(sala_id: int, db: AsyncSession = Depends(get_async_db)):
+    sala_existente = (await db.execute(
+        queries.por_id(SalaORM, sala_id)
+        )).scalar_one_or_none()
+    if sala_existente is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sala no encontrada")
+    await db.delete(sala_existente)
+    await db.commit()
+    return None
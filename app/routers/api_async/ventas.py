@@ -0,0 +1,218 @@
+import asyncio
+from collections import Counter
+from app.schemas.venta import VentaResponse, VentaCreate, VentaUpdate, VentaPatch
+from fastapi import HTTPException,status,Depends,APIRouter, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.venta import Venta
+from app.database import get_async_db
+from app import queries
+from app.http_cache import condicional_async
+from app.lotes import LOTE_MAXIMO, comprobar_referencias, en_orden, insertar_lote, referencias_inexistentes
+from app.campos import Campos, campos
+from app.paginacion import Pagina, paginacion
+from app.streaming import ndjson_async
+from app.services import aforo, asientos, precios
+from app.services.venta_writer import venta_write_queue
+from app.settings import settings
+
+router = APIRouter(
+    prefix="/api/ventas",
+    tags=["ventas"]
+    )
+
+
+# ETag / Last-Modified en los GET (responde 304 sin ejecutar el endpoint)
+_CONDICIONAL = Depends(condicional_async("ventas", "horarios", "salas"))
+# paginación por cursor ?limit=&after= (app/paginacion.py)
+_PAGINA = paginacion((0,))
+# selección de campos ?fields=&exclude= (app/campos.py)
+_CAMPOS = campos(VentaResponse)
+
+# VentaResponse incluye horario -> sala: queries.venta_por_id carga los dos niveles de una vez
+async def _get_venta(db: AsyncSession, id: int) -> Venta | None:
+    result = await db.execute(
+        queries.venta_por_id(id),
+        # en execute(), no en la sentencia: .execution_options() sobre un lambda_stmt
+        # devuelve el select ya resuelto con el id de la primera llamada
+        execution_options={"populate_existing": True},
+    )
+    return result.scalar_one_or_none()
+
+
+def _not_found(id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"No se ha encontrado la venta con id {id}"
+    )
+
+# ENDPOINTS CRUD
+
+# GET - obtener TODAS las ventas
+@router.get("", response_model=list[VentaResponse], dependencies=[_CONDICIONAL])
+async def find_all(pagina: Pagina = Depends(_PAGINA), sel: Campos = Depends(_CAMPOS), db: AsyncSession = Depends(get_async_db)):
+    # sin el campo horario no hace falta el JOIN con horarios y salas
+    stmt = (
+        queries.ventas_pagina(*pagina.despues, pagina.limite + 1) if sel.incluye("horario")
+        else queries.pagina(Venta, *pagina.despues, pagina.limite + 1)
+    )
+    result = await db.execute(stmt)
+    return sel.responder(pagina.recortar(result.scalars().unique().all(), lambda v: (v.id,)))
+
+# GET - todas las ventas en NDJSON, una por línea, sin paginar (app/streaming.py)
+# va antes de /{id} para que "stream" no se tome como id
+@router.get("/stream", response_class=StreamingResponse, dependencies=[_CONDICIONAL])
+async def stream(response: Response, after: int = Query(0, ge=0, description="Empezar después de este id")):
+    return ndjson_async(queries.ventas_desde(after), VentaResponse, response)
+
+# GET - obtener UNA venta por id
+@router.get("/{id}", response_model=VentaResponse, dependencies=[_CONDICIONAL])
+async def find_by_id(id: int, sel: Campos = Depends(_CAMPOS), db: AsyncSession = Depends(get_async_db)):
+    if sel.incluye("horario"):
+        venta = await _get_venta(db, id)
+    else:
+        venta = (await db.execute(queries.por_id(Venta, id))).scalar_one_or_none()
+
+    if not venta:
+        raise _not_found(id)
+    return sel.responder(venta)
+
+# POST - crear una nueva venta
+@router.post("", response_model=VentaResponse, status_code=status.HTTP_201_CREATED)
+async def create(venta_dto: VentaCreate, db: AsyncSession = Depends(get_async_db)):
+    # precio de la sala del horario: sale de la tabla de precios en memoria
+    # (app/services/precios.py), sin consultar la base de datos
+    precio = await precios.precio_unitario_async(db, venta_dto.horario_id)
+    if precio is None:
+        raise precios.horario_inexistente(venta_dto.horario_id)
+
+    datos = {
+        "horario_id": venta_dto.horario_id,
+        "precio_total": precios.precio_total(precio, venta_dto.cantidad),
+        "cantidad": venta_dto.cantidad,
+        "metodo_pago": venta_dto.metodo_pago,
+    }
+
+    # el escritor único confirma la venta en lote sin bloquear el event loop
+    if settings.ventas_group_commit:
+        return await asyncio.wrap_future(venta_write_queue.submit(datos))
+
+    # butacas y venta en la misma transacción (app/services/aforo.py)
+    await aforo.reservar_o_409_async(db, venta_dto.horario_id, venta_dto.cantidad)
+    venta= Venta(**datos)
+
+    db.add(venta)
+    await db.commit()
+
+    return await _get_venta(db, venta.id)
+
+# POST - crear varias ventas en una sola transacción (app/lotes.py)
+# no pasa por la cola de group commit: el lote ya es un único commit
+@router.post("/batch", response_model=list[VentaResponse], status_code=status.HTTP_201_CREATED)
+async def create_batch(
+    ventas_dto: list[VentaCreate] = Body(..., min_length=1, max_length=LOTE_MAXIMO),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # los horarios sin precio son los que no existen
+    precio_por_horario = await precios.precios_unitarios_async(db, (v.horario_id for v in ventas_dto))
+    comprobar_referencias(referencias_inexistentes(ventas_dto, "horario_id", precio_por_horario, "el horario"))
+
+    # un UPDATE condicional por horario con las butacas de todo el lote
+    butacas = Counter()
+    for v in ventas_dto:
+        butacas[v.horario_id] += v.cantidad
+    for horario_id, n in butacas.items():
+        await aforo.reservar_o_409_async(db, horario_id, n)
+
+    filas = [
+        {
+            "horario_id": v.horario_id,
+            "precio_total": precios.precio_total(precio_por_horario[v.horario_id], v.cantidad),
+            "cantidad": v.cantidad,
+            "metodo_pago": v.metodo_pago,
+        }
+        for v in ventas_dto
+    ]
+    ids = (await db.execute(insertar_lote(Venta), filas)).scalars().all()
+    await db.commit()
+
+    result = await db.execute(queries.ventas_por_ids(ids))
+    return en_orden(ids, result.scalars().unique())
+
+# PUT -actualizar COMPLETAMENTE una venta
+@router.put("/{id}", response_model=VentaResponse)
+async def update_full(id: int, venta_dto: VentaUpdate, db: AsyncSession = Depends(get_async_db)):
+    venta = await _get_venta(db, id)
+
+    if not venta:
+        raise _not_found(id)
+
+    # el precio lo pone el servidor: se ignora el precio_total del cliente
+    precio = await precios.precio_unitario_async(db, venta_dto.horario_id)
+    if precio is None:
+        raise precios.horario_inexistente(venta_dto.horario_id)
+
+    # las butacas elegidas en el plano no se mueven de horario (app/services/asientos.py)
+    if venta.asientos and (venta_dto.horario_id, venta_dto.cantidad) != (venta.horario_id, venta.cantidad):
+        raise asientos.venta_con_asientos(id)
+
+    # devuelve las butacas de la venta y reserva las nuevas (409 si no caben)
+    await aforo.liberar_async(db, venta.horario_id, venta.cantidad)
+    await aforo.reservar_o_409_async(db, venta_dto.horario_id, venta_dto.cantidad)
+
+    for field, value in venta_dto.model_dump(exclude={"precio_total"}).items():
+        setattr(venta, field, value)
+    venta.precio_total = precios.precio_total(precio, venta.cantidad)
+
+    await db.commit()
+    return await _get_venta(db, id)
+
+# PATCH -actualizar parcialmente una venta
+@router.patch("/{id}", response_model=VentaResponse)
+async def update_venta(id: int, venta_dto: VentaPatch, db: AsyncSession = Depends(get_async_db)):
+    venta = await _get_venta(db, id)
+
+    if not venta:
+        raise _not_found(id)
+
+    # el precio lo pone el servidor: se ignora el precio_total del cliente
+    update_data = venta_dto.model_dump(exclude_unset=True, exclude={"precio_total"})
+    if "horario_id" in update_data or "cantidad" in update_data:
+        horario_id = update_data.get("horario_id", venta.horario_id)
+        cantidad = update_data.get("cantidad", venta.cantidad)
+        # las butacas elegidas en el plano no se mueven de horario (app/services/asientos.py)
+        if venta.asientos and (horario_id, cantidad) != (venta.horario_id, venta.cantidad):
+            raise asientos.venta_con_asientos(id)
+        precio = await precios.precio_unitario_async(db, horario_id)
+        if precio is None:
+            raise precios.horario_inexistente(horario_id)
+        # devuelve las butacas de la venta y reserva las nuevas (409 si no caben)
+        await aforo.liberar_async(db, venta.horario_id, venta.cantidad)
+        await aforo.reservar_o_409_async(db, horario_id, cantidad)
+        venta.precio_total = precios.precio_total(precio, cantidad)
+
+    for attr, value in update_data.items():
+        setattr(venta, attr, value)
+
+    await db.commit()
+    return await _get_venta(db, id)
+
+# DELETE -borrar una venta por id
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def borrar_venta(id: int, db: AsyncSession = Depends(get_async_db)):
+    venta = (await db.execute(
+        queries.por_id(Venta, id)
+    )).scalar_one_or_none()
+
+    if not venta:
+        raise _not_found(id)
+    await aforo.liberar_async(db, venta.horario_id, venta.cantidad)
+    # butacas elegidas en el plano: quedan libres (app/services/asientos.py)
+    horario_id, butacas = venta.horario_id, venta.asientos
+    if butacas:
+        await asientos.liberar_async(db, horario_id, butacas)
+    await db.delete(venta)
+    await db.commit()
+    if butacas:
+        asientos.descartar(horario_id)
+    return None
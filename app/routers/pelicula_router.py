@@ -1,14 +1,11 @@
 # app/routers/pelicula_router.py
 # Módulo de gestión de películas, incluyendo la lógica de la API REST y las vistas HTML (Jinja2).
 
-from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.requests import Request
-from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import csv
-import json
-import io
 
 # --- Importaciones Específicas del Proyecto (SOLO GENERALES/SCHEMAS/MODELOS) ---
 from app.database.db import get_db
@@ -344,191 +341,12 @@ def delete_pelicula_endpoint_api(
 # ==============================================================================
 # 3. RUTAS DE EXPORTACIÓN (CSV / JSON)
 # ==============================================================================
-
-@router.get("/export/csv", tags=["Exportación"])
-def export_peliculas_csv_endpoint(
-    db: Session = Depends(get_db),
-    q: Optional[str] = Query(None, description="Búsqueda por título, director, etc."),
-    genero_id: Optional[int] = Query(None, description="Filtrar por ID de género."),
-    duracion_max: Optional[int] = Query(None, description="Duración máxima en minutos."),
-    disponible: Optional[bool] = Query(None, description="Solo películas disponibles."),
-):
-    """
-    [GET] **Exportar Catálogo** - Devuelve la lista de películas filtradas en formato **CSV**.
-    
-    Utiliza Response para asegurar el Content-Disposition y evitar fallos de descarga.
-    """
-
-    csv_data = pelicula_service.export_peliculas_to_csv(
-        db=db,
-        query=q,
-        genero_id=genero_id,
-        duracion_max=duracion_max,
-        disponible=disponible,
-    )
-    
-    filename = "catalogo-peliculas.csv" 
-    
-    # Retorna el contenido del buffer de memoria como una respuesta HTTP forzando la descarga
-    return Response(
-        content=csv_data.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
-
-
-@router.get("/export/json", tags=["Exportación"])
-def export_peliculas_json_endpoint(
-    db: Session = Depends(get_db),
-    q: Optional[str] = Query(None, description="Búsqueda por título, director, etc."),
-    genero_id: Optional[int] = Query(None, description="Filtrar por ID de género."),
-    duracion_max: Optional[int] = Query(None, description="Duración máxima en minutos."),
-    disponible: Optional[bool] = Query(None, description="Solo películas disponibles."),
-):
-    """
-    [GET] **Exportar Catálogo** - Devuelve la lista de películas filtradas en formato **JSON**.
-    """
-
-    json_str = pelicula_service.export_peliculas_to_json(
-        db=db,
-        query=q,
-        genero_id=genero_id,
-        duracion_max=duracion_max,
-        disponible=disponible,
-    )
-    
-    filename = "catalogo-peliculas.json" 
-    
-    return Response(
-        content=json_str,
-        media_type="application/json",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}, 
-    )
+# Se han movido a la API montada: GET /api/peliculas/export/csv y /export/json
+# (app/routers/api/peliculas.py, app/services/exportacion.py).
 
 # ==============================================================================
 # 4. RUTAS DE IMPORTACIÓN (CSV / JSON)
 # ==============================================================================
 
-@router.post("/import/csv", tags=["Importación"])
-async def import_peliculas_csv_endpoint(
-    request: Request,
-    file: UploadFile = File(...), 
-    db: Session = Depends(get_db)
-):
-    """
-    [POST] **Importar Catálogo** - Recibe un archivo CSV y procesa las filas para insertar/actualizar películas.
-    """ 
-
-    if file.content_type not in ["text/csv", "application/vnd.ms-excel"]:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Tipo de archivo no soportado: {file.content_type}. Se espera CSV."
-        )
-        
-    try:
-        # Leer el contenido del archivo subido en memoria
-        content = await file.read()
-        # Decodificar y manejar como texto CSV
-        csv_text = content.decode('utf-8')
-        csv_file = io.StringIO(csv_text)
-        
-        # Usar DictReader para leer el CSV como diccionarios (nombre de columna como clave)
-        reader = csv.DictReader(csv_file)
-        data_to_import = list(reader)
-        
-        # Llamar al servicio para importar los datos
-        success_count, errors = pelicula_service.import_peliculas_from_data(db, data_to_import)
-        
-        if errors:
-            # Si hay errores, mostramos la página de inicio con un mensaje de error y el detalle
-            error_message = f"Se importaron {success_count} registros. Hubo errores en {len(errors)} filas."
-            return templates.TemplateResponse(
-                "app/peliculas/index.html", 
-                {
-                    "request": request, 
-                    "titulo": "Error en Importación",
-                    "error_importacion": error_message,
-                    "detalle_errores": errors,
-                    "peliculas": pelicula_service.get_all_peliculas(db), # Recargar lista completa
-                    "generos": genero_service.get_all_generos(db),
-                    "filtros_activos": {}, # Sin filtros
-                }
-            )
-        
-        # Redireccionar con éxito
-        return RedirectResponse(
-            url="/", 
-            status_code=status.HTTP_303_SEE_OTHER, 
-            headers={"X-Import-Status": f"Success: {success_count} records imported."}
-        )
-
-    except Exception as e:
-        print(f"Error crítico durante la importación CSV: {e}")
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Error interno al procesar el archivo CSV: {e}"
-        )
-
-@router.post("/import/json", tags=["Importación"])
-async def import_peliculas_json_endpoint(
-    request: Request,
-    file: UploadFile = File(...), 
-    db: Session = Depends(get_db)
-):
-    """
-    [POST] **Importar Catálogo** - Recibe un archivo JSON y procesa los datos para insertar/actualizar películas.
-    """
-
-    if file.content_type != "application/json":
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Tipo de archivo no soportado: {file.content_type}. Se espera JSON."
-        )
-        
-    try:
-        # Leer el contenido del archivo subido en memoria
-        content = await file.read()
-        
-        # Decodificar y cargar como JSON
-        data_to_import = json.loads(content.decode('utf-8'))
-        
-        if not isinstance(data_to_import, list):
-            raise ValueError("El archivo JSON debe ser una lista de objetos película.")
-        
-        # Llamar al servicio para importar los datos
-        success_count, errors = pelicula_service.import_peliculas_from_data(db, data_to_import)
-        
-        if errors:
-             # Si hay errores, mostramos la página de inicio con un mensaje de error y el detalle
-            error_message = f"Se importaron {success_count} registros. Hubo errores en {len(errors)} filas."
-            return templates.TemplateResponse(
-                "app/peliculas/index.html", 
-                {
-                    "request": request, 
-                    "titulo": "Error en Importación",
-                    "error_importacion": error_message,
-                    "detalle_errores": errors,
-                    "peliculas": pelicula_service.get_all_peliculas(db), # Recargar lista completa
-                    "generos": genero_service.get_all_generos(db),
-                    "filtros_activos": {}, # Sin filtros
-                }
-            )
-        
-        # Redireccionar con éxito
-        return RedirectResponse(
-            url="/", 
-            status_code=status.HTTP_303_SEE_OTHER, 
-            headers={"X-Import-Status": f"Success: {success_count} records imported."}
-        )
-
-    except (json.JSONDecodeError, ValueError) as e:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Error de formato JSON: {e}"
-        )
-    except Exception as e:
-        print(f"Error crítico durante la importación JSON: {e}")
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Error interno al procesar el archivo JSON: {e}"
-        )
+# Se han movido a la API montada: POST /api/peliculas/import/csv y /import/json
+# (app/routers/api/peliculas.py, app/services/importacion.py).
@@ -1,26 +1,24 @@
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from datetime import datetime
 
 from app.database import get_db
+from app import queries
+from app.services import catalogo
+from app.templating import render_cacheado, templates
 from app.models import Genre
 
-# configuración de Jinja2Templates
-templates = Jinja2Templates(directory="app/templates")
-
 # router para rutas web
 router = APIRouter(prefix="/genres", tags=["web"])
 
 # listar géneros
 @router.get("", response_class=HTMLResponse)
 def list_genres(request: Request, db: Session = Depends(get_db)):
-    genres = db.execute(select(Genre)).scalars().all()
-    return templates.TemplateResponse(
-        "genres/list.html",
-        {"request": request, "genres": genres}
+    # HTML cacheado por versión de la tabla (ver app/templating.py)
+    return render_cacheado(
+        request, db, "genres/list.html", ("genres",),
+        lambda: {"genres": db.execute(queries.todos(Genre)).scalars().all()},
     )
 
 # mostrar formulario crear
@@ -69,9 +67,10 @@ def create_genre(
 # detalle género
 @router.get("/{genre_id}", response_class=HTMLResponse)
 def genre_detail(request: Request, genre_id: int, db: Session = Depends(get_db)):
-    genre = db.execute(select(Genre).where(Genre.id == genre_id)).scalar_one_or_none()
+    genre = catalogo.genre(db, genre_id)
     if genre is None:
         raise HTTPException(status_code=404, detail="404 - Género no encontrado")
+    db.release()
     return templates.TemplateResponse(
         "genres/detail.html",
         {"request": request, "genre": genre}
@@ -80,9 +79,10 @@ def genre_detail(request: Request, genre_id: int, db: Session = Depends(get_db))
 # mostrar formulario editar
 @router.get("/{genre_id}/edit", response_class=HTMLResponse)
 def show_edit_form(request: Request, genre_id: int, db: Session = Depends(get_db)):
-    genre = db.execute(select(Genre).where(Genre.id == genre_id)).scalar_one_or_none()
+    genre = db.execute(queries.por_id(Genre, genre_id)).scalar_one_or_none()
     if genre is None:
         raise HTTPException(status_code=404, detail="404 - Género no encontrado")
+    db.release()
     return templates.TemplateResponse(
         "genres/form.html",
         {"request": request, "genre": genre}
@@ -97,7 +97,7 @@ def update_genre(
     name_genre: str = Form(...),       # campo del formulario
     db: Session = Depends(get_db)
 ):
-    genre = db.execute(select(Genre).where(Genre.id == genre_id)).scalar_one_or_none()
+    genre = db.execute(queries.por_id(Genre, genre_id)).scalar_one_or_none()
     if genre is None:
         raise HTTPException(status_code=404, detail="404 - Género no encontrado")
 
@@ -130,7 +130,7 @@ def update_genre(
 # eliminar género
 @router.post("/{genre_id}/delete", response_class=HTMLResponse)
 def delete_genre(request: Request, genre_id: int, db: Session = Depends(get_db)):
-    genre = db.execute(select(Genre).where(Genre.id == genre_id)).scalar_one_or_none()
+    genre = db.execute(queries.por_id(Genre, genre_id)).scalar_one_or_none()
     if genre is None:
         raise HTTPException(status_code=404, detail="404 - Género no encontrado")
     try:
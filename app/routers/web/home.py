@@ -1,27 +1,19 @@
-from fastapi.templating import Jinja2Templates
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models import Pelicula
-
-# Configurar jinja2
-templates = Jinja2Templates(directory = "app/templates")
+from app.services import catalogo
+from app.templating import templates
 
 # Crear router para rutas web de home
 router = APIRouter(tags=["web"])
 
 @router.get("/", response_class=HTMLResponse)
 def home(request: Request, db: Session = Depends(get_db)):
-    # Obtener las últimas 5 películas ordenadas por ID descendente
-    peliculas = db.execute(
-        select(Pelicula)
-        .options(joinedload(Pelicula.genero))
-        .order_by(Pelicula.id.desc())
-        .limit(5)
-    ).scalars().all()
+    # Obtener las últimas 5 películas ordenadas por ID descendente (de la caché del catálogo)
+    peliculas = catalogo.ultimas_peliculas(db, 5)
     
+    db.release()  # devuelve la conexión al pool antes de renderizar
     return templates.TemplateResponse(
         "home.html",
         {"request": request, "peliculas": peliculas}
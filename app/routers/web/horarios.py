@@ -1,15 +1,13 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app import queries
+from app.services import aforo, asientos, catalogo
+from app.templating import render_cacheado, templates
 from app.models import Horario, SalaORM
 
-# configuración de Jinja2Templates
-templates = Jinja2Templates(directory="app/templates")
-
 # router para rutas web
 router = APIRouter(prefix="/horarios", tags=["web"])
 
@@ -17,19 +15,19 @@ router = APIRouter(prefix="/horarios", tags=["web"])
 # Listar horarios
 @router.get("", response_class=HTMLResponse)
 def list_horarios(request: Request, db: Session = Depends(get_db)):
-    horarios = db.execute(select(Horario).options(joinedload(Horario.sala))).scalars().all()
-
-    return templates.TemplateResponse(
-        "horarios/list.html",
-        {"request": request, "horarios": horarios}
+    # HTML cacheado por versión de las tablas (ver app/templating.py)
+    return render_cacheado(
+        request, db, "horarios/list.html", ("horarios", "salas"),
+        lambda: {"horarios": db.execute(queries.horarios()).scalars().all()},
     )
 
 
 # mostrar formulario crear
 @router.get("/new", response_class=HTMLResponse)
 def show_create_form(request: Request, db: Session = Depends(get_db)):
-    salas = db.execute(select(SalaORM)).scalars().all() 
+    salas = catalogo.salas(db) 
     
+    db.release()
     return templates.TemplateResponse(
         "horarios/form.html",
         {"request": request, "horario": None, "salas": salas}
@@ -55,7 +53,7 @@ def create_horario(
         "disponible": disponible,
     }
     
-    salas = db.execute(select(SalaORM)).scalars().all()
+    salas = catalogo.salas(db)
 
     # validaciones
     try:
@@ -73,7 +71,8 @@ def create_horario(
             
             if sala_id_value < 1:
                 errors.append("El id de la sala debe ser un número positivo.")
-            sala = db.execute(select(SalaORM).where(SalaORM.id == sala_id_value)).scalar_one_or_none()
+            elif not db.scalar(queries.existe(SalaORM, sala_id_value)):
+                errors.append("La sala especificada no existe.")
         except ValueError:
             errors.append("El id de la sala tiene que ser un entero válido.")
     else:
@@ -115,11 +114,11 @@ def create_horario(
 # detalle de horario
 @router.get("/{horario_id}", response_class=HTMLResponse)
 def horario_detail(request: Request, horario_id: int, db: Session = Depends(get_db)):
-    horario = db.execute(select(Horario).where(Horario.id == horario_id)
-                .options(joinedload(Horario.sala))).scalar_one_or_none()
+    horario = db.execute(queries.horario_por_id(horario_id)).scalar_one_or_none()
     
     if horario is None:
         raise HTTPException(status_code=404, detail="404 - Horario no encontrado")
+    db.release()
     return templates.TemplateResponse(
         "horarios/detail.html",
         {"request": request, "horario": horario}
@@ -129,11 +128,11 @@ def horario_detail(request: Request, horario_id: int, db: Session = Depends(get_
 # mostrar formulario editar
 @router.get("/{horario_id}/edit", response_class=HTMLResponse)
 def show_edit_form(request: Request, horario_id: int, db: Session = Depends(get_db)):
-    horario = db.execute(select(Horario).where(Horario.id == horario_id)
-                         .options(joinedload(Horario.sala))).scalar_one_or_none()
+    horario = db.execute(queries.horario_por_id(horario_id)).scalar_one_or_none()
     if horario is None:
         raise HTTPException(status_code=404, detail="404 - Horario no encontrado")
-    salas = db.execute(select(SalaORM)).scalars().all()
+    salas = catalogo.salas(db)
+    db.release()
     return templates.TemplateResponse("horarios/form.html", {"request": request, "horario": horario, "salas": salas})
 
 
@@ -157,15 +156,13 @@ def update_horario(
     }
     
     horario = db.execute(
-        select(Horario)
-        .where(Horario.id == horario_id)
-        .options(joinedload(Horario.sala))
+        queries.horario_por_id(horario_id)
     ).scalar_one_or_none()
     
     if horario is None:
         raise HTTPException(status_code=404, detail="Horario no encontrado")
     
-    salas = db.execute(select(SalaORM)).scalars().all()
+    salas = catalogo.salas(db)
     
     # validaciones
     try:
@@ -183,7 +180,8 @@ def update_horario(
             
             if sala_id_value < 1:
                 errors.append("El id de la sala debe ser un número positivo.")
-            sala = db.execute(select(SalaORM).where(SalaORM.id == sala_id_value)).scalar_one_or_none()
+            elif not db.scalar(queries.existe(SalaORM, sala_id_value)):
+                errors.append("La sala especificada no existe.")
         except ValueError:
             errors.append("El id de la sala tiene que ser un entero válido.")
     else:
@@ -200,6 +198,11 @@ def update_horario(
     else:
         disponible_val = None
 
+    # el mapa de butacas es del plano de la sala (app/services/asientos.py)
+    if (not errors and sala_id_value != horario.sala_id
+            and asientos.horario_con_asientos(db, horario_id)):
+        errors.append("El horario tiene ventas con butacas asignadas: no se puede cambiar de sala.")
+
     if errors:
         return templates.TemplateResponse(
             "horarios/form.html",
@@ -207,15 +210,27 @@ def update_horario(
         )
 
     try:
+        sala_anterior = horario.sala_id
         horario.pelicula_id = peli_val
         horario.sala_id = sala_id_value
         horario.hora = hora.strip()
         horario.disponible = disponible_val if disponible_val is not None else False
+
+        # en otra sala, las butacas ya vendidas o reservadas tienen que caber
+        if horario.sala_id != sala_anterior:
+            aforo.comprobar_horario(db, horario_id)
         
         db.commit()
         db.refresh(horario)
 
         return RedirectResponse(url=f"/horarios/{horario.id}", status_code=303)
+    except HTTPException as e:
+        # 409 de aforo.comprobar_horario: ya ha deshecho la transacción
+        errors.append(e.detail)
+        return templates.TemplateResponse(
+            "horarios/form.html",
+            {"request": request, "horario": horario, "errors": errors, "form_data": form_data, "salas": salas}
+        )
     except Exception as e:
         db.rollback()
         errors.append(f"Error al actualizar el horario: {str(e)}")
@@ -227,7 +242,7 @@ def update_horario(
 # eliminar horario
 @router.post("/{horario_id}/delete", response_class=HTMLResponse)
 def delete_horario(request: Request, horario_id: int, db: Session = Depends(get_db)):
-    horario = db.execute(select(Horario).where(Horario.id == horario_id)).scalar_one_or_none()
+    horario = db.execute(queries.por_id(Horario, horario_id)).scalar_one_or_none()
     if horario is None:
         raise HTTPException(status_code=404, detail="404 - Horario no encontrado")
     try:
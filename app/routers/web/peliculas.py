@@ -1,15 +1,13 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app import queries
+from app.services import catalogo
+from app.templating import render_cacheado, templates
 from app.models import Pelicula, Genre
 
-# configuración de Jinja2Templates
-templates = Jinja2Templates(directory="app/templates")
-
 # router para rutas web
 router = APIRouter(prefix="/peliculas", tags=["web"])
 
@@ -17,19 +15,19 @@ router = APIRouter(prefix="/peliculas", tags=["web"])
 # Listar películas
 @router.get("", response_class=HTMLResponse)
 def list_peliculas(request: Request, db: Session = Depends(get_db)):
-    peliculas = db.execute(select(Pelicula).options(joinedload(Pelicula.genero))).scalars().all()
-
-    return templates.TemplateResponse(
-        "peliculas/list.html",
-        {"request": request, "peliculas": peliculas}
+    # HTML cacheado por versión de las tablas (ver app/templating.py)
+    return render_cacheado(
+        request, db, "peliculas/list.html", ("peliculas", "genres"),
+        lambda: {"peliculas": db.execute(queries.peliculas()).scalars().all()},
     )
 
 
 # mostrar formulario crear
 @router.get("/new", response_class=HTMLResponse)
 def show_create_form(request: Request, db: Session = Depends(get_db)):
-    generos = db.execute(select(Genre)).scalars().all() 
+    generos = catalogo.genres(db) 
     
+    db.release()
     return templates.TemplateResponse(
         "peliculas/form.html",
         {"request": request, "pelicula": None, "generos": generos}
@@ -57,7 +55,7 @@ def create_pelicula(
         "imagen": imagen,  # Agregar imagen al form_data
     }
     
-    generos = db.execute(select(Genre)).scalars().all()
+    generos = catalogo.genres(db)
 
     # validaciones
     if not titulo or not titulo.strip():
@@ -71,8 +69,7 @@ def create_pelicula(
             
             if genero_id_value < 1:
                 errors.append("El id del género debe ser un número positivo.")
-            genero = db.execute(select(Genre).where(Genre.id == genero_id_value)).scalar_one_or_none()
-            if genero is None:
+            if not db.scalar(queries.existe(Genre, genero_id_value)):
                 errors.append("El género especificado no existe.")
         except ValueError:
             errors.append("El id del género tiene que ser un entero válido.")
@@ -128,11 +125,11 @@ def create_pelicula(
 # detalle de película
 @router.get("/{pelicula_id}", response_class=HTMLResponse)
 def pelicula_detail(request: Request, pelicula_id: int, db: Session = Depends(get_db)):
-    pelicula = db.execute(select(Pelicula).where(Pelicula.id == pelicula_id)
-                .options(joinedload(Pelicula.genero))).scalar_one_or_none()
+    pelicula = catalogo.pelicula(db, pelicula_id)
     
     if pelicula is None:
         raise HTTPException(status_code=404, detail="404 - Película no encontrada")
+    db.release()
     return templates.TemplateResponse(
         "peliculas/detail.html",
         {"request": request, "pelicula": pelicula}
@@ -142,11 +139,11 @@ def pelicula_detail(request: Request, pelicula_id: int, db: Session = Depends(ge
 # mostrar formulario editar
 @router.get("/{pelicula_id}/edit", response_class=HTMLResponse)
 def show_edit_form(request: Request, pelicula_id: int, db: Session = Depends(get_db)):
-    pelicula = db.execute(select(Pelicula).where(Pelicula.id == pelicula_id)
-                         .options(joinedload(Pelicula.genero))).scalar_one_or_none()
+    pelicula = db.execute(queries.pelicula_por_id(pelicula_id)).scalar_one_or_none()
     if pelicula is None:
         raise HTTPException(status_code=404, detail="404 - Película no encontrada")
-    generos = db.execute(select(Genre)).scalars().all()
+    generos = catalogo.genres(db)
+    db.release()
     return templates.TemplateResponse("peliculas/form.html", {"request": request, "pelicula": pelicula, "generos": generos})
 
 
@@ -172,15 +169,13 @@ def update_pelicula(
     }
     
     pelicula = db.execute(
-        select(Pelicula)
-        .where(Pelicula.id == pelicula_id)
-        .options(joinedload(Pelicula.genero))
+        queries.pelicula_por_id(pelicula_id)
     ).scalar_one_or_none()
     
     if pelicula is None:
         raise HTTPException(status_code=404, detail="Película no encontrada")
     
-    generos = db.execute(select(Genre)).scalars().all()
+    generos = catalogo.genres(db)
     
     # validaciones
     if not titulo or not titulo.strip():
@@ -194,8 +189,7 @@ def update_pelicula(
             
             if genero_id_value < 1:
                 errors.append("El id del género debe ser un número positivo.")
-            genero = db.execute(select(Genre).where(Genre.id == genero_id_value)).scalar_one_or_none()
-            if genero is None:
+            if not db.scalar(queries.existe(Genre, genero_id_value)):
                 errors.append("El género especificado no existe.")
         except ValueError:
             errors.append("El id del género tiene que ser un entero válido.")
@@ -246,7 +240,7 @@ def update_pelicula(
 # eliminar película
 @router.post("/{pelicula_id}/delete", response_class=HTMLResponse)
 def delete_pelicula(request: Request, pelicula_id: int, db: Session = Depends(get_db)):
-    pelicula = db.execute(select(Pelicula).where(Pelicula.id == pelicula_id)).scalar_one_or_none()
+    pelicula = db.execute(queries.por_id(Pelicula, pelicula_id)).scalar_one_or_none()
     if pelicula is None:
         raise HTTPException(status_code=404, detail="404 - Película no encontrada")
     try:
@@ -1,24 +1,21 @@
-from fastapi.templating import Jinja2Templates
 from fastapi import APIRouter, Form, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from app.database import get_db
+from app import queries
+from app.services import aforo, catalogo
+from app.templating import render_cacheado, templates
 from app.models import SalaORM
 
-
-templates = Jinja2Templates(directory="app/templates")
-
 router = APIRouter(prefix="/salas", tags=["web"])
 
 # listar salas (http://localhost:8000/salas)
 @router.get("", response_class=HTMLResponse)
 def list_salas(request: Request, db: Session = Depends(get_db)):
-    salas = db.execute(select(SalaORM)).scalars().all()
-    
-    return templates.TemplateResponse(
-        "salas/list.html",
-        {"request": request, "salas": salas}
+    # HTML cacheado por versión de la tabla (ver app/templating.py)
+    return render_cacheado(
+        request, db, "salas/list.html", ("salas",),
+        lambda: {"salas": db.execute(queries.todos(SalaORM)).scalars().all()},
     )
     
 # mostrar formulario crear
@@ -124,11 +121,12 @@ def create_sala(
 # detalle de sala (http://localhost:8000/salas/3)
 @router.get("/{sala_id}", response_class=HTMLResponse)
 def salas_detail(request: Request, sala_id: int, db: Session = Depends(get_db)):
-    sala= db.execute(select(SalaORM).where(SalaORM.id == sala_id)).scalar_one_or_none()
+    sala = catalogo.sala(db, sala_id)
     
     if sala is None:
         raise HTTPException(status_code=404, detail="404 - Sala no encontrada")
     
+    db.release()
     return templates.TemplateResponse(
         "salas/detail.html",
         {"request": request, "sala": sala}
@@ -138,12 +136,13 @@ def salas_detail(request: Request, sala_id: int, db: Session = Depends(get_db)):
 @router.get("/{sala_id}/edit", response_class=HTMLResponse)
 def show_edit_form(request: Request, sala_id: int, db: Session = Depends(get_db)):
     # obtener sala por id
-    sala = db.execute(select(SalaORM).where(SalaORM.id == sala_id)).scalar_one_or_none()
+    sala = db.execute(queries.por_id(SalaORM, sala_id)).scalar_one_or_none()
     
     # lanzar error 404 si no existe canción
     if sala is None:
         raise HTTPException(status_code=404, detail="404 -  Sala no encontrada")
     
+    db.release()
     return templates.TemplateResponse(
         "salas/form.html",
         {"request": request, "sala": sala}
@@ -161,7 +160,7 @@ def update_sala(
     db: Session = Depends(get_db)
    
 ):
-    sala = db.execute(select(SalaORM).where(SalaORM.id == sala_id)).scalar_one_or_none()
+    sala = db.execute(queries.por_id(SalaORM, sala_id)).scalar_one_or_none()
     
     if sala is None:
         raise HTTPException(status_code=404, detail="404 - Sala no encontrada")
@@ -186,8 +185,16 @@ def update_sala(
             errors.append("La capacidad debe ser un número válido")
     elif not capacidad or not capacidad.strip():
         errors.append("La capacidad es requerida")
-    
-    if tipo and tipo.strip():    
+
+    # el formulario no cambia el plano de butacas: la capacidad tiene que seguir cuadrando
+    if (not errors and sala.filas is not None
+            and capacidad_value != sala.filas * sala.butacas_por_fila):
+        errors.append(
+            f"La sala tiene un plano de {sala.filas} x {sala.butacas_por_fila} butacas: "
+            "la capacidad tiene que ser la misma"
+        )
+
+    if tipo and tipo.strip():
         tipo_value = tipo.strip().upper()
         print(tipo_value)
         if tipo_value not in ("2D", "3D", "IMAX"):
@@ -212,15 +219,27 @@ def update_sala(
         )
     
     try:
+        capacidad_anterior = sala.capacidad
         sala.nombre = nombre.strip()
         sala.capacidad = capacidad_value
         sala.tipo = tipo_value
         sala.precio = precio_value
 
+        # con menos capacidad, las butacas ya vendidas o reservadas tienen que caber
+        if capacidad_value < capacidad_anterior:
+            aforo.comprobar_sala(db, sala_id)
+
         db.commit()
         db.refresh(sala)
         
         return RedirectResponse(url=f"/salas/{sala.id}", status_code=303)
+    except HTTPException as e:
+        # 409 de aforo.comprobar_sala: ya ha deshecho la transacción
+        errors.append(e.detail)
+        return templates.TemplateResponse(
+            "salas/form.html",
+            {"request": request, "sala": sala, "errors": errors, "form_data": form_data}
+        )
     except Exception as e:
         db.rollback()
         errors.append(f"Error al actualizar la sala: {str(e)}")
@@ -232,7 +251,7 @@ def update_sala(
 # eliminar sala
 @router.post("/{sala_id}/delete", response_class=HTMLResponse)
 def delete_song(request: Request, sala_id: int, db: Session = Depends(get_db)):
-    sala = db.execute(select(SalaORM).where(SalaORM.id == sala_id)).scalar_one_or_none()
+    sala = db.execute(queries.por_id(SalaORM, sala_id)).scalar_one_or_none()
     
     if sala is None:
         raise HTTPException(status_code=404, detail="404 - Sala no encontrada")
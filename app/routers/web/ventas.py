@@ -1,15 +1,12 @@
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app import queries
+from app.templating import render_cacheado, templates
 from app.models import Venta, MetodoPago, Horario
-
-
-# configuración de Jinja2Templates
-templates = Jinja2Templates(directory="app/templates")
+from app.services import aforo, asientos, precios
 
 # router para rutas web
 router = APIRouter(prefix="/ventas", tags=["web"])
@@ -18,19 +15,19 @@ router = APIRouter(prefix="/ventas", tags=["web"])
 
 @router.get("", response_class=HTMLResponse)
 def list_artists(request: Request, db: Session = Depends(get_db)):
-    ventas = db.execute(select(Venta)).scalars().all()
-
-    return templates.TemplateResponse(
-        "ventas/list.html",
-        {"request": request, "ventas": ventas}
+    # HTML cacheado por versión de la tabla (ver app/templating.py)
+    return render_cacheado(
+        request, db, "ventas/list.html", ("ventas",),
+        lambda: {"ventas": db.execute(queries.todos(Venta)).scalars().all()},
     )
 
 
 
 @router.get("/new", response_class=HTMLResponse)
 def show_create_form(request: Request, db: Session = Depends(get_db)):
-    horarios = db.execute(select(Horario)).scalars().all()
+    horarios = db.execute(queries.todos(Horario)).scalars().all()
     
+    db.release()
     return templates.TemplateResponse(
         "ventas/form.html",
         {"request": request, "venta": None, "horarios": horarios, "metodo_pago": MetodoPago}      
@@ -41,7 +38,6 @@ def show_create_form(request: Request, db: Session = Depends(get_db)):
 def create_venta(
     request:Request,
     horario_id: str = Form(...),
-    precio_total: str = Form(...),
     cantidad: str = Form(...),
     metodo_pago: str = Form(...),
     db:Session = Depends(get_db)
@@ -50,38 +46,29 @@ def create_venta(
     errors = []
     form_data = {
         "horario_id": horario_id,
-        "precio_total": precio_total,
         "cantidad": cantidad,
         "metodo_pago": metodo_pago
     }
     
-    horarios = db.execute(select(Horario)).scalars().all()
+    horarios = db.execute(queries.todos(Horario)).scalars().all()
     
+    # el precio no lo manda el formulario: es el de la sala del horario
+    # (tabla de precios en memoria, app/services/precios.py)
     horario_id_value = None
+    precio_unitario = None
     if horario_id and horario_id.strip():
         try:
             horario_id_value = int(horario_id.strip())
             if horario_id_value < 1:
                 errors.append("El id del horario tiene que ser un numero positivo")
-            horario = db.execute(select(Horario).where(Horario.id == horario_id_value)).scalar_one_or_none()
-            if not horario:
+            precio_unitario = precios.precio_unitario(db, horario_id_value)
+            if precio_unitario is None:
                 errors.append("El horario seleccionado no existe")
         except ValueError:
             errors.append("El id del horario tiene que ser un número válido")
     else:
         errors.append("El id del artista es requerido")
     
-    precio_total_value = None
-    if precio_total and precio_total.strip():
-        try:
-            precio_total_value = float(precio_total.strip())
-            if precio_total_value < 0:
-                errors.append("El precio debe ser un numero positivo")
-        except ValueError:
-            errors.append("El precio debe ser un numero valido")
-    else:
-        errors.append("El precio es requerido")
-    
     cantidad_value = None
     if cantidad and cantidad.strip():
         try:
@@ -90,6 +77,8 @@ def create_venta(
                 errors.append("La cantidad debe ser un numero positivo")
         except ValueError:
             errors.append("La cantidad debe ser un numero valido")
+    else:
+        errors.append("La cantidad es requerida")
     
     
          
@@ -106,11 +95,20 @@ def create_venta(
             {"request": request, "venta": None, "horarios": horarios,"metodos_pagos": MetodoPago,"errors": errors, "form_data": form_data}
         )
     
+    # resta las butacas del aforo en la misma transacción que la venta (app/services/aforo.py)
+    if not aforo.reservar(db, horario_id_value, cantidad_value):
+        db.rollback()
+        errors.append("No quedan butacas libres suficientes para ese horario")
+        return templates.TemplateResponse(
+            "ventas/form.html",
+            {"request": request, "venta": None, "horarios": horarios,"metodos_pagos": MetodoPago,"errors": errors, "form_data": form_data}
+        )
+    
     try:
         venta = Venta(
             
             horario_id =  horario_id_value,
-            precio_total =  precio_total_value,
+            precio_total =  precios.precio_total(precio_unitario, cantidad_value),
             cantidad = cantidad_value,
             metodo_pago =  metodo_pago_value
             )
@@ -133,14 +131,13 @@ def create_venta(
 @router.get("/{venta_id}", response_class=HTMLResponse)
 def venta_detail(request: Request, venta_id: int, db: Session = Depends(get_db)):
     venta = db.execute(
-        select(Venta)
-        .where(Venta.id == venta_id)
-        .options(joinedload(Venta.horario))
+        queries.venta_por_id(venta_id)
     ).scalar_one_or_none()
     
     if venta is None:
         raise HTTPException(status_code=404, detail="Venta no encotrada")
     
+    db.release()
     return templates.TemplateResponse(
         "ventas/detail.html",
         {"request": request, "venta": venta}
@@ -150,16 +147,15 @@ def venta_detail(request: Request, venta_id: int, db: Session = Depends(get_db))
 @router.get("/{venta_id}/edit", response_class=HTMLResponse)
 def show_edit_form(request: Request, venta_id: int, db:Session = Depends(get_db)):
     venta = db.execute(
-        select(Venta)
-        .where(Venta.id == venta_id)
-        .options(joinedload(Venta.horario))
+        queries.venta_por_id(venta_id)
     ).scalar_one_or_none()
     
     if venta is None:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
 
-    horarios = db.execute(select(Horario)).scalars().all()
+    horarios = db.execute(queries.todos(Horario)).scalars().all()
     
+    db.release()
     return templates.TemplateResponse(
             "ventas/form.html",
             {"request": request,"venta": venta, "horarios": horarios, "metodos_pagos": MetodoPago}
@@ -171,15 +167,12 @@ def update_venta(
     request: Request,
     venta_id: int,
     horario_id: str = Form(...),
-    precio_total: str = Form(...),
     cantidad: str = Form(...),
     metodo_pago: str = Form(...),
     db: Session = Depends(get_db) 
 ):
     venta = db.execute(
-        select(Venta)
-        .where(Venta.id == venta_id)
-        .options(joinedload(Venta.horario))
+        queries.venta_por_id(venta_id)
     ).scalar_one_or_none()
     
     
@@ -189,38 +182,29 @@ def update_venta(
     errors = []
     form_data = {
         "horario_id": horario_id,
-        "precio_total": precio_total,
         "cantidad": cantidad,
         "metodo_pago": metodo_pago
     }
     
-    horarios = db.execute(select(Horario)).scalars().all()
+    horarios = db.execute(queries.todos(Horario)).scalars().all()
     
+    # el precio no lo manda el formulario: es el de la sala del horario
+    # (tabla de precios en memoria, app/services/precios.py)
     horario_id_value = None
+    precio_unitario = None
     if horario_id and horario_id.strip():
         try:
             horario_id_value = int(horario_id.strip())
             if horario_id_value < 1:
                 errors.append("El id del horario tiene que ser un numero positivo")
-            horario = db.execute(select(Horario).where(Horario.id == horario_id_value)).scalar_one_or_none()
-            if not horario:
+            precio_unitario = precios.precio_unitario(db, horario_id_value)
+            if precio_unitario is None:
                 errors.append("El horario seleccionado no existe")
         except ValueError:
             errors.append("El id del horario tiene que ser un número válido")
     else:
         errors.append("El id del horario es requerido")
     
-    precio_total_value = None
-    if precio_total and precio_total.strip():
-        try:
-            precio_total_value = float(precio_total.strip())
-            if precio_total_value < 0:
-                errors.append("El precio debe ser un numero positivo")
-        except ValueError:
-            errors.append("El precio debe ser un numero valido")
-    else:
-        errors.append("El precio es requerido")
-    
     cantidad_value = None
     if cantidad and cantidad.strip():
         try:
@@ -229,6 +213,8 @@ def update_venta(
                 errors.append("La cantidad debe ser un numero positivo")
         except ValueError:
             errors.append("La cantidad debe ser un numero valido")
+    else:
+        errors.append("La cantidad es requerida")
     
     
          
@@ -239,16 +225,30 @@ def update_venta(
         errors.append("El metodo de pago debe ser efectivo o tarjeta")
     
     
+    # las butacas elegidas en el plano no se mueven de horario (app/services/asientos.py)
+    if not errors and venta.asientos and (horario_id_value, cantidad_value) != (venta.horario_id, venta.cantidad):
+        errors.append(f"La venta tiene las butacas {venta.asientos}: no se puede cambiar su horario ni su cantidad")
+    
     if errors:
         return templates.TemplateResponse(
             "ventas/form.html",
             {"request": request, "venta": venta, "horarios": horarios,"metodos_pagos": MetodoPago,"errors": errors, "form_data": form_data}
         )
     
+    # devuelve las butacas de la venta y reserva las nuevas (app/services/aforo.py)
+    aforo.liberar(db, venta.horario_id, venta.cantidad)
+    if not aforo.reservar(db, horario_id_value, cantidad_value):
+        db.rollback()
+        errors.append("No quedan butacas libres suficientes para ese horario")
+        return templates.TemplateResponse(
+            "ventas/form.html",
+            {"request": request, "venta": venta, "horarios": horarios,"metodos_pagos": MetodoPago,"errors": errors, "form_data": form_data}
+        )
+    
     try:
         # ACTUALIZAR la venta existente en lugar de crear una nueva
         venta.horario_id = horario_id_value
-        venta.precio_total = precio_total_value
+        venta.precio_total = precios.precio_total(precio_unitario, cantidad_value)
         venta.cantidad = cantidad_value
         venta.metodo_pago = metodo_pago_value
         
@@ -269,12 +269,18 @@ def update_venta(
     
 @router.post("/{venta_id}/delete", response_class=HTMLResponse)
 def delete_venta(request: Request, venta_id: int, db: Session = Depends(get_db)):
-    venta = db.execute(select(Venta).where(Venta.id == venta_id)).scalar_one_or_none()
+    venta = db.execute(queries.por_id(Venta, venta_id)).scalar_one_or_none()
     if venta is None:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
     try:
+        aforo.liberar(db, venta.horario_id, venta.cantidad)
+        horario_id, butacas = venta.horario_id, venta.asientos
+        if butacas:
+            asientos.liberar(db, horario_id, butacas)
         db.delete(venta)
         db.commit()
+        if butacas:
+            asientos.descartar(horario_id)
         return RedirectResponse("/ventas", status_code=303)
     except Exception as e:
         db.rollback()
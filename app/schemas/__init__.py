@@ -1,14 +1,22 @@
 """
 Esquemas Pydantic para validación de datos
 """
-from app.schemas.pelicula import PeliculaResponse, PeliculaCreate, PeliculaPatch, PeliculaUpdate
+from app.schemas.pelicula import PeliculaResponse, PeliculaCatalogo, PeliculaCreate, PeliculaExport, PeliculaPatch, PeliculaUpdate
+from app.schemas.pelicula import ImportacionResponse, PeliculaImport
 from app.schemas.horario import HorarioResponse, HorarioCreate, HorarioUpdate, HorarioPatch
 from app.schemas.sala import SalaResponse, SalaCreate, SalaUpdate   
 from app.schemas.genre import GenreCreate, GenrePatch, GenreResponse, GenreUpdate
 from app.schemas.venta import VentaCreate, VentaPatch, VentaResponse, VentaUpdate
+from app.schemas.cartelera import CarteleraResponse
+from app.schemas.asientos import PlanoResponse, ReservaAsientos
+from app.schemas.reserva import ReservaConfirmar, ReservaCreate, ReservaResponse
 __all__ = ["HorarioResponse", "HorarioCreate", "HorarioUpdate", "HorarioPatch",
            "SalaResponse", "SalaCreate", "SalaUpdate",
            "GenreCreate", "GenrePatch", "GenreResponse", "GenreUpdate",
            "VentaCreate", "VentaPatch", "VentaResponse", "VentaUpdate",
-           "PeliculaResponse","PeliculaCreate","PeliculaPatch","PeliculaUpdate"
+           "PeliculaResponse","PeliculaCatalogo","PeliculaCreate","PeliculaExport","PeliculaPatch","PeliculaUpdate",
+           "PeliculaImport", "ImportacionResponse",
+           "CarteleraResponse",
+           "PlanoResponse", "ReservaAsientos",
+           "ReservaConfirmar", "ReservaCreate", "ReservaResponse"
            ]  
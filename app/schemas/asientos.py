@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from app.models.venta import MetodoPago
+
+# plano de butacas de un horario (GET /api/horarios/{id}/asientos)
+class PlanoResponse(BaseModel):
+    horario_id: int
+    filas: int
+    butacas_por_fila: int
+    # butacas sin marcar en el plano; las entradas sin butaca también restan
+    # del aforo, así que puede que no se puedan vender todas
+    libres: int
+    # una cadena por fila (A, B, ...): "." libre, "X" ocupada
+    plano: list[str]
+
+# butacas que se quieren comprar (POST /api/horarios/{id}/asientos)
+class ReservaAsientos(BaseModel):
+    # fila en letras y número de butaca desde 1: ["C4", "C5"]
+    asientos: list[str] = Field(..., min_length=1, max_length=100)
+    metodo_pago: MetodoPago = MetodoPago.TARJETA
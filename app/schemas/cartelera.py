@@ -0,0 +1,28 @@
+# app/schemas/cartelera.py
+# Respuesta de GET /api/cartelera: una sesión (horario) con su película y su sala.
+
+from pydantic import BaseModel, ConfigDict, computed_field
+
+
+class CarteleraResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    horario_id: int
+    hora: str
+    disponible: bool
+    pelicula_id: int
+    titulo: str | None
+    genero: str | None
+    sala_id: int
+    sala_nombre: str | None
+    sala_tipo: str | None
+    precio: float | None
+    capacidad: int | None
+    vendidas: int
+
+    @computed_field
+    @property
+    def asientos_libres(self) -> int | None:
+        if self.capacidad is None:
+            return None
+        return max(self.capacidad - self.vendidas, 0)
@@ -1,7 +1,7 @@
 # app/schemas/pelicula.py
 # Define los modelos Pydantic (BaseModel) para validación en la API
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 from typing import List, Optional, Any
 from app.schemas.genre import GenreResponse
 
@@ -15,6 +15,19 @@ class PeliculaResponse(BaseModel):
     genero_id: int
     genero: GenreResponse 
 
+
+# Copia de sólo lectura que guarda la caché del catálogo (app/services/catalogo.py).
+# Incluye imagen porque la usan las plantillas; la API la descarta al
+# serializar con response_model=PeliculaResponse.
+class PeliculaCatalogo(PeliculaResponse):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    imagen: Optional[str] = None
+
+# Elemento de GET /api/peliculas/export/json (app/services/exportacion.py):
+# la respuesta de la API más la imagen, para que la exportación esté completa.
+class PeliculaExport(PeliculaResponse):
+    imagen: Optional[str] = None
+
 # --- Esquema de Creación (POST /peliculas) ---
 # Hereda de Base y añade campos necesarios solo al crear.
 class PeliculaCreate(BaseModel):
@@ -127,3 +140,64 @@ class PeliculaPatch(BaseModel):
             raise ValueError("El id del genero debe ser un número positivo")
         
         return v
+
+
+# --- Importación del catálogo (app/services/importacion.py) ---
+# Una fila del CSV o un elemento de la lista JSON. Acepta lo que produce la
+# exportación: el género por nombre (genero_nombre, se crea si no existe) o
+# por id, y disponible como Sí/No. Las columnas vacías del CSV cuentan como
+# no indicadas y el resto de campos (id, genero...) se ignoran.
+class PeliculaImport(BaseModel):
+    titulo: str
+    duracion: int
+    disponible: bool = True
+    genero_nombre: str | None = None
+    genero_id: int | None = None
+    imagen: str | None = None
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def vacio_es_none(cls, v: Any) -> Any:
+        if isinstance(v, str) and not v.strip():
+            return None
+        return v
+
+    @field_validator("disponible", mode="before")
+    @classmethod
+    def validate_disponible_si_no(cls, v: Any) -> Any:
+        if v is None or (isinstance(v, str) and not v.strip()):
+            return True
+        if isinstance(v, str) and v.strip().lower() in ("sí", "si", "no"):
+            return v.strip().lower() != "no"
+        return v
+
+    @field_validator("titulo")
+    @classmethod
+    def validate_titulo_not_empty(cls, v: str) -> str:
+        if not v or not v.strip():
+            raise ValueError("El titulo no puede estar vacío")
+        return v.strip()
+
+    @field_validator("duracion")
+    @classmethod
+    def validate_duracion_positive(cls, v: int) -> int:
+        if v < 1:
+            raise ValueError("La duracion debe de ser positiva")
+        return v
+
+    @model_validator(mode="after")
+    def validate_genero(self):
+        if self.genero_nombre is None and self.genero_id is None:
+            raise ValueError("Hace falta genero_nombre o genero_id")
+        return self
+
+
+class ErrorImportacion(BaseModel):
+    fila: int | None  # 1 = primera fila de datos; None en el resumen de errores omitidos
+    error: str
+
+
+class ImportacionResponse(BaseModel):
+    insertadas: int
+    actualizadas: int
+    errores: list[ErrorImportacion]
@@ -0,0 +1,37 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from app.models.venta import MetodoPago
+from app.schemas.venta import Asientos
+
+# reserva temporal de butacas (app/services/reservas.py)
+class ReservaResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    horario_id: int
+    cantidad: int
+    asientos: Asientos = None
+    # las butacas vuelven a estar a la venta a partir de este momento
+    expira_en: datetime
+
+# POST /api/reservas: una cantidad de butacas o butacas concretas del plano
+class ReservaCreate(BaseModel):
+    horario_id: int
+    cantidad: int | None = None
+    asientos: list[str] | None = Field(None, min_length=1, max_length=100)
+
+    @field_validator("horario_id", "cantidad")
+    @classmethod
+    def validate_positive(cls, v: int | None) -> int | None:
+        if v is not None and v < 1:
+            raise ValueError("El id de horario y la cantidad deben ser positivas")
+        return v
+
+    @model_validator(mode="after")
+    def validate_cantidad_o_asientos(self):
+        if (self.cantidad is None) == (self.asientos is None):
+            raise ValueError("Hay que indicar cantidad o asientos, pero no los dos")
+        return self
+
+# POST /api/reservas/{id}/confirmar
+class ReservaConfirmar(BaseModel):
+    metodo_pago: MetodoPago = MetodoPago.TARJETA
@@ -2,7 +2,7 @@
 Esquemas Pydantic para estructura y validación de datos de Sala
 """
 from fastapi import HTTPException, status
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
 # schema para TODAS las respuestas de la API
 # lo usamos en GET, POST, PUT, PATCH
@@ -15,6 +15,19 @@ class SalaResponse(BaseModel):
     capacidad: int
     tipo: str
     precio: float
+    filas: int | None = None
+    butacas_por_fila: int | None = None
+
+
+def validar_plano(sala):
+    # plano de butacas opcional (app/services/asientos.py): las dos medidas o
+    # ninguna, y tantas butacas como capacidad
+    if (sala.filas is None) != (sala.butacas_por_fila is None):
+        raise ValueError("Hay que indicar filas y butacas_por_fila, o ninguna de las dos")
+    if sala.filas is not None and sala.capacidad is not None and sala.filas * sala.butacas_por_fila != sala.capacidad:
+        raise ValueError("filas x butacas_por_fila tiene que ser igual a la capacidad")
+    return sala
+
         
 class SalaCreate(BaseModel):
     model_config = ConfigDict(from_attributes = True)
@@ -23,6 +36,8 @@ class SalaCreate(BaseModel):
     capacidad: int
     tipo: str
     precio: float
+    filas: int | None = None
+    butacas_por_fila: int | None = None
     
     @field_validator("nombre", "tipo")
     @classmethod
@@ -58,6 +73,19 @@ class SalaCreate(BaseModel):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tipo de sala inválido")
         return v.upper()
 
+    @field_validator("filas", "butacas_por_fila")
+    @classmethod
+    def validate_plano_positive(cls, v: int | None) -> int | None:
+        if v is None:
+            return None
+        if v <= 0:
+            raise ValueError("Las filas y las butacas por fila deben ser números positivos")
+        return v
+
+    @model_validator(mode="after")
+    def validate_plano(self):
+        return validar_plano(self)
+
 class SalaUpdate(BaseModel):
     model_config = ConfigDict(from_attributes = True)
     
@@ -65,6 +93,8 @@ class SalaUpdate(BaseModel):
     capacidad: int | None = None
     tipo: str | None = None
     precio: float | None = None 
+    filas: int | None = None
+    butacas_por_fila: int | None = None
     
     @field_validator("nombre", "tipo")
     @classmethod
@@ -114,4 +144,17 @@ class SalaUpdate(BaseModel):
         # valia el tipo de sala
         if v not in ["2D", "3D", "IMAX", "2d", "3d", "imax", "Imax"]:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tipo de sala inválido")
-        return v.upper()
\ No newline at end of file
+        return v.upper()
+
+    @field_validator("filas", "butacas_por_fila")
+    @classmethod
+    def validate_plano_positive(cls, v: int | None) -> int | None:
+        if v is None:
+            return None
+        if v <= 0:
+            raise ValueError("Las filas y las butacas por fila deben ser números positivos")
+        return v
+
+    @model_validator(mode="after")
+    def validate_plano(self):
+        return validar_plano(self)
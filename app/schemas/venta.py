@@ -1,7 +1,13 @@
+from typing import Annotated
 from app.models.venta import MetodoPago
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, BeforeValidator, ConfigDict, field_validator
 from app.schemas import HorarioResponse
 
+# en la base de datos las butacas se guardan separadas por comas ("A1,A2");
+# en el tipo y no en un field_validator para que lo conserven los modelos
+# parciales de ?fields= (app/campos.py)
+Asientos = Annotated[list[str] | None, BeforeValidator(lambda v: v.split(",") if isinstance(v, str) else v)]
+
 class VentaResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
@@ -10,6 +16,8 @@ class VentaResponse(BaseModel):
     precio_total: float
     cantidad: int
     metodo_pago: MetodoPago
+    # butacas elegidas en el plano (POST /api/horarios/{id}/asientos); None sin butaca
+    asientos: Asientos = None
 
 class VentaCreate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
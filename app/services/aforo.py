@@ -0,0 +1,140 @@
+# app/services/aforo.py
+# Aforo de cada horario: no vender más butacas que la capacidad de su sala.
+#
+# horarios.vendidas (migración v0007) lleva la cuenta de butacas vendidas.
+# Vender n butacas es un único UPDATE condicional:
+#
+#   UPDATE horarios SET vendidas = vendidas + :n
+#   WHERE id = :horario_id AND vendidas + :n <= capacidad de la sala
+#
+# en la misma transacción que el INSERT de la venta. SQLite sólo tiene un
+# escritor a la vez, así que dos ventas a la vez de las últimas butacas no
+# pueden pasar las dos: la segunda ya ve el contador de la primera y no cambia
+# ninguna fila. No hace falta SUM(cantidad) de las ventas en cada petición.
+#
+# Cambiar o borrar una venta devuelve sus butacas con liberar() en la misma
+# transacción. Cualquier camino que cree, cambie o borre ventas (API, web,
+# escritor de app/services/venta_writer.py) tiene que pasar por aquí.
+#
+# Las reservas temporales (app/services/reservas.py) también cuentan: crearlas
+# suma sus butacas a vendidas y cancelarlas o caducarlas las devuelve.
+#
+# El aforo también baja al mover un horario a otra sala o al reducir la
+# capacidad de una sala. comprobar_horario() y comprobar_sala() escriben el
+# cambio (flush) y miran en la misma transacción si algún horario queda con
+# más butacas vendidas que capacidad: el UPDATE ya tiene el bloqueo de
+# escritura, así que ninguna venta puede colarse entre el cambio y la
+# comprobación.
+#
+# Uso en un router:
+#   aforo.reservar_o_409(db, venta_dto.horario_id, venta_dto.cantidad)
+#   db.add(venta)
+#   db.commit()
+#
+#   setattr(sala, "capacidad", nueva)
+#   aforo.comprobar_sala(db, sala.id)  # 409 y rollback si no caben
+#   db.commit()
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import queries
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def sin_aforo(horario_id: int, n: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"No quedan {n} butacas libres para el horario {horario_id}",
+    )
+
+
+def reservar(db: Session, horario_id: int, n: int) -> bool:
+    """
+    Suma n butacas vendidas al horario si caben. Devuelve False (y no cambia
+    nada) si no caben o si el horario no existe.
+    """
+    return db.execute(queries.reservar_butacas(), {"horario_id": horario_id, "n": n}).rowcount == 1
+
+
+async def reservar_async(db: AsyncSession, horario_id: int, n: int) -> bool:
+    result = await db.execute(queries.reservar_butacas(), {"horario_id": horario_id, "n": n})
+    return result.rowcount == 1
+
+
+def reservar_o_409(db: Session, horario_id: int, n: int) -> None:
+    """
+    Como reservar(), pero si no caben deshace la transacción y lanza un 409.
+    """
+    if not reservar(db, horario_id, n):
+        db.rollback()
+        raise sin_aforo(horario_id, n)
+
+
+async def reservar_o_409_async(db: AsyncSession, horario_id: int, n: int) -> None:
+    if not await reservar_async(db, horario_id, n):
+        await db.rollback()
+        raise sin_aforo(horario_id, n)
+
+
+def liberar(db: Session, horario_id: int, n: int) -> None:
+    db.execute(queries.liberar_butacas(), {"horario_id": horario_id, "n": n})
+
+
+async def liberar_async(db: AsyncSession, horario_id: int, n: int) -> None:
+    await db.execute(queries.liberar_butacas(), {"horario_id": horario_id, "n": n})
+
+
+def _capacidad_insuficiente(fila) -> HTTPException:
+    horario_id, vendidas, capacidad = fila
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=(f"El horario {horario_id} tiene {vendidas} butacas vendidas o reservadas "
+                f"y la sala sólo tendría {capacidad}"),
+    )
+
+
+def comprobar_horario(db: Session, horario_id: int) -> None:
+    """
+    Tras cambiar la sala del horario (sin commit): si sus butacas vendidas no
+    caben en la nueva sala, deshace la transacción y lanza un 409.
+    """
+    db.flush()
+    fila = db.execute(queries.horario_sobre_aforo(), {"horario_id": horario_id}).first()
+    if fila is not None:
+        db.rollback()
+        raise _capacidad_insuficiente(fila)
+
+
+async def comprobar_horario_async(db: AsyncSession, horario_id: int) -> None:
+    await db.flush()
+    fila = (await db.execute(queries.horario_sobre_aforo(), {"horario_id": horario_id})).first()
+    if fila is not None:
+        await db.rollback()
+        raise _capacidad_insuficiente(fila)
+
+
+def comprobar_sala(db: Session, sala_id: int) -> None:
+    """
+    Tras cambiar la capacidad de la sala (sin commit): si algún horario suyo
+    tiene más butacas vendidas, deshace la transacción y lanza un 409.
+    """
+    db.flush()
+    fila = db.execute(queries.sala_sobre_aforo(), {"sala_id": sala_id}).first()
+    if fila is not None:
+        db.rollback()
+        raise _capacidad_insuficiente(fila)
+
+
+async def comprobar_sala_async(db: AsyncSession, sala_id: int) -> None:
+    await db.flush()
+    fila = (await db.execute(queries.sala_sobre_aforo(), {"sala_id": sala_id})).first()
+    if fila is not None:
+        await db.rollback()
+        raise _capacidad_insuficiente(fila)
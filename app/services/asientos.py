@@ -0,0 +1,377 @@
+# app/services/asientos.py
+# Plano de butacas de cada horario: elegir butacas concretas ("A1", "C7"...).
+#
+# La sala define el plano (salas.filas x salas.butacas_por_fila, migración
+# v0008) y cada horario guarda qué butacas están ocupadas en un mapa de bits
+# (horarios.ocupacion): la butaca de la fila f y la columna c es el bit
+# i = f * butacas_por_fila + c, en el byte i >> 3. Una sala IMAX de 400 butacas
+# son 50 bytes. Comprobar y marcar k butacas mira y cambia k bits: no hay una
+# fila por butaca que consultar ni bloquear.
+#
+# Reservar butacas (reclamar()) va en la transacción de la venta:
+#   1. aforo.reservar_o_409() suma las butacas al contador del horario: es la
+#      primera escritura, así que a partir de aquí la transacción tiene el
+#      único escritor de SQLite y nadie puede cambiar el mapa a la vez
+#   2. lee el mapa del horario, comprueba los k bits y, si alguno ya está
+#      ocupado, deshace la transacción y responde 409 con esas butacas
+#   3. escribe el mapa con los k bits nuevos
+# El router inserta la venta (con sus butacas en ventas.asientos) y hace commit.
+# Las ventas sin butaca siguen restando del aforo: comparten el contador.
+#
+# La copia en memoria (asientos_cache, app/cache.py) sirve GET
+# /api/horarios/{id}/asientos sin consultar la base de datos. Depende de
+# horarios y salas; cambiar el mapa no pasa por el ORM, así que tras el commit
+# el router llama a descartar() y la siguiente lectura lo vuelve a cargar. Como
+# el resto de cachés, otro worker puede enseñar un mapa antiguo como mucho
+# durante ttl segundos, pero reclamar() siempre comprueba el mapa de la base de
+# datos: nunca se venden dos veces la misma butaca.
+#
+# Uso en un router:
+#   butacas = asientos.reclamar(db, horario_id, dto.asientos)
+#   db.add(Venta(..., cantidad=len(dto.asientos), asientos=butacas))
+#   db.commit()
+#   asientos.descartar(horario_id)
+
+from __future__ import annotations
+
+import re
+import string
+from dataclasses import dataclass
+from functools import cached_property
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.cache import asientos_cache
+from app.schemas.sala import validar_plano
+from app.services import aforo
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+_TABLAS = ("horarios", "salas")
+
+# fila en letras (A..Z, AA, AB...) y butaca desde 1
+_ETIQUETA = re.compile(r"^([A-Z]+)([1-9][0-9]*)$")
+
+
+def nombre_fila(fila: int) -> str:
+    """0 -> "A", 25 -> "Z", 26 -> "AA"."""
+    nombre = ""
+    fila += 1
+    while fila:
+        fila, resto = divmod(fila - 1, 26)
+        nombre = string.ascii_uppercase[resto] + nombre
+    return nombre
+
+
+def numero_fila(nombre: str) -> int:
+    """Inversa de nombre_fila()."""
+    fila = 0
+    for letra in nombre:
+        fila = fila * 26 + ord(letra) - ord("A") + 1
+    return fila - 1
+
+
+@dataclass(frozen=True)
+class Plano:
+    filas: int
+    butacas_por_fila: int
+    ocupacion: bytes  # mapa de bits; puede ser más corto que el plano (el resto, libres)
+
+    @property
+    def total(self) -> int:
+        return self.filas * self.butacas_por_fila
+
+    def indice(self, fila: int, butaca: int) -> int | None:
+        """Bit de la butaca (fila y butaca desde 0), o None si está fuera del plano."""
+        if 0 <= fila < self.filas and 0 <= butaca < self.butacas_por_fila:
+            return fila * self.butacas_por_fila + butaca
+        return None
+
+    def etiqueta(self, i: int) -> str:
+        fila, butaca = divmod(i, self.butacas_por_fila)
+        return f"{nombre_fila(fila)}{butaca + 1}"
+
+    def ocupada(self, i: int) -> bool:
+        byte = i >> 3
+        return byte < len(self.ocupacion) and bool(self.ocupacion[byte] >> (i & 7) & 1)
+
+    def ocupadas(self) -> int:
+        return int.from_bytes(self.ocupacion, "little").bit_count()
+
+    def fila(self, fila: int) -> str:
+        """La fila como texto: "." libre, "X" ocupada."""
+        inicio = fila * self.butacas_por_fila
+        return "".join("X" if self.ocupada(i) else "." for i in range(inicio, inicio + self.butacas_por_fila))
+
+    @cached_property
+    def huecos(self) -> tuple[tuple[tuple[int, int], ...], ...]:
+        """
+        Butacas libres seguidas de cada fila: ((inicio, longitud), ...) por
+        fila. Se calcula una vez por mapa (la copia en memoria guarda el Plano)
+        con operaciones de bits sobre la fila entera: un paso por hueco, no
+        por butaca.
+        """
+        ancho = self.butacas_por_fila
+        llena = (1 << ancho) - 1
+        filas = []
+        for fila in range(self.filas):
+            # sólo los bytes de la fila (más allá de ocupacion, todo libre)
+            bit = fila * ancho
+            trozo = int.from_bytes(self.ocupacion[bit >> 3:(bit + ancho + 7) >> 3], "little") >> (bit & 7)
+            libres = ~trozo & llena
+            huecos = []
+            while libres:
+                inicio = (libres & -libres).bit_length() - 1
+                resto = libres >> inicio
+                longitud = (~resto & (resto + 1)).bit_length() - 1  # unos seguidos desde inicio
+                huecos.append((inicio, longitud))
+                libres &= ~(((1 << longitud) - 1) << inicio)
+            filas.append(tuple(huecos))
+        return tuple(filas)
+
+    @cached_property
+    def hueco_maximo(self) -> tuple[int, ...]:
+        """Longitud del hueco más largo de cada fila (0 si está llena)."""
+        return tuple(max((longitud for _, longitud in fila), default=0) for fila in self.huecos)
+
+    def con_bits(self, indices: Iterable[int], ocupadas: bool) -> bytes:
+        """Mapa de bits con esas butacas ocupadas (o libres)."""
+        mapa = bytearray(self.ocupacion.ljust((self.total + 7) >> 3, b"\0"))
+        for i in indices:
+            if ocupadas:
+                mapa[i >> 3] |= 1 << (i & 7)
+            else:
+                mapa[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        return bytes(mapa)
+
+
+# --- errores ---
+
+def _invalidas(etiquetas: list[str], msg: str) -> HTTPException:
+    # mismo formato que los errores de validación de FastAPI
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=[{"type": "value_error", "loc": ["body", "asientos"], "msg": msg, "input": etiquetas}],
+    )
+
+
+def sin_plano(horario_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"El horario {horario_id} no existe o su sala no tiene plano de butacas",
+    )
+
+
+class ButacasOcupadas(HTTPException):
+    """409 de reclamar(): alguna de las butacas ya estaba ocupada."""
+
+
+def ocupados(horario_id: int, etiquetas: list[str]) -> ButacasOcupadas:
+    return ButacasOcupadas(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Butacas ya ocupadas en el horario {horario_id}: {', '.join(etiquetas)}",
+    )
+
+
+def venta_con_asientos(venta_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"La venta {venta_id} tiene butacas asignadas: no se puede cambiar su horario ni su cantidad",
+    )
+
+
+def con_asientos_asignados(que: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{que} tiene ventas con butacas asignadas: no se puede cambiar su plano de butacas",
+    )
+
+
+# --- etiquetas ---
+
+def posiciones(etiquetas: list[str]) -> list[tuple[int, int]]:
+    """
+    [(fila, butaca)] desde 0 de etiquetas como "A1". 422 si alguna no tiene ese
+    formato o está repetida. No mira el plano: no consulta la base de datos.
+    """
+    resultado = []
+    vistas = set()
+    for etiqueta in etiquetas:
+        encontrado = _ETIQUETA.match(etiqueta.strip().upper())
+        if encontrado is None:
+            raise _invalidas(etiquetas, f"Butaca no válida: {etiqueta!r} (fila en letras y número, p. ej. A1)")
+        posicion = (numero_fila(encontrado.group(1)), int(encontrado.group(2)) - 1)
+        if posicion in vistas:
+            raise _invalidas(etiquetas, f"Butaca repetida: {etiqueta}")
+        vistas.add(posicion)
+        resultado.append(posicion)
+    return resultado
+
+
+def _indices(plano: Plano, etiquetas: list[str], posiciones: list[tuple[int, int]]) -> list[int]:
+    indices = [plano.indice(fila, butaca) for fila, butaca in posiciones]
+    fuera = [etiquetas[n] for n, i in enumerate(indices) if i is None]
+    if fuera:
+        raise _invalidas(
+            etiquetas,
+            f"Butacas fuera del plano de {plano.filas} x {plano.butacas_por_fila}: {', '.join(fuera)}",
+        )
+    return indices
+
+
+def _plano(fila) -> Plano | None:
+    # fila de queries.plano_horario(): (filas, butacas_por_fila, ocupacion)
+    if fila is None or fila[0] is None:
+        return None
+    return Plano(fila[0], fila[1], bytes(fila[2] or b""))
+
+
+# --- lectura (copia en memoria) ---
+
+def plano(db: Session, horario_id: int) -> Plano:
+    """
+    Plano del horario con sus butacas ocupadas, de la copia en memoria si
+    está. 404 si el horario no existe o su sala no tiene plano.
+    """
+    resultado = asientos_cache.get(horario_id)
+    if resultado is None:
+        generacion = asientos_cache.generacion
+        resultado = _plano(db.execute(queries.plano_horario(), {"horario_id": horario_id}).one_or_none())
+        if resultado is None:
+            raise sin_plano(horario_id)
+        asientos_cache.set(horario_id, resultado, _TABLAS, generacion)
+    return resultado
+
+
+async def plano_async(db: AsyncSession, horario_id: int) -> Plano:
+    resultado = asientos_cache.get(horario_id)
+    if resultado is None:
+        generacion = asientos_cache.generacion
+        fila = (await db.execute(queries.plano_horario(), {"horario_id": horario_id})).one_or_none()
+        resultado = _plano(fila)
+        if resultado is None:
+            raise sin_plano(horario_id)
+        asientos_cache.set(horario_id, resultado, _TABLAS, generacion)
+    return resultado
+
+
+def descartar(horario_id: int) -> None:
+    """Tras el commit que cambia el mapa de un horario: la copia en memoria ya no vale."""
+    asientos_cache.descartar(horario_id)
+
+
+# --- escritura (en la transacción de la venta, sin commit) ---
+
+def reclamar(db: Session, horario_id: int, etiquetas: list[str]) -> str:
+    """
+    Ocupa las butacas en el horario y resta su número del aforo. Devuelve las
+    butacas normalizadas para ventas.asientos ("A1,A2"). Si no puede, deshace
+    la transacción y lanza 404 (sin plano), 422 (butacas no válidas) o 409
+    (ocupadas o sin aforo).
+    """
+    pos = posiciones(etiquetas)
+    aforo.reservar_o_409(db, horario_id, len(pos))
+    try:
+        actual = _plano(db.execute(queries.plano_horario(), {"horario_id": horario_id}).one_or_none())
+        if actual is None:
+            raise sin_plano(horario_id)
+        indices = _indices(actual, etiquetas, pos)
+        tomadas = [actual.etiqueta(i) for i in indices if actual.ocupada(i)]
+        if tomadas:
+            raise ocupados(horario_id, tomadas)
+    except HTTPException:
+        db.rollback()
+        raise
+    db.execute(queries.guardar_ocupacion(), {"horario_id": horario_id, "ocupacion": actual.con_bits(indices, True)})
+    return ",".join(actual.etiqueta(i) for i in indices)
+
+
+async def reclamar_async(db: AsyncSession, horario_id: int, etiquetas: list[str]) -> str:
+    pos = posiciones(etiquetas)
+    await aforo.reservar_o_409_async(db, horario_id, len(pos))
+    try:
+        fila = (await db.execute(queries.plano_horario(), {"horario_id": horario_id})).one_or_none()
+        actual = _plano(fila)
+        if actual is None:
+            raise sin_plano(horario_id)
+        indices = _indices(actual, etiquetas, pos)
+        tomadas = [actual.etiqueta(i) for i in indices if actual.ocupada(i)]
+        if tomadas:
+            raise ocupados(horario_id, tomadas)
+    except HTTPException:
+        await db.rollback()
+        raise
+    await db.execute(queries.guardar_ocupacion(), {"horario_id": horario_id, "ocupacion": actual.con_bits(indices, True)})
+    return ",".join(actual.etiqueta(i) for i in indices)
+
+
+def _indices_guardados(actual: Plano | None, asientos: str) -> list[int]:
+    # butacas de ventas.asientos; ignora las que ya no están en el plano
+    if actual is None:
+        return []
+    indices = (actual.indice(fila, butaca) for fila, butaca in posiciones(asientos.split(",")))
+    return [i for i in indices if i is not None]
+
+
+def liberar(db: Session, horario_id: int, asientos: str) -> None:
+    """
+    Deja libres las butacas de una venta (ventas.asientos) al borrarla. Va
+    después de aforo.liberar(), que ya tiene la escritura de la transacción.
+    """
+    actual = _plano(db.execute(queries.plano_horario(), {"horario_id": horario_id}).one_or_none())
+    indices = _indices_guardados(actual, asientos)
+    if indices:
+        db.execute(queries.guardar_ocupacion(), {"horario_id": horario_id, "ocupacion": actual.con_bits(indices, False)})
+
+
+async def liberar_async(db: AsyncSession, horario_id: int, asientos: str) -> None:
+    actual = _plano((await db.execute(queries.plano_horario(), {"horario_id": horario_id})).one_or_none())
+    indices = _indices_guardados(actual, asientos)
+    if indices:
+        await db.execute(
+            queries.guardar_ocupacion(), {"horario_id": horario_id, "ocupacion": actual.con_bits(indices, False)}
+        )
+
+
+# --- cambios de plano ---
+
+def horario_con_asientos(db: Session, horario_id: int) -> bool:
+    return bool(db.execute(queries.horario_con_asientos(), {"horario_id": horario_id}).scalar())
+
+
+async def horario_con_asientos_async(db: AsyncSession, horario_id: int) -> bool:
+    return bool((await db.execute(queries.horario_con_asientos(), {"horario_id": horario_id})).scalar())
+
+
+def cambia_plano(sala, cambios: dict) -> bool:
+    """
+    Para PATCH de una sala: cambios son sólo los campos enviados
+    (model_dump(exclude_unset=True)). Valida el plano y la capacidad con los que
+    queda la sala (lo enviado sobre la fila actual) y devuelve si el plano
+    cambia. 422 si no cuadran.
+    """
+    queda = SimpleNamespace(**{
+        campo: cambios.get(campo, getattr(sala, campo))
+        for campo in ("capacidad", "filas", "butacas_por_fila")
+    })
+    try:
+        validar_plano(queda)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[{"type": "value_error", "loc": ["body"], "msg": str(exc), "input": cambios}],
+        )
+    return (queda.filas, queda.butacas_por_fila) != (sala.filas, sala.butacas_por_fila)
+
+
+def sala_con_asientos(db: Session, sala_id: int) -> bool:
+    return bool(db.execute(queries.sala_con_asientos(), {"sala_id": sala_id}).scalar())
+
+
+async def sala_con_asientos_async(db: AsyncSession, sala_id: int) -> bool:
+    return bool((await db.execute(queries.sala_con_asientos(), {"sala_id": sala_id})).scalar())
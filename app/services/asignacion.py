@@ -0,0 +1,107 @@
+# app/services/asignacion.py
+# Mejores n butacas juntas de un horario, para ventas de grupo en taquilla.
+#
+# El "punto ideal" de la sala está centrado y a dos tercios de la pantalla (la
+# fila A es la más cercana). Cada bloque de n butacas seguidas de una fila se
+# puntúa con la distancia al cuadrado de su centro a ese punto, contando una
+# fila y una butaca como la misma distancia; gana el que menos puntos tiene.
+#
+# No se recorre butaca a butaca: el Plano de la copia en memoria (ver
+# app/services/asientos.py) trae ya los huecos de cada fila (inicio, longitud)
+# y el más largo de cada fila.
+#   - las filas se miran de la más cercana a la fila ideal a la más lejana, y
+#     se para en cuanto la distancia de la fila ya es peor que el mejor bloque
+#   - una fila cuyo hueco más largo es menor que n se salta sin mirar sus huecos
+#   - en cada hueco el mejor bloque es el más centrado que cabe: una cuenta
+#
+# asignar() elige el bloque sobre la copia en memoria y lo compra con
+# asientos.reclamar(), que lo comprueba en la base de datos. Si mientras tanto
+# otro worker ha vendido alguna de esas butacas, vuelve a elegir con el mapa
+# recién leído (como mucho _INTENTOS veces).
+#
+# Uso en un router:
+#   butacas = asignacion.asignar(db, horario_id, n)
+#   db.add(Venta(..., cantidad=n, asientos=butacas))
+#   db.commit()
+#   asientos.descartar(horario_id)
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.services import asientos
+from app.services.asientos import Plano
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+_INTENTOS = 3
+
+
+def sin_bloque(horario_id: int, n: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"No quedan {n} butacas juntas libres en el horario {horario_id}",
+    )
+
+
+def fila_ideal(filas: int) -> float:
+    return (filas - 1) * 2 / 3
+
+
+def mejor_bloque(plano: Plano, n: int) -> list[str] | None:
+    """
+    Etiquetas de las n butacas seguidas más cercanas al punto ideal, o None
+    si ninguna fila tiene un hueco de n.
+    """
+    ideal = fila_ideal(plano.filas)
+    centrado = (plano.butacas_por_fila - n) / 2  # inicio del bloque centrado en la fila
+    mejor, mejor_puntos = None, math.inf
+    for fila in sorted(range(plano.filas), key=lambda f: abs(f - ideal)):
+        puntos_fila = (fila - ideal) ** 2
+        if puntos_fila >= mejor_puntos:
+            break  # las filas que quedan están aún más lejos
+        if plano.hueco_maximo[fila] < n:
+            continue
+        for inicio, longitud in plano.huecos[fila]:
+            if longitud < n:
+                continue
+            butaca = min(max(round(centrado), inicio), inicio + longitud - n)
+            puntos = puntos_fila + (butaca - centrado) ** 2
+            if puntos < mejor_puntos:
+                mejor, mejor_puntos = fila * plano.butacas_por_fila + butaca, puntos
+    if mejor is None:
+        return None
+    return [plano.etiqueta(i) for i in range(mejor, mejor + n)]
+
+
+def asignar(db: Session, horario_id: int, n: int) -> str:
+    """
+    Compra las mejores n butacas juntas del horario (sin commit, como
+    asientos.reclamar()). 409 si no hay n juntas libres.
+    """
+    for _ in range(_INTENTOS):
+        bloque = mejor_bloque(asientos.plano(db, horario_id), n)
+        if bloque is None:
+            break
+        try:
+            return asientos.reclamar(db, horario_id, bloque)
+        except asientos.ButacasOcupadas:
+            asientos.descartar(horario_id)  # la copia en memoria estaba atrasada
+    raise sin_bloque(horario_id, n)
+
+
+async def asignar_async(db: AsyncSession, horario_id: int, n: int) -> str:
+    for _ in range(_INTENTOS):
+        bloque = mejor_bloque(await asientos.plano_async(db, horario_id), n)
+        if bloque is None:
+            break
+        try:
+            return await asientos.reclamar_async(db, horario_id, bloque)
+        except asientos.ButacasOcupadas:
+            asientos.descartar(horario_id)
+    raise sin_bloque(horario_id, n)
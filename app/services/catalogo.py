@@ -0,0 +1,212 @@
+# app/services/catalogo.py
+# Lecturas del catálogo (películas, géneros y salas) a través de la caché en
+# memoria de app/cache.py.
+#
+# Se guardan esquemas Pydantic (PeliculaCatalogo, GenreResponse, SalaResponse),
+# nunca objetos ORM: no dependen de la sesión que los cargó y se pueden
+# compartir entre peticiones. Las funciones devuelven listas nuevas para que
+# quien llama no modifique la caché.
+#
+# Los listados completos (genres, salas) son para los desplegables de los
+# formularios web; la API usa las variantes *_pagina, que se cachean por página.
+#
+# Las escrituras no llaman aquí: cualquier commit que toque peliculas, genres o
+# salas invalida las entradas afectadas (ver install_invalidation en app/cache.py).
+# Esa invalidación sólo alcanza al proceso que hace el commit, así que la clave
+# lleva además la versión de cada tabla (tabla_versiones, migración v0004): tras
+# una escritura en otro worker la clave cambia y no se sirve la entrada vieja
+# con el ETag nuevo. condicional() de app/http_cache.py ya ha leído esas
+# versiones y las deja en la sesión; si no están, se leen aquí.
+# Los formularios de edición siguen leyendo el objeto ORM de la base de datos.
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.cache import catalogo_cache
+from app.models import Genre, SalaORM
+from app.schemas import GenreResponse, PeliculaCatalogo, SalaResponse
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+_FALTA = object()
+_VERSIONES = "versiones_tablas"  # clave en Session.info
+
+# tablas de las que depende cada tipo de entrada
+_TABLAS_PELICULAS = ("peliculas", "genres")  # incluyen el género anidado
+_TABLAS_GENRES = ("genres",)
+_TABLAS_SALAS = ("salas",)
+
+
+def _lista(filas, esquema) -> tuple:
+    return tuple(esquema.model_validate(fila) for fila in filas)
+
+
+def _uno(fila, esquema):
+    return esquema.model_validate(fila) if fila is not None else None
+
+
+def recordar_versiones(db, filas) -> None:
+    """
+    Guarda en la sesión las versiones de tabla_versiones ya leídas (filas de
+    queries.versiones_tablas()) para que _leer no vuelva a consultarlas.
+    """
+    db.info[_VERSIONES] = {tabla: version for tabla, version, _ in filas}
+
+
+def _clave(clave, tablas, versiones: dict) -> tuple:
+    return clave, tuple(versiones.get(tabla, 0) for tabla in tablas)
+
+
+def _leer(db: Session, clave, tablas, cargar):
+    """
+    Devuelve la entrada de la caché o la carga con cargar() y la guarda.
+    Los "no encontrado" (None) no se guardan.
+    """
+    versiones = db.info.get(_VERSIONES)
+    if versiones is None:
+        versiones = {tabla: version for tabla, version, _ in db.execute(queries.versiones_tablas())}
+    clave = _clave(clave, tablas, versiones)
+    valor = catalogo_cache.get(clave, _FALTA)
+    if valor is _FALTA:
+        generacion = catalogo_cache.generacion
+        valor = cargar()
+        if valor is not None:
+            catalogo_cache.set(clave, valor, tablas, generacion)
+    return valor
+
+
+async def _leer_async(db: AsyncSession, clave, tablas, cargar):
+    versiones = db.info.get(_VERSIONES)
+    if versiones is None:
+        filas = await db.execute(queries.versiones_tablas())
+        versiones = {tabla: version for tabla, version, _ in filas}
+    clave = _clave(clave, tablas, versiones)
+    valor = catalogo_cache.get(clave, _FALTA)
+    if valor is _FALTA:
+        generacion = catalogo_cache.generacion
+        valor = await cargar()
+        if valor is not None:
+            catalogo_cache.set(clave, valor, tablas, generacion)
+    return valor
+
+
+# --- películas ---
+
+def peliculas_pagina(db: Session, after: int, limite: int) -> list[PeliculaCatalogo]:
+    return list(_leer(
+        db, ("peliculas", after, limite), _TABLAS_PELICULAS,
+        lambda: _lista(db.execute(queries.peliculas_pagina(after, limite)).scalars().unique(), PeliculaCatalogo),
+    ))
+
+
+def ultimas_peliculas(db: Session, limite: int) -> list[PeliculaCatalogo]:
+    return list(_leer(
+        db, ("ultimas_peliculas", limite), _TABLAS_PELICULAS,
+        lambda: _lista(db.execute(queries.ultimas_peliculas(limite)).scalars().unique(), PeliculaCatalogo),
+    ))
+
+
+def pelicula(db: Session, id: int) -> PeliculaCatalogo | None:
+    return _leer(
+        db, ("pelicula", id), _TABLAS_PELICULAS,
+        lambda: _uno(db.execute(queries.pelicula_por_id(id)).scalar_one_or_none(), PeliculaCatalogo),
+    )
+
+
+async def peliculas_pagina_async(db: AsyncSession, after: int, limite: int) -> list[PeliculaCatalogo]:
+    async def cargar():
+        result = await db.execute(queries.peliculas_pagina(after, limite))
+        return _lista(result.scalars().unique(), PeliculaCatalogo)
+
+    return list(await _leer_async(db, ("peliculas", after, limite), _TABLAS_PELICULAS, cargar))
+
+
+async def pelicula_async(db: AsyncSession, id: int) -> PeliculaCatalogo | None:
+    async def cargar():
+        result = await db.execute(queries.pelicula_por_id(id))
+        return _uno(result.scalar_one_or_none(), PeliculaCatalogo)
+
+    return await _leer_async(db, ("pelicula", id), _TABLAS_PELICULAS, cargar)
+
+
+# --- géneros ---
+
+def genres(db: Session) -> list[GenreResponse]:
+    return list(_leer(
+        db, "genres", _TABLAS_GENRES,
+        lambda: _lista(db.execute(queries.todos(Genre)).scalars(), GenreResponse),
+    ))
+
+
+def genres_pagina(db: Session, after: int, limite: int) -> list[GenreResponse]:
+    return list(_leer(
+        db, ("genres", after, limite), _TABLAS_GENRES,
+        lambda: _lista(db.execute(queries.pagina(Genre, after, limite)).scalars(), GenreResponse),
+    ))
+
+
+def genre(db: Session, id: int) -> GenreResponse | None:
+    return _leer(
+        db, ("genre", id), _TABLAS_GENRES,
+        lambda: _uno(db.execute(queries.por_id(Genre, id)).scalar_one_or_none(), GenreResponse),
+    )
+
+
+async def genres_pagina_async(db: AsyncSession, after: int, limite: int) -> list[GenreResponse]:
+    async def cargar():
+        result = await db.execute(queries.pagina(Genre, after, limite))
+        return _lista(result.scalars(), GenreResponse)
+
+    return list(await _leer_async(db, ("genres", after, limite), _TABLAS_GENRES, cargar))
+
+
+async def genre_async(db: AsyncSession, id: int) -> GenreResponse | None:
+    async def cargar():
+        result = await db.execute(queries.por_id(Genre, id))
+        return _uno(result.scalar_one_or_none(), GenreResponse)
+
+    return await _leer_async(db, ("genre", id), _TABLAS_GENRES, cargar)
+
+
+# --- salas ---
+
+def salas(db: Session) -> list[SalaResponse]:
+    return list(_leer(
+        db, "salas", _TABLAS_SALAS,
+        lambda: _lista(db.execute(queries.todos(SalaORM)).scalars(), SalaResponse),
+    ))
+
+
+def salas_pagina(db: Session, after: int, limite: int) -> list[SalaResponse]:
+    return list(_leer(
+        db, ("salas", after, limite), _TABLAS_SALAS,
+        lambda: _lista(db.execute(queries.pagina(SalaORM, after, limite)).scalars(), SalaResponse),
+    ))
+
+
+def sala(db: Session, id: int) -> SalaResponse | None:
+    return _leer(
+        db, ("sala", id), _TABLAS_SALAS,
+        lambda: _uno(db.execute(queries.por_id(SalaORM, id)).scalar_one_or_none(), SalaResponse),
+    )
+
+
+async def salas_pagina_async(db: AsyncSession, after: int, limite: int) -> list[SalaResponse]:
+    async def cargar():
+        result = await db.execute(queries.pagina(SalaORM, after, limite))
+        return _lista(result.scalars(), SalaResponse)
+
+    return list(await _leer_async(db, ("salas", after, limite), _TABLAS_SALAS, cargar))
+
+
+async def sala_async(db: AsyncSession, id: int) -> SalaResponse | None:
+    async def cargar():
+        result = await db.execute(queries.por_id(SalaORM, id))
+        return _uno(result.scalar_one_or_none(), SalaResponse)
+
+    return await _leer_async(db, ("sala", id), _TABLAS_SALAS, cargar)
@@ -0,0 +1,154 @@
+# app/services/exportacion.py
+# Exportación del catálogo de películas en CSV y en JSON
+# (GET /api/peliculas/export/csv y /export/json).
+#
+# La respuesta se envía según se genera: las películas se leen de lote en lote
+# (streaming.lotes, yield_per con su propia sesión de sólo lectura) y cada
+# lote se convierte en un trozo de CSV o de la lista JSON en cuanto llega. Si
+# el cliente manda Accept-Encoding: gzip, cada trozo se comprime al vuelo. La
+# memoria no depende del tamaño del catálogo.
+#
+# Los filtros son los mismos parámetros ?q=&genero_id=&duracion_max=&disponible=
+# en los dos formatos (dependencia filtros()).
+#
+# Uso en un router:
+#   @router.get("/export/csv")
+#   def export_csv(request: Request, filtros: list = Depends(exportacion.filtros)):
+#       return exportacion.csv(request, filtros)
+
+import csv as _csv
+import io
+from typing import AsyncIterator, Iterator
+
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app import streaming
+from app.models import Pelicula
+from app.schemas import PeliculaExport
+
+# columnas del CSV, en orden
+CAMPOS_CSV = ["id", "titulo", "genero_id", "genero_nombre", "duracion", "disponible", "imagen"]
+
+# películas que se leen y se envían de cada vez
+TAMANO_LOTE = streaming.TAMANO_LOTE
+
+
+def filtros(
+    q: str | None = Query(None, description="Buscar en el título"),
+    genero_id: int | None = Query(None, description="Sólo este género"),
+    duracion_max: int | None = Query(None, gt=0, description="Duración máxima en minutos"),
+    disponible: bool | None = Query(None, description="Sólo disponibles (true) o no disponibles (false)"),
+) -> list:
+    """Condiciones sobre Pelicula a partir de los parámetros de la petición."""
+    condiciones = []
+    if q:
+        condiciones.append(func.lower(Pelicula.titulo).contains(q.lower(), autoescape=True))
+    if genero_id is not None:
+        condiciones.append(Pelicula.genero_id == genero_id)
+    if duracion_max is not None:
+        condiciones.append(Pelicula.duracion <= duracion_max)
+    if disponible is not None:
+        condiciones.append(Pelicula.disponible == disponible)
+    return condiciones
+
+
+def _consulta(condiciones: list):
+    return (
+        select(Pelicula)
+        .options(joinedload(Pelicula.genero))
+        .where(*condiciones)
+        .order_by(Pelicula.id)
+    )
+
+
+# --- formato de cada lote ---
+
+def _trozo_csv(peliculas) -> bytes:
+    salida = io.StringIO()
+    writer = _csv.writer(salida)
+    writer.writerows(
+        (p.id, p.titulo, p.genero_id, p.genero.name_genre if p.genero else "",
+         p.duracion, "Sí" if p.disponible else "No", p.imagen or "")
+        for p in peliculas
+    )
+    return salida.getvalue().encode()
+
+
+def _cabecera_csv() -> bytes:
+    salida = io.StringIO()
+    _csv.writer(salida).writerow(CAMPOS_CSV)
+    return salida.getvalue().encode()
+
+
+def _trozo_json(peliculas) -> bytes:
+    return b",\n".join(PeliculaExport.model_validate(p).model_dump_json().encode() for p in peliculas)
+
+
+# --- generadores (API síncrona y asíncrona) ---
+
+def _trozos_csv(stmt, lote: int) -> Iterator[bytes]:
+    yield _cabecera_csv()
+    for peliculas in streaming.lotes(stmt, lote):
+        yield _trozo_csv(peliculas)
+
+
+async def _trozos_csv_async(stmt, lote: int) -> AsyncIterator[bytes]:
+    yield _cabecera_csv()
+    async for peliculas in streaming.lotes_async(stmt, lote):
+        yield _trozo_csv(peliculas)
+
+
+def _trozos_json(stmt, lote: int) -> Iterator[bytes]:
+    separador = b"[\n"
+    for peliculas in streaming.lotes(stmt, lote):
+        yield separador + _trozo_json(peliculas)
+        separador = b",\n"
+    yield b"[]\n" if separador == b"[\n" else b"\n]\n"
+
+
+async def _trozos_json_async(stmt, lote: int) -> AsyncIterator[bytes]:
+    separador = b"[\n"
+    async for peliculas in streaming.lotes_async(stmt, lote):
+        yield separador + _trozo_json(peliculas)
+        separador = b",\n"
+    yield b"[]\n" if separador == b"[\n" else b"\n]\n"
+
+
+_CSV = ("text/csv", "catalogo-peliculas.csv")
+_JSON = ("application/json", "catalogo-peliculas.json")
+
+
+def _respuesta(request: Request, trozos, media_type: str, fichero: str, asincrono: bool) -> StreamingResponse:
+    cabeceras = {
+        "Content-Disposition": f"attachment; filename={fichero}",
+        "Vary": "Accept-Encoding",
+    }
+    if streaming.acepta_gzip(request):
+        trozos = streaming.gzip_async(trozos) if asincrono else streaming.gzip(trozos)
+        cabeceras["Content-Encoding"] = "gzip"
+    return StreamingResponse(trozos, media_type=media_type, headers=cabeceras)
+
+
+def csv(request: Request, condiciones: list, lote: int | None = None) -> StreamingResponse:
+    """StreamingResponse con el CSV (API síncrona)."""
+    trozos = _trozos_csv(_consulta(condiciones), lote or TAMANO_LOTE)
+    return _respuesta(request, trozos, *_CSV, asincrono=False)
+
+
+def csv_async(request: Request, condiciones: list, lote: int | None = None) -> StreamingResponse:
+    trozos = _trozos_csv_async(_consulta(condiciones), lote or TAMANO_LOTE)
+    return _respuesta(request, trozos, *_CSV, asincrono=True)
+
+
+def json(request: Request, condiciones: list, lote: int | None = None) -> StreamingResponse:
+    """StreamingResponse con la lista JSON (API síncrona)."""
+    trozos = _trozos_json(_consulta(condiciones), lote or TAMANO_LOTE)
+    return _respuesta(request, trozos, *_JSON, asincrono=False)
+
+
+def json_async(request: Request, condiciones: list, lote: int | None = None) -> StreamingResponse:
+    trozos = _trozos_json_async(_consulta(condiciones), lote or TAMANO_LOTE)
+    return _respuesta(request, trozos, *_JSON, asincrono=True)
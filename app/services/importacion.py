@@ -0,0 +1,330 @@
+# app/services/importacion.py
+# Importación del catálogo de películas (POST /api/peliculas/import).
+#
+# Las películas se reconocen por título normalizado (peliculas.titulo_normalizado,
+# columna generada con índice único, migración v0006): si el título ya existe se
+# actualiza la película y si no se inserta. En lugar de una consulta y un
+# INSERT/UPDATE por fila:
+#   - géneros y títulos existentes se precargan con una consulta por tabla
+#   - las filas válidas se escriben en lotes de TAMANO_LOTE con un único
+#     INSERT ... ON CONFLICT (titulo_normalizado) DO UPDATE
+#   - todo va en una transacción con un solo commit al final
+# Si un lote falla se repite fila a fila, cada una en su SAVEPOINT, para anotar
+# el error en la fila que lo provoca y conservar las demás.
+#
+# Las filas que no valida PeliculaImport (o cuyo genero_id no existe) se
+# devuelven como errores con su número; el resto se importa.
+#
+# Los ficheros subidos (POST /api/peliculas/import/csv y /json) se leen fila a
+# fila (filas_csv) o elemento a elemento (filas_json) sin cargarlos enteros. Si
+# el fichero está mal formado, aunque sea después de varios lotes, no se
+# confirma nada y se responde 400 (FicheroNoValido).
+#
+# Uso en un router:
+#   return importacion.importar(db, filas)               # hace commit
+#   return await db.run_sync(importacion.importar, filas)  # AsyncSession
+#   return importacion.importar_fichero(db, importacion.filas_csv(file.file))
+
+import csv
+import io
+import json
+import logging
+import string
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import Genre, Pelicula
+from app.schemas import ImportacionResponse, PeliculaImport
+
+logger = logging.getLogger(__name__)
+
+# filas por cada INSERT ... ON CONFLICT DO UPDATE
+TAMANO_LOTE = 500
+# errores que se devuelven con detalle; del resto sólo se cuenta cuántos hay
+MAX_ERRORES = 1000
+# caracteres que se leen de cada vez del fichero subido
+TAMANO_LECTURA = 64 * 1024
+# tamaño máximo de un elemento de la lista JSON (protege de ficheros mal formados)
+MAX_ELEMENTO = 1024 * 1024
+
+# lower() de SQLite sólo pasa a minúsculas las letras ASCII
+_ASCII_MINUSCULAS = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def normalizar_titulo(titulo: str) -> str:
+    # lo mismo que la columna generada: lower(trim(titulo))
+    return titulo.strip(" ").translate(_ASCII_MINUSCULAS)
+
+
+def _upsert(valores: list[dict]):
+    stmt = sqlite_insert(Pelicula).values(valores)
+    return stmt.on_conflict_do_update(
+        index_elements=[Pelicula.titulo_normalizado],
+        set_={
+            "titulo": stmt.excluded.titulo,
+            "genero_id": stmt.excluded.genero_id,
+            "duracion": stmt.excluded.duracion,
+            "disponible": stmt.excluded.disponible,
+            # una fila sin imagen no borra la que ya tenía la película
+            "imagen": func.coalesce(stmt.excluded.imagen, Pelicula.imagen),
+        },
+    )
+
+
+class _Importador:
+    """
+    Estado de una importación: géneros y títulos existentes precargados y las
+    filas válidas pendientes de escribir.
+    """
+
+    def __init__(self, db: Session, tamano_lote: int):
+        self.db = db
+        self.tamano_lote = tamano_lote
+        # Transacción explícita (BEGIN IMMEDIATE, como en app/migrations/base.py).
+        # El driver sqlite3 de Python no abre transacción antes de un SAVEPOINT,
+        # así que sin esto el RELEASE de cada begin_nested() confirmaría el lote
+        # aunque la importación fallase después.
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        generos = db.execute(select(Genre.id, Genre.name_genre)).all()
+        self.genero_ids = {genero_id for genero_id, _ in generos}
+        # nombre en minúsculas -> id
+        self.generos = {nombre.strip().lower(): genero_id for genero_id, nombre in generos}
+        # sólo para distinguir inserciones de actualizaciones
+        self.titulos = set(db.execute(select(Pelicula.titulo_normalizado)).scalars())
+        self.pendientes: list[tuple[int, dict]] = []
+        self.insertadas = 0
+        self.actualizadas = 0
+        self.errores: list[dict] = []
+        self.errores_omitidos = 0
+
+    def _error(self, fila: int, mensaje: str) -> None:
+        # con un fichero lleno de errores la lista no crece sin límite
+        if len(self.errores) >= MAX_ERRORES:
+            self.errores_omitidos += 1
+        else:
+            self.errores.append({"fila": fila, "error": mensaje})
+
+    def _genero_id(self, nombre: str) -> int:
+        # por nombre sin distinguir mayúsculas; si no existe se crea
+        clave = nombre.strip().lower()
+        if clave not in self.generos:
+            with self.db.begin_nested():
+                genero = Genre(name_genre=nombre.strip())
+                self.db.add(genero)
+            logger.info("Importación: creado el género %r", genero.name_genre)
+            self.generos[clave] = genero.id
+            self.genero_ids.add(genero.id)
+        return self.generos[clave]
+
+    def add(self, fila: int, datos: Any) -> None:
+        if not isinstance(datos, dict):
+            self._error(fila, "Cada película debe ser un objeto")
+            return
+        try:
+            pelicula = PeliculaImport.model_validate(datos)
+        except ValidationError as e:
+            self._error(fila, "; ".join(
+                f"{'.'.join(map(str, err['loc'])) or 'fila'}: {err['msg']}" for err in e.errors()
+            ))
+            return
+
+        if pelicula.genero_nombre is not None:
+            genero_id = self._genero_id(pelicula.genero_nombre)
+        elif pelicula.genero_id in self.genero_ids:
+            genero_id = pelicula.genero_id
+        else:
+            self._error(fila, f"No existe el genero con id {pelicula.genero_id}")
+            return
+
+        self.pendientes.append((fila, {
+            "titulo": pelicula.titulo,
+            "genero_id": genero_id,
+            "duracion": pelicula.duracion,
+            "disponible": pelicula.disponible,
+            "imagen": pelicula.imagen,
+        }))
+        if len(self.pendientes) >= self.tamano_lote:
+            self.flush()
+
+    def _contar(self, valores: dict) -> None:
+        clave = normalizar_titulo(valores["titulo"])
+        if clave in self.titulos:
+            self.actualizadas += 1
+        else:
+            self.titulos.add(clave)
+            self.insertadas += 1
+
+    def flush(self) -> None:
+        lote, self.pendientes = self.pendientes, []
+        if not lote:
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.execute(_upsert([valores for _, valores in lote]))
+        except SQLAlchemyError:
+            for fila, valores in lote:
+                try:
+                    with self.db.begin_nested():
+                        self.db.execute(_upsert([valores]))
+                except SQLAlchemyError as e:
+                    logger.warning("Importación: fila %d rechazada: %s", fila, e)
+                    self._error(fila, "La base de datos ha rechazado la fila")
+                else:
+                    self._contar(valores)
+            return
+        for _, valores in lote:
+            self._contar(valores)
+
+
+def importar(db: Session, filas: Iterable[Any], tamano_lote: int | None = None) -> ImportacionResponse:
+    """
+    Inserta o actualiza las películas de filas (la primera es la fila 1) y hace
+    commit. Devuelve cuántas se han insertado y actualizado y los errores por fila.
+    """
+    importador = _Importador(db, tamano_lote or TAMANO_LOTE)
+    for fila, datos in enumerate(filas, start=1):
+        importador.add(fila, datos)
+    importador.flush()
+    db.commit()
+
+    errores = importador.errores
+    logger.info(
+        "Importación: %d películas nuevas, %d actualizadas, %d filas con errores",
+        importador.insertadas, importador.actualizadas, len(errores) + importador.errores_omitidos,
+    )
+    if importador.errores_omitidos:
+        errores.append({
+            "fila": None,
+            "error": f"{importador.errores_omitidos} filas más con errores (no se muestran)",
+        })
+    return ImportacionResponse(
+        insertadas=importador.insertadas, actualizadas=importador.actualizadas, errores=errores
+    )
+
+
+class FicheroNoValido(HTTPException):
+    """400 de filas_csv() y filas_json(): el fichero subido está mal formado."""
+
+
+def _no_valido(mensaje: str) -> FicheroNoValido:
+    return FicheroNoValido(status_code=status.HTTP_400_BAD_REQUEST, detail=mensaje)
+
+
+# Los dos lectores reciben el fichero binario de la subida (UploadFile.file, un
+# SpooledTemporaryFile) y devuelven las filas de una en una.
+
+def filas_csv(fichero: BinaryIO) -> Iterator[dict]:
+    """
+    Filas de un CSV UTF-8 como diccionarios (nombre de columna como clave).
+    """
+    texto = io.TextIOWrapper(fichero, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(texto)
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise _no_valido(f"El archivo CSV no es válido: {e}")
+    finally:
+        texto.detach()  # no cerrar el fichero de la subida
+
+
+def filas_json(fichero: BinaryIO, tamano_lectura: int | None = None) -> Iterator[Any]:
+    """
+    Elementos de una lista JSON ([{...}, {...}]) leídos por trozos.
+
+    Sólo guarda en memoria el trozo leído y el elemento que se está decodificando.
+    """
+    texto = io.TextIOWrapper(fichero, encoding="utf-8-sig")
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def _leer_mas() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        trozo = texto.read(tamano_lectura or TAMANO_LECTURA)
+        if not trozo:
+            eof = True
+            return False
+        buffer = buffer[pos:] + trozo
+        pos = 0
+        return True
+
+    def _siguiente_caracter() -> str:
+        # salta espacios y devuelve el siguiente carácter significativo ("" al final)
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not _leer_mas():
+                return ""
+
+    try:
+        if _siguiente_caracter() != "[":
+            raise _no_valido("El archivo JSON debe ser una lista de objetos película")
+        pos += 1
+
+        if _siguiente_caracter() == "]":
+            pos += 1
+        else:
+            while True:
+                if not _siguiente_caracter():
+                    raise _no_valido("El archivo JSON está incompleto")
+                # decodificar el siguiente elemento; si está cortado, leer más
+                while True:
+                    try:
+                        elemento, fin = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError as e:
+                        # un elemento no debería ocupar más de unos pocos trozos
+                        if len(buffer) - pos < MAX_ELEMENTO and _leer_mas():
+                            continue
+                        raise _no_valido(f"El archivo JSON no es válido: {e.msg}")
+                    # un número al final del trozo puede seguir en el siguiente
+                    if fin == len(buffer) and _leer_mas():
+                        continue
+                    break
+                pos = fin
+                yield elemento
+
+                separador = _siguiente_caracter()
+                pos += 1
+                if separador == "]":
+                    break
+                if not separador:
+                    raise _no_valido("El archivo JSON está incompleto")
+                if separador != ",":
+                    raise _no_valido("El archivo JSON debe ser una lista de objetos película")
+
+        if _siguiente_caracter():
+            raise _no_valido("Hay datos después de la lista JSON")
+    except UnicodeDecodeError as e:
+        raise _no_valido(f"El archivo JSON no es válido: {e}")
+    finally:
+        texto.detach()  # no cerrar el fichero de la subida
+
+
+def importar_fichero(db: Session, filas: Iterable[Any]) -> ImportacionResponse:
+    """
+    importar() para las filas de un fichero subido. Si el fichero no es válido
+    o falla algo inesperado se deshace la importación entera.
+    """
+    try:
+        return importar(db, filas)
+    except FicheroNoValido:
+        db.rollback()
+        raise
+    except Exception:
+        db.rollback()
+        logger.exception("Error al importar el fichero de películas")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error interno al importar el fichero",
+        )
@@ -0,0 +1,122 @@
+# app/services/precios.py
+# Precio de las entradas: horario -> sala -> SalaORM.precio.
+#
+# Cada venta (API síncrona y asíncrona, lotes y formulario web) necesita el
+# precio de la sala de su horario. En lugar de un JOIN por venta se guarda en
+# memoria la tabla completa {horario_id: precio}, que se carga con UNA consulta
+# (horarios JOIN salas) al arrancar y después de cada invalidación:
+#   - la tabla es la única entrada de precios_cache (app/cache.py) y depende de
+#     horarios y salas: el commit que crea, cambia o borra un horario o una sala
+#     la borra y la siguiente venta la vuelve a cargar
+#   - con la tabla cargada, poner precio a una venta no toca la base de datos;
+#     con group commit el POST no usa la sesión para nada
+#   - un horario que no está en la tabla (lo ha creado otro worker y la tabla de
+#     este aún no ha caducado) se busca con una consulta de una fila antes de
+#     darlo por inexistente
+#
+# Como el resto de cachés, cada worker tiene la suya: tras cambiar el precio de
+# una sala, otro worker puede cobrar el precio anterior como mucho durante ttl
+# segundos.
+#
+# Uso en un router:
+#   precio = precios.precio_unitario(db, venta_dto.horario_id)
+#   if precio is None:
+#       raise precios.horario_inexistente(venta_dto.horario_id)
+#   venta.precio_total = precios.precio_total(precio, venta_dto.cantidad)
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.cache import precios_cache
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+_CLAVE = "precios"
+_TABLAS = ("horarios", "salas")
+
+
+def precio_total(precio_unitario: float, cantidad: int) -> float:
+    return round(precio_unitario * cantidad, 2)
+
+
+def horario_inexistente(horario_id: int) -> HTTPException:
+    # mismo formato que los errores de validación de FastAPI (y que app/lotes.py)
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=[{
+            "type": "value_error",
+            "loc": ["body", "horario_id"],
+            "msg": f"No existe el horario con id {horario_id}",
+            "input": horario_id,
+        }],
+    )
+
+
+def _tabla(db: Session) -> dict[int, float] | None:
+    if precios_cache.max_entries <= 0:
+        return None
+    tabla = precios_cache.get(_CLAVE)
+    if tabla is None:
+        generacion = precios_cache.generacion
+        tabla = dict(db.execute(queries.precios_horarios()).tuples().all())
+        precios_cache.set(_CLAVE, tabla, _TABLAS, generacion)
+    return tabla
+
+
+async def _tabla_async(db: AsyncSession) -> dict[int, float] | None:
+    if precios_cache.max_entries <= 0:
+        return None
+    tabla = precios_cache.get(_CLAVE)
+    if tabla is None:
+        generacion = precios_cache.generacion
+        tabla = dict((await db.execute(queries.precios_horarios())).tuples().all())
+        precios_cache.set(_CLAVE, tabla, _TABLAS, generacion)
+    return tabla
+
+
+def precargar(db: Session) -> int:
+    """
+    Carga la tabla de precios (al arrancar). Devuelve cuántos horarios tiene.
+    """
+    return len(_tabla(db) or ())
+
+
+def precios_unitarios(db: Session, horario_ids: Iterable[int]) -> dict[int, float]:
+    """
+    {horario_id: precio} de los horarios que existen; los que no existen no
+    aparecen. Como mucho una consulta para los que no están en la tabla.
+    """
+    horario_ids = list(horario_ids)
+    tabla = _tabla(db) or {}
+    precios = {id: tabla[id] for id in horario_ids if id in tabla}
+    faltan = [id for id in set(horario_ids) if id not in precios]
+    if faltan:
+        precios.update(db.execute(queries.precios_por_horarios(faltan)).tuples().all())
+    return precios
+
+
+async def precios_unitarios_async(db: AsyncSession, horario_ids: Iterable[int]) -> dict[int, float]:
+    horario_ids = list(horario_ids)
+    tabla = await _tabla_async(db) or {}
+    precios = {id: tabla[id] for id in horario_ids if id in tabla}
+    faltan = [id for id in set(horario_ids) if id not in precios]
+    if faltan:
+        precios.update((await db.execute(queries.precios_por_horarios(faltan))).tuples().all())
+    return precios
+
+
+def precio_unitario(db: Session, horario_id: int) -> float | None:
+    """
+    Precio de una entrada para el horario, o None si el horario no existe.
+    """
+    return precios_unitarios(db, (horario_id,)).get(horario_id)
+
+
+async def precio_unitario_async(db: AsyncSession, horario_id: int) -> float | None:
+    return (await precios_unitarios_async(db, (horario_id,))).get(horario_id)
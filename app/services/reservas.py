@@ -0,0 +1,279 @@
+# app/services/reservas.py
+# Reservas temporales: el pago en línea retiene butacas unos minutos
+# (settings.reserva_segundos) antes de convertirlas en una venta.
+#
+# Crear una reserva hace lo mismo que una venta: resta sus butacas del aforo
+# (app/services/aforo.py) y, si elige butacas, las marca en el plano
+# (app/services/asientos.py), en la transacción que inserta la fila de
+# reservas. Así las reservas activas ya están contadas en horarios.vendidas y
+# en horarios.ocupacion: comprobar el aforo de una venta o de otra reserva
+# sigue siendo el mismo UPDATE condicional de siempre, sin sumar reservas en
+# SQLite en cada petición.
+#
+#   - confirmar(): borra la reserva (sólo si no ha caducado) e inserta la
+#     venta con sus butacas, que ya estaban descontadas
+#   - cancelar(): borra la reserva y devuelve sus butacas
+#   - caducar: un hilo (Caducidad) guarda (expira_en, id) de cada reserva en un
+#     montículo (heapq) y duerme hasta la primera que caduca; la borra y
+#     devuelve sus butacas. Nunca recorre la tabla: las reservas confirmadas o
+#     canceladas se quedan en el montículo y al caducar ya no encuentran su fila
+#
+# confirmar y caducar borran la fila con condiciones de tiempo opuestas
+# (queries.tomar_reserva / caducar_reserva): si coinciden, gana sólo uno.
+#
+# Cada worker caduca las reservas que crea y, al arrancar, todas las que haya
+# en la base de datos (las de un worker que se paró sin caducarlas).
+#
+# Uso en un router:
+#   reserva = reservas.crear(db, dto)
+#   db.commit()
+#   reservas.programar(reserva)
+
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.database import SessionLocal
+from app.models import Reserva, Venta
+from app.models.venta import MetodoPago
+from app.schemas.reserva import ReservaCreate
+from app.services import aforo, asientos, precios
+from app.settings import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Row
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# si caducar una reserva falla (p. ej. "database is locked"), se reintenta a los
+_REINTENTO_S = 1.0
+
+
+def no_encontrada(reserva_id: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"La reserva {reserva_id} no existe o ha caducado",
+    )
+
+
+class Caducidad:
+    """
+    Hilo que caduca las reservas en orden de expira_en con un montículo.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self._monticulo: list[tuple[float, int]] = []
+        self._cond = threading.Condition()
+        self._hilo: threading.Thread | None = None
+        self._parar = False
+        self.caducadas = 0
+
+    # --- API pública ---
+
+    def programar(self, reserva_id: int, expira_en: float) -> None:
+        with self._cond:
+            heapq.heappush(self._monticulo, (expira_en, reserva_id))
+            # sólo hay que despertar al hilo si ésta caduca antes que todas
+            if self._monticulo[0][1] == reserva_id:
+                self._cond.notify()
+        self.start()
+
+    def cargar(self) -> int:
+        """
+        Programa todas las reservas de la base de datos (al arrancar).
+        Devuelve cuántas.
+        """
+        with self.session_factory() as db:
+            pendientes = [(expira_en, id) for id, expira_en in db.execute(queries.reservas_pendientes())]
+        with self._cond:
+            self._monticulo.extend(pendientes)
+            heapq.heapify(self._monticulo)
+            self._cond.notify()
+        self.start()
+        return len(pendientes)
+
+    def start(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._cond:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._parar = False
+                self._hilo = threading.Thread(target=self._run, name="reservas-caducidad", daemon=True)
+                self._hilo.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        hilo = self._hilo
+        if hilo is None:
+            return
+        with self._cond:
+            self._parar = True
+            self._cond.notify()
+        hilo.join(timeout)
+        self._hilo = None
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                # incluye las ya confirmadas o canceladas que aún no han llegado a su hora
+                "programadas": len(self._monticulo),
+                "proxima_en_s": max(self._monticulo[0][0] - time.time(), 0.0) if self._monticulo else None,
+                "caducadas": self.caducadas,
+            }
+
+    # --- hilo ---
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._parar and (
+                    not self._monticulo or self._monticulo[0][0] > time.time()
+                ):
+                    espera = self._monticulo[0][0] - time.time() if self._monticulo else None
+                    self._cond.wait(espera)
+                if self._parar:
+                    return
+                expira_en, reserva_id = heapq.heappop(self._monticulo)
+            try:
+                self._caducar(reserva_id)
+            except Exception:
+                with self._cond:
+                    heapq.heappush(self._monticulo, (time.time() + _REINTENTO_S, reserva_id))
+
+    def _caducar(self, reserva_id: int) -> None:
+        with self.session_factory() as db:
+            fila = db.execute(queries.caducar_reserva(), {"id": reserva_id, "ahora": time.time()}).one_or_none()
+            if fila is None:
+                return  # ya confirmada o cancelada
+            _devolver(db, fila)
+            db.commit()
+        if fila.asientos:
+            asientos.descartar(fila.horario_id)
+        self.caducadas += 1
+
+
+def _devolver(db: Session, fila: Row) -> None:
+    # butacas de una reserva borrada: al aforo y, si las tenía, al plano
+    aforo.liberar(db, fila.horario_id, fila.cantidad)
+    if fila.asientos:
+        asientos.liberar(db, fila.horario_id, fila.asientos)
+
+
+async def _devolver_async(db: AsyncSession, fila: Row) -> None:
+    await aforo.liberar_async(db, fila.horario_id, fila.cantidad)
+    if fila.asientos:
+        await asientos.liberar_async(db, fila.horario_id, fila.asientos)
+
+
+# caducidad de las reservas de este proceso (la arranca el lifespan de app/main.py)
+caducidad = Caducidad(SessionLocal)
+
+
+def programar(reserva: Reserva) -> None:
+    """Tras el commit que crea la reserva."""
+    if reserva.asientos:
+        asientos.descartar(reserva.horario_id)
+    caducidad.programar(reserva.id, reserva.expira_en)
+
+
+# --- crear (sin commit) ---
+
+def _nueva(horario_id: int, cantidad: int, butacas: str | None) -> Reserva:
+    return Reserva(
+        horario_id=horario_id,
+        cantidad=cantidad,
+        asientos=butacas,
+        expira_en=time.time() + settings.reserva_segundos,
+    )
+
+
+def crear(db: Session, dto: ReservaCreate) -> Reserva:
+    """
+    Retiene las butacas y añade la reserva a la sesión. 409 si no caben o
+    alguna butaca está ocupada (y deshace la transacción).
+    """
+    if dto.asientos is not None:
+        butacas = asientos.reclamar(db, dto.horario_id, dto.asientos)
+        reserva = _nueva(dto.horario_id, len(dto.asientos), butacas)
+    else:
+        aforo.reservar_o_409(db, dto.horario_id, dto.cantidad)
+        reserva = _nueva(dto.horario_id, dto.cantidad, None)
+    db.add(reserva)
+    return reserva
+
+
+async def crear_async(db: AsyncSession, dto: ReservaCreate) -> Reserva:
+    if dto.asientos is not None:
+        butacas = await asientos.reclamar_async(db, dto.horario_id, dto.asientos)
+        reserva = _nueva(dto.horario_id, len(dto.asientos), butacas)
+    else:
+        await aforo.reservar_o_409_async(db, dto.horario_id, dto.cantidad)
+        reserva = _nueva(dto.horario_id, dto.cantidad, None)
+    db.add(reserva)
+    return reserva
+
+
+# --- confirmar y cancelar (sin commit) ---
+
+def _venta(fila: Row, precio: float, metodo_pago: MetodoPago) -> Venta:
+    return Venta(
+        horario_id=fila.horario_id,
+        precio_total=precios.precio_total(precio, fila.cantidad),
+        cantidad=fila.cantidad,
+        metodo_pago=metodo_pago,
+        asientos=fila.asientos,
+    )
+
+
+def confirmar(db: Session, reserva_id: int, metodo_pago: MetodoPago) -> Venta:
+    """
+    Convierte la reserva en una venta con sus mismas butacas (ya descontadas).
+    404 si no existe o ha caducado.
+    """
+    fila = db.execute(queries.tomar_reserva(), {"id": reserva_id, "ahora": time.time()}).one_or_none()
+    precio = precios.precio_unitario(db, fila.horario_id) if fila is not None else None
+    if precio is None:
+        db.rollback()
+        raise no_encontrada(reserva_id)
+    venta = _venta(fila, precio, metodo_pago)
+    db.add(venta)
+    return venta
+
+
+async def confirmar_async(db: AsyncSession, reserva_id: int, metodo_pago: MetodoPago) -> Venta:
+    fila = (await db.execute(queries.tomar_reserva(), {"id": reserva_id, "ahora": time.time()})).one_or_none()
+    precio = await precios.precio_unitario_async(db, fila.horario_id) if fila is not None else None
+    if precio is None:
+        await db.rollback()
+        raise no_encontrada(reserva_id)
+    venta = _venta(fila, precio, metodo_pago)
+    db.add(venta)
+    return venta
+
+
+def cancelar(db: Session, reserva_id: int) -> Row:
+    """
+    Borra la reserva y devuelve sus butacas. Devuelve la fila borrada
+    (horario_id, cantidad, asientos). 404 si no existe o ha caducado.
+    """
+    fila = db.execute(queries.tomar_reserva(), {"id": reserva_id, "ahora": time.time()}).one_or_none()
+    if fila is None:
+        db.rollback()
+        raise no_encontrada(reserva_id)
+    _devolver(db, fila)
+    return fila
+
+
+async def cancelar_async(db: AsyncSession, reserva_id: int) -> Row:
+    fila = (await db.execute(queries.tomar_reserva(), {"id": reserva_id, "ahora": time.time()})).one_or_none()
+    if fila is None:
+        await db.rollback()
+        raise no_encontrada(reserva_id)
+    await _devolver_async(db, fila)
+    return fila
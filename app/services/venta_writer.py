@@ -0,0 +1,208 @@
+# app/services/venta_writer.py
+# Escritor único de ventas con "group commit".
+#
+# SQLite sólo admite un escritor a la vez y cada commit es un fsync, así que en
+# lugar de que cada petición haga add -> commit -> refresh -> select, las
+# peticiones dejan su venta en una cola y un único hilo escritor las agrupa en
+# lotes cortos que se confirman en UNA transacción. Cada petición recibe su
+# propio VentaResponse a través de un Future.
+#
+# Cada venta del lote resta sus butacas del aforo del horario en la misma
+# transacción (app/services/aforo.py); las que ya no caben reciben un 409 sin
+# afectar al resto del lote.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app import queries
+from app.services import aforo
+from app.database import SessionLocal
+from app.models.venta import Venta
+from app.schemas.venta import VentaResponse
+from app.settings import settings
+
+
+@dataclass
+class _VentaPendiente:
+    datos: Dict[str, Any]
+    futuro: Future = field(default_factory=Future)
+
+
+class VentaWriteQueue:
+    """
+    Cola de inserciones de ventas atendida por un único hilo escritor.
+
+    - max_batch_size: número máximo de ventas por transacción.
+    - max_delay_ms: cuánto espera como mucho la primera venta de un lote a que
+      lleguen más antes de confirmar (cota de latencia añadida).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_batch_size: int = 64,
+        max_delay_ms: float = 2.0,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max(0.0, max_delay_ms) / 1000
+        self._cola: "queue.Queue[_VentaPendiente | None]" = queue.Queue()
+        self._hilo: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # estadísticas sencillas para ver el tamaño medio de lote
+        self.lotes = 0
+        self.ventas = 0
+
+    # --- API pública ---
+
+    def submit(self, datos: Dict[str, Any]) -> "Future[VentaResponse]":
+        """
+        Encola una venta (diccionario de columnas de Venta) y devuelve un Future
+        que se resuelve con su VentaResponse cuando el lote se confirma.
+        """
+        self.start()
+        pendiente = _VentaPendiente(datos=datos)
+        self._cola.put(pendiente)
+        return pendiente.futuro
+
+    def start(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._run, name="venta-writer", daemon=True)
+                self._hilo.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """
+        Termina el hilo escritor después de vaciar lo que ya está en la cola.
+        """
+        hilo = self._hilo
+        if hilo is None:
+            return
+        self._cola.put(None)
+        hilo.join(timeout)
+        self._hilo = None
+
+    @property
+    def media_lote(self) -> float:
+        return self.ventas / self.lotes if self.lotes else 0.0
+
+    # --- hilo escritor ---
+
+    def _run(self) -> None:
+        while True:
+            primera = self._cola.get()
+            if primera is None:
+                return
+            lote = [primera]
+            limite = time.monotonic() + self.max_delay
+            parar = False
+
+            # recoger más ventas hasta llenar el lote o agotar la espera
+            while len(lote) < self.max_batch_size:
+                restante = limite - time.monotonic()
+                try:
+                    siguiente = self._cola.get(timeout=restante) if restante > 0 else self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is None:
+                    parar = True
+                    break
+                lote.append(siguiente)
+
+            self._procesar(lote)
+            if parar:
+                return
+
+    def _procesar(self, lote: List[_VentaPendiente]) -> None:
+        try:
+            with self.session_factory() as db:
+                ventas = self._insertar(db, lote)
+                try:
+                    db.commit()  # un único commit (y fsync) para todo el lote
+                except Exception:
+                    db.rollback()
+                    # si falla el lote, se reintenta venta a venta para que
+                    # sólo reciban error las peticiones que lo provocan
+                    ventas = self._insertar_una_a_una(db, lote)
+
+                # las que no cupieron en el aforo: 409 (ya confirmado el resto)
+                for pendiente, venta in zip(lote, ventas):
+                    if venta is None and not pendiente.futuro.done():
+                        pendiente.futuro.set_exception(
+                            aforo.sin_aforo(pendiente.datos["horario_id"], pendiente.datos["cantidad"])
+                        )
+
+                self._responder(db, lote, ventas)
+                self.lotes += 1
+                self.ventas += len(lote)
+        except Exception as e:
+            for pendiente in lote:
+                if not pendiente.futuro.done():
+                    pendiente.futuro.set_exception(e)
+
+    def _insertar(self, db: Session, lote: List[_VentaPendiente]) -> List[Venta | None]:
+        """
+        Reserva las butacas de cada venta (UPDATE condicional de
+        app/services/aforo.py) y añade las que caben, sin hacer commit.
+        None en el lugar de las que no caben.
+        """
+        ventas: List[Venta | None] = []
+        for pendiente in lote:
+            if aforo.reservar(db, pendiente.datos["horario_id"], pendiente.datos["cantidad"]):
+                venta = Venta(**pendiente.datos)
+                db.add(venta)
+                ventas.append(venta)
+            else:
+                ventas.append(None)
+        return ventas
+
+    def _insertar_una_a_una(self, db: Session, lote: List[_VentaPendiente]) -> List[Venta | None]:
+        ventas: List[Venta | None] = []
+        for pendiente in lote:
+            try:
+                [venta] = self._insertar(db, [pendiente])
+                db.commit()
+                ventas.append(venta)
+            except Exception as e:
+                db.rollback()
+                pendiente.futuro.set_exception(e)
+                ventas.append(None)
+        return ventas
+
+    def _responder(self, db: Session, lote: List[_VentaPendiente], ventas: List[Venta | None]) -> None:
+        ids = [v.id for v in ventas if v is not None]
+        if not ids:
+            return
+
+        # una sola consulta recarga todas las ventas del lote con horario y sala
+        cargadas = {
+            v.id: v
+            for v in db.execute(
+                queries.ventas_por_ids(ids),
+                execution_options={"populate_existing": True},
+            ).scalars().unique()
+        }
+
+        for pendiente, venta in zip(lote, ventas):
+            if venta is None or pendiente.futuro.done():
+                continue
+            try:
+                pendiente.futuro.set_result(VentaResponse.model_validate(cargadas[venta.id]))
+            except Exception as e:
+                pendiente.futuro.set_exception(e)
+
+
+# cola compartida por los routers (síncrono y asíncrono) de ventas
+venta_write_queue = VentaWriteQueue(
+    SessionLocal,
+    max_batch_size=settings.ventas_batch_max_size,
+    max_delay_ms=settings.ventas_batch_max_delay_ms,
+)
@@ -0,0 +1,181 @@
+"""
+Configuración de la aplicación cargada desde variables de entorno
+"""
+# app/settings.py
+# Perfiles de ejecución (dev / test / prod) para la base de datos.
+# El perfil se elige con CARTELERA_ENV y cada valor se puede sobrescribir
+# con su propia variable de entorno, por ejemplo:
+#   CARTELERA_ENV=prod CARTELERA_DB_POOL_SIZE=10 uvicorn app.main:app
+
+import os
+from dataclasses import dataclass, field, replace
+
+
+# PRAGMAs que se aplican a cada conexión SQLite nueva (ver app/database.py)
+@dataclass(frozen=True)
+class SQLitePragmas:
+    journal_mode: str = "WAL"       # lectores y escritor no se bloquean entre sí
+    synchronous: str = "NORMAL"     # con WAL es seguro y evita un fsync por commit
+    busy_timeout: int = 5000        # ms que espera una conexión antes de "database is locked"
+    cache_size: int = -20000        # negativo = KiB (unos 20 MB de caché de páginas)
+    mmap_size: int = 268435456      # 256 MB de lectura por memoria mapeada
+    temp_store: str = "MEMORY"      # tablas temporales y ordenaciones en memoria
+
+    def as_statements(self, read_only: bool = False) -> list[str]:
+        # una conexión mode=ro no puede cambiar el journal: lo fija el escritor
+        if read_only:
+            statements = ["PRAGMA query_only=ON"]
+        else:
+            statements = [
+                f"PRAGMA journal_mode={self.journal_mode}",
+                f"PRAGMA synchronous={self.synchronous}",
+            ]
+        return statements + [
+            f"PRAGMA busy_timeout={self.busy_timeout}",
+            f"PRAGMA cache_size={self.cache_size}",
+            f"PRAGMA mmap_size={self.mmap_size}",
+            f"PRAGMA temp_store={self.temp_store}",
+        ]
+
+
+@dataclass(frozen=True)
+class Settings:
+    env: str
+    database_url: str
+    echo: bool
+    pool_size: int
+    max_overflow: int
+    # GET/HEAD usan un pool aparte de conexiones de sólo lectura (mode=ro)
+    read_routing: bool = True
+    read_pool_size: int = 10
+    pragmas: SQLitePragmas | None = field(default_factory=SQLitePragmas)
+    # "sync" monta app/routers/api, "async" monta app/routers/api_async
+    api_stack: str = "sync"
+    async_database_url: str | None = None
+    # escritura agrupada de ventas (app/services/venta_writer.py)
+    ventas_group_commit: bool = True
+    ventas_batch_max_size: int = 64         # ventas como máximo por transacción
+    ventas_batch_max_delay_ms: float = 2.0  # espera máxima de la primera venta del lote
+    # segundos que una reserva retiene sus butacas antes de caducar (app/services/reservas.py)
+    reserva_segundos: float = 600.0
+    # al arrancar sólo se comprueba la versión del esquema (app/migrations);
+    # con auto_migrate se aplican las migraciones pendientes en lugar de fallar
+    auto_migrate: bool = False
+    # caché en memoria del catálogo (app/cache.py); max_entries=0 la desactiva
+    cache_ttl_seconds: float = 300.0
+    cache_max_entries: int = 512
+    # caché del HTML ya renderizado de los listados web (app/templating.py)
+    html_cache_max_entries: int = 64
+
+    def get_async_database_url(self) -> str:
+        """
+        URL para el motor asíncrono. Si no se indica, se deriva de la síncrona (driver aiosqlite).
+        """
+        if self.async_database_url:
+            return self.async_database_url
+        if self.database_url.startswith("sqlite:"):
+            return self.database_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+        return self.database_url
+
+
+# Perfiles predefinidos
+PROFILES: dict[str, Settings] = {
+    # desarrollo: muestra el SQL por consola como hasta ahora
+    "dev": Settings(
+        env="dev",
+        database_url="sqlite:///cartelera.db",
+        echo=True,
+        pool_size=5,
+        max_overflow=10,
+        auto_migrate=True,
+    ),
+    # tests: base de datos aparte y sin ruido en la salida
+    "test": Settings(
+        env="test",
+        database_url="sqlite:///cartelera_test.db",
+        echo=False,
+        pool_size=5,
+        max_overflow=10,
+        pragmas=SQLitePragmas(synchronous="OFF"),
+        auto_migrate=True,
+    ),
+    # producción: sin echo y con más conexiones en el pool
+    "prod": Settings(
+        env="prod",
+        database_url="sqlite:///cartelera.db",
+        echo=False,
+        pool_size=20,
+        max_overflow=20,
+        read_pool_size=30,
+    ),
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on", "si", "sí")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def load_settings() -> Settings:
+    """
+    Construye la configuración a partir del perfil CARTELERA_ENV (dev por defecto)
+    aplicando encima las variables de entorno que estén definidas.
+    """
+    env = os.getenv("CARTELERA_ENV", "dev").strip().lower()
+    if env not in PROFILES:
+        raise ValueError(f"Perfil desconocido CARTELERA_ENV={env!r}. Opciones: {', '.join(PROFILES)}")
+
+    base = PROFILES[env]
+
+    pragmas = base.pragmas
+    if _env_bool("CARTELERA_SQLITE_PRAGMAS", pragmas is not None):
+        pragmas = pragmas or SQLitePragmas()
+        pragmas = replace(
+            pragmas,
+            journal_mode=os.getenv("CARTELERA_SQLITE_JOURNAL_MODE", pragmas.journal_mode),
+            synchronous=os.getenv("CARTELERA_SQLITE_SYNCHRONOUS", pragmas.synchronous),
+            busy_timeout=_env_int("CARTELERA_SQLITE_BUSY_TIMEOUT", pragmas.busy_timeout),
+            cache_size=_env_int("CARTELERA_SQLITE_CACHE_SIZE", pragmas.cache_size),
+            mmap_size=_env_int("CARTELERA_SQLITE_MMAP_SIZE", pragmas.mmap_size),
+            temp_store=os.getenv("CARTELERA_SQLITE_TEMP_STORE", pragmas.temp_store),
+        )
+    else:
+        pragmas = None
+
+    api_stack = os.getenv("CARTELERA_API_STACK", base.api_stack).strip().lower()
+    if api_stack not in ("sync", "async"):
+        raise ValueError(f"CARTELERA_API_STACK debe ser 'sync' o 'async', no {api_stack!r}")
+
+    return replace(
+        base,
+        database_url=os.getenv("CARTELERA_DATABASE_URL", base.database_url),
+        echo=_env_bool("CARTELERA_DB_ECHO", base.echo),
+        pool_size=_env_int("CARTELERA_DB_POOL_SIZE", base.pool_size),
+        max_overflow=_env_int("CARTELERA_DB_MAX_OVERFLOW", base.max_overflow),
+        read_routing=_env_bool("CARTELERA_DB_READ_ROUTING", base.read_routing),
+        read_pool_size=_env_int("CARTELERA_DB_READ_POOL_SIZE", base.read_pool_size),
+        pragmas=pragmas,
+        api_stack=api_stack,
+        async_database_url=os.getenv("CARTELERA_ASYNC_DATABASE_URL", base.async_database_url),
+        ventas_group_commit=_env_bool("CARTELERA_VENTAS_GROUP_COMMIT", base.ventas_group_commit),
+        ventas_batch_max_size=_env_int("CARTELERA_VENTAS_BATCH_MAX_SIZE", base.ventas_batch_max_size),
+        ventas_batch_max_delay_ms=float(os.getenv("CARTELERA_VENTAS_BATCH_MAX_DELAY_MS", base.ventas_batch_max_delay_ms)),
+        reserva_segundos=float(os.getenv("CARTELERA_RESERVA_SEGUNDOS", base.reserva_segundos)),
+        auto_migrate=_env_bool("CARTELERA_DB_AUTO_MIGRATE", base.auto_migrate),
+        cache_ttl_seconds=float(os.getenv("CARTELERA_CACHE_TTL_SECONDS", base.cache_ttl_seconds)),
+        cache_max_entries=_env_int("CARTELERA_CACHE_MAX_ENTRIES", base.cache_max_entries),
+        html_cache_max_entries=_env_int("CARTELERA_HTML_CACHE_MAX_ENTRIES", base.html_cache_max_entries),
+    )
+
+
+# configuración activa de la aplicación
+settings = load_settings()
@@ -0,0 +1,128 @@
+"""
+Respuestas NDJSON en streaming para colecciones grandes
+"""
+# app/streaming.py
+# Para los consumidores que necesitan la tabla entera (p. ej. todas las ventas)
+# los endpoints /stream devuelven JSON delimitado por saltos de línea
+# (application/x-ndjson): un objeto por línea.
+#
+# La consulta se lee con yield_per (cursor del servidor, de lote en lote) y cada
+# lote se serializa y se envía en cuanto está listo, así que la memoria no
+# depende del tamaño de la tabla y el primer byte sale enseguida.
+#
+# El generador abre su propia sesión de sólo lectura: la de get_db la cierra
+# SessionReleaseMiddleware en cuanto empieza la respuesta, antes del cuerpo.
+#
+# Al devolver una Response, FastAPI no copia las cabeceras que pusieron las
+# dependencias (ETag de app/http_cache.py): el router pasa su Response para
+# que ndjson() las traslade.
+#
+# lotes() / lotes_async() y gzip() / gzip_async() también los usan las
+# exportaciones del catálogo (app/services/exportacion.py).
+
+import zlib
+from typing import AsyncIterator, Iterator
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.database import ReadSessionLocal, get_async_session_factory
+
+NDJSON = "application/x-ndjson"
+
+# filas que se leen y se envían de cada vez
+TAMANO_LOTE = 1000
+
+
+def _lineas(filas, esquema: type[BaseModel]) -> bytes:
+    return b"".join(esquema.model_validate(fila).model_dump_json().encode() + b"\n" for fila in filas)
+
+
+def lotes(stmt, lote: int = TAMANO_LOTE) -> Iterator[list]:
+    """
+    Objetos de stmt de lote en lote, con su propia sesión de sólo lectura.
+    """
+    with ReadSessionLocal() as db:
+        result = db.execute(stmt, execution_options={"yield_per": lote})
+        for filas in result.scalars().partitions():
+            # el identity map guarda referencias débiles: los lotes ya enviados
+            # se liberan en cuanto dejan de usarse
+            yield filas
+
+
+async def lotes_async(stmt, lote: int = TAMANO_LOTE) -> AsyncIterator[list]:
+    factory = get_async_session_factory(read_only=True)
+    async with factory() as db:
+        result = await db.stream(stmt, execution_options={"yield_per": lote})
+        async for filas in result.scalars().partitions():
+            yield filas
+
+
+def _filas_ndjson(stmt, esquema: type[BaseModel], lote: int) -> Iterator[bytes]:
+    for filas in lotes(stmt, lote):
+        yield _lineas(filas, esquema)
+
+
+async def _filas_ndjson_async(stmt, esquema: type[BaseModel], lote: int) -> AsyncIterator[bytes]:
+    async for filas in lotes_async(stmt, lote):
+        yield _lineas(filas, esquema)
+
+
+# --- gzip al vuelo ---
+
+def acepta_gzip(request: Request) -> bool:
+    """
+    True si el cliente anuncia gzip en Accept-Encoding (y no lo desactiva con q=0).
+    """
+    for codificacion in request.headers.get("accept-encoding", "").split(","):
+        nombre, _, parametros = codificacion.strip().partition(";")
+        if nombre.strip().lower() == "gzip":
+            return parametros.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _compresor():
+    # wbits=31: formato gzip (cabecera y CRC), no zlib
+    return zlib.compressobj(6, zlib.DEFLATED, 31)
+
+
+def gzip(trozos: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Comprime cada trozo en cuanto llega; no espera al final de la respuesta.
+    """
+    compresor = _compresor()
+    for trozo in trozos:
+        comprimido = compresor.compress(trozo)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+async def gzip_async(trozos: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compresor = _compresor()
+    async for trozo in trozos:
+        comprimido = compresor.compress(trozo)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def ndjson(stmt, esquema: type[BaseModel], response: Response | None = None,
+           lote: int = TAMANO_LOTE) -> StreamingResponse:
+    """
+    StreamingResponse NDJSON con las filas de stmt (API síncrona; Starlette
+    recorre el generador en el threadpool). response es la Response inyectada
+    en el endpoint, de la que se copian las cabeceras.
+    """
+    cabeceras = dict(response.headers) if response is not None else None
+    return StreamingResponse(_filas_ndjson(stmt, esquema, lote), media_type=NDJSON, headers=cabeceras)
+
+
+def ndjson_async(stmt, esquema: type[BaseModel], response: Response | None = None,
+                 lote: int = TAMANO_LOTE) -> StreamingResponse:
+    """
+    Igual que ndjson() con AsyncSession (API asíncrona).
+    """
+    cabeceras = dict(response.headers) if response is not None else None
+    return StreamingResponse(_filas_ndjson_async(stmt, esquema, lote), media_type=NDJSON, headers=cabeceras)
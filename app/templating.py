@@ -0,0 +1,114 @@
+"""
+Plantillas Jinja2 compartidas por los routers web
+"""
+# app/templating.py
+# Un único Jinja2Templates para toda la aplicación, creado la primera vez que se
+# renderiza una página (importar jinja2 y montar el Environment no retrasa el
+# arranque ni a los procesos que sólo sirven la API).
+#
+# render_cacheado() guarda el HTML de los listados ya renderizado. La clave es
+# la plantilla más la versión de cada tabla que muestra (tabla_versiones,
+# migración 4), así que cualquier escritura (web, API u otro proceso) hace que
+# la página se vuelva a generar. Además, los commits de este proceso borran las
+# entradas viejas al momento (install_invalidation en app/cache.py).
+
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+
+from app import queries
+from app.cache import html_cache
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+@lru_cache(maxsize=1)
+def get_templates():
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory=TEMPLATES_DIR)
+
+
+class _LazyTemplates:
+    """
+    Sustituto de Jinja2Templates que delega en get_templates() al usarse,
+    para que los routers sigan escribiendo templates.TemplateResponse(...).
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_templates(), name)
+
+
+templates = _LazyTemplates()
+
+
+class RenderStats:
+    """
+    Tiempo de renderizado de las páginas que no estaban en html_cache (thread-safe).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.renders = 0
+            self.render_ms = 0.0
+            self.max_render_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        with self._lock:
+            self.renders += 1
+            self.render_ms += ms
+            self.max_render_ms = max(self.max_render_ms, ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "renders": self.renders,
+                "render_medio_ms": self.render_ms / self.renders if self.renders else 0.0,
+                "render_max_ms": self.max_render_ms,
+            }
+
+
+ESTADISTICAS_RENDER = RenderStats()
+
+
+def render_cacheado(
+    request: Request,
+    db,
+    plantilla: str,
+    tablas: tuple[str, ...],
+    contexto: Callable[[], dict],
+) -> HTMLResponse:
+    """
+    Devuelve la página desde html_cache o la genera: contexto() hace las
+    consultas y devuelve las variables de la plantilla (sin request).
+    tablas son todas las tablas cuyos datos aparecen en la página.
+
+    Las versiones y los datos se leen en la misma transacción de lectura, así
+    que el HTML guardado corresponde exactamente a las versiones de la clave.
+    pysqlite no manda BEGIN antes de un SELECT: sin el BEGIN explícito cada
+    consulta vería su propia instantánea del WAL. db.release() la cierra.
+    """
+    db.connection().exec_driver_sql("BEGIN")
+    versiones = {tabla: version for tabla, version, _ in db.execute(queries.versiones_tablas())}
+    clave = (plantilla, tuple(versiones.get(tabla, 0) for tabla in tablas))
+
+    html = html_cache.get(clave)
+    if html is None:
+        variables = contexto()
+        db.release()  # devuelve la conexión al pool antes de renderizar
+        inicio = time.perf_counter()
+        html = get_templates().get_template(plantilla).render({"request": request, **variables})
+        ESTADISTICAS_RENDER.record((time.perf_counter() - inicio) * 1000)
+        html_cache.set(clave, html, tablas)
+    else:
+        db.release()
+    return HTMLResponse(html)
@@ -0,0 +1,47 @@
+"""
+Utilidades compartidas por los scripts de benchmark y verificación
+"""
+# scripts/_servidor.py
+# Levanta la aplicación con uvicorn en un hilo y hace peticiones HTTP con urllib,
+# sin dependencias extra (no hace falta httpx ni el TestClient de FastAPI).
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import uvicorn
+
+
+def arrancar_servidor(app, port: int) -> uvicorn.Server:
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def parar_servidor(server: uvicorn.Server) -> None:
+    server.should_exit = True
+    time.sleep(0.5)
+
+
+def peticion(url: str, metodo: str = "GET", cuerpo=None, cabeceras: dict | None = None, timeout: float = 30):
+    """
+    Hace una petición y devuelve (status, cabeceras, cuerpo en bytes).
+    cuerpo puede ser bytes, un dict/list (se envía como JSON) o None.
+    Los códigos de error HTTP se devuelven igual que los de éxito.
+    """
+    headers = dict(cabeceras or {})
+    if cuerpo is not None and not isinstance(cuerpo, bytes):
+        cuerpo = json.dumps(cuerpo).encode()
+        headers.setdefault("Content-Type", "application/json")
+    req = urllib.request.Request(url, data=cuerpo, method=metodo, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as respuesta:
+            return respuesta.status, dict(respuesta.headers), respuesta.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
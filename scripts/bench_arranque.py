@@ -0,0 +1,138 @@
+"""
+Benchmark de arranque en frío: importación de la aplicación y primera petición
+"""
+# scripts/bench_arranque.py
+# Lanza varias veces un proceso Python nuevo que:
+#   1. importa app.main                         -> import_ms
+#   2. arranca uvicorn (lifespan: esquema+semilla) -> arranque_ms
+#   3. hace la primera petición a la API         -> primera_api_ms
+#   4. y la primera a una página HTML            -> primera_web_ms
+# total_ms es el tiempo desde que empieza el proceso hasta tener las dos respuestas.
+#
+# Cada medida se hace con una base de datos nueva ("fria": migraciones y semilla)
+# y con una ya inicializada ("caliente", el caso de un reinicio de worker).
+# Las medianas se comparan con el presupuesto de scripts/presupuesto_arranque.json
+# y el script falla (código 1) si alguna lo supera.
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/bench_arranque.py --repeticiones 5
+#   python scripts/bench_arranque.py --guardar   # actualiza el presupuesto con margen
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PRESUPUESTO = Path(__file__).resolve().parent / "presupuesto_arranque.json"
+METRICAS = ["import_ms", "arranque_ms", "primera_api_ms", "primera_web_ms", "total_ms"]
+# margen sobre la mediana medida al guardar un presupuesto nuevo
+MARGEN = 1.5
+
+
+def medir_en_hijo(puerto: int) -> None:
+    """
+    Se ejecuta en el proceso hijo: imprime las medidas en JSON por stdout.
+    """
+    inicio = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+
+    from app.main import app
+    t_import = time.perf_counter()
+
+    from scripts._servidor import arrancar_servidor, parar_servidor, peticion
+    server = arrancar_servidor(app, puerto)
+    t_arranque = time.perf_counter()
+
+    status_api, _, _ = peticion(f"http://127.0.0.1:{puerto}/api/peliculas")
+    t_api = time.perf_counter()
+    status_web, _, _ = peticion(f"http://127.0.0.1:{puerto}/peliculas")
+    t_web = time.perf_counter()
+    parar_servidor(server)
+
+    if status_api != 200 or status_web != 200:
+        raise SystemExit(f"respuestas inesperadas: API {status_api}, web {status_web}")
+
+    print(json.dumps({
+        "import_ms": (t_import - inicio) * 1000,
+        "arranque_ms": (t_arranque - t_import) * 1000,
+        "primera_api_ms": (t_api - t_arranque) * 1000,
+        "primera_web_ms": (t_web - t_api) * 1000,
+        "total_ms": (t_web - inicio) * 1000,
+    }))
+
+
+def lanzar(db_path: Path, puerto: int) -> dict:
+    env = {
+        **os.environ,
+        "CARTELERA_DATABASE_URL": f"sqlite:///{db_path}",
+        "CARTELERA_DB_ECHO": "false",
+    }
+    salida = subprocess.run(
+        [sys.executable, __file__, "--hijo", "--puerto", str(puerto)],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medianas(medidas: list[dict]) -> dict:
+    return {m: statistics.median(d[m] for d in medidas) for m in METRICAS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--puerto", type=int, default=8767)
+    parser.add_argument("--guardar", action="store_true", help="escribe el presupuesto a partir de esta medida")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        medir_en_hijo(args.puerto)
+        return
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench_arranque_"))
+    frias, calientes = [], []
+    for i in range(args.repeticiones):
+        db_path = tmp / f"arranque_{i}.db"
+        frias.append(lanzar(db_path, args.puerto))
+        calientes.append(lanzar(db_path, args.puerto))
+
+    resultado = {"fria": medianas(frias), "caliente": medianas(calientes)}
+
+    print(f"{'escenario':<10}" + "".join(f"{m:>16}" for m in METRICAS))
+    for escenario, valores in resultado.items():
+        print(f"{escenario:<10}" + "".join(f"{valores[m]:>16.1f}" for m in METRICAS))
+
+    if args.guardar:
+        presupuesto = {
+            escenario: {m: round(v * MARGEN) for m, v in valores.items()}
+            for escenario, valores in resultado.items()
+        }
+        PRESUPUESTO.write_text(json.dumps(presupuesto, indent=2) + "\n", encoding="utf-8")
+        print(f"\nPresupuesto guardado en {PRESUPUESTO.relative_to(ROOT)}")
+        return
+
+    presupuesto = json.loads(PRESUPUESTO.read_text(encoding="utf-8"))
+    excedidos = [
+        f"{escenario}.{m}: {resultado[escenario][m]:.1f} ms > {limite} ms"
+        for escenario, limites in presupuesto.items()
+        for m, limite in limites.items()
+        if resultado[escenario][m] > limite
+    ]
+    if excedidos:
+        print("\nPresupuesto de arranque superado:")
+        for linea in excedidos:
+            print(f"  {linea}")
+        sys.exit(1)
+    print("\nDentro del presupuesto de arranque")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark de la asignación de n butacas juntas (app/services/asignacion.py)
+"""
+# scripts/bench_asignacion.py
+# Compara, sobre planos grandes con ocupación aleatoria, la búsqueda del mejor
+# bloque de n butacas juntas con:
+#   - huecos: mejor_bloque() sobre los huecos de cada fila ya calculados (lo
+#     que hace POST /api/horarios/{id}/allocate con la copia en memoria)
+#   - construir: calcular los huecos de un mapa de bits nuevo (una vez por
+#     cada cambio del mapa)
+#   - barrido: probar cada posición de cada fila mirando sus n bits
+# y comprueba que huecos y barrido eligen un bloque igual de bueno.
+#
+# No usa la base de datos ni el servidor: sólo el Plano en memoria.
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/bench_asignacion.py --n 4 --ocupacion 0.6
+#   python scripts/bench_asignacion.py --planos 20x20 200x250 --repeticiones 200
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# app.services importa los modelos y la configuración de la base de datos;
+# apuntarla a un fichero temporal para no tocar cartelera.db
+TMP_DIR = tempfile.mkdtemp(prefix="bench_asignacion_")
+os.environ["CARTELERA_DATABASE_URL"] = f"sqlite:///{Path(TMP_DIR) / 'asignacion.db'}"
+os.environ["CARTELERA_DB_ECHO"] = "false"
+
+from app.services.asientos import Plano, posiciones  # noqa: E402
+from app.services.asignacion import fila_ideal, mejor_bloque  # noqa: E402
+
+
+def llenar(filas: int, butacas_por_fila: int, ocupacion: float, azar: random.Random) -> bytes:
+    """Mapa de bits con grupos de 1 a 6 butacas juntas hasta la ocupación pedida."""
+    total = filas * butacas_por_fila
+    mapa = bytearray((total + 7) >> 3)
+    ocupadas = 0
+    while ocupadas < total * ocupacion:
+        fila = azar.randrange(filas)
+        inicio = azar.randrange(butacas_por_fila)
+        for butaca in range(inicio, min(inicio + azar.randint(1, 6), butacas_por_fila)):
+            i = fila * butacas_por_fila + butaca
+            if not mapa[i >> 3] >> (i & 7) & 1:
+                mapa[i >> 3] |= 1 << (i & 7)
+                ocupadas += 1
+    return bytes(mapa)
+
+
+def puntos(plano: Plano, fila: int, butaca: int, n: int) -> float:
+    return (fila - fila_ideal(plano.filas)) ** 2 + (butaca - (plano.butacas_por_fila - n) / 2) ** 2
+
+
+def barrido(plano: Plano, n: int) -> float:
+    """Puntos del mejor bloque mirando todas las posiciones (math.inf si no hay)."""
+    mejor = math.inf
+    for fila in range(plano.filas):
+        for butaca in range(plano.butacas_por_fila - n + 1):
+            inicio = fila * plano.butacas_por_fila + butaca
+            if not any(plano.ocupada(i) for i in range(inicio, inicio + n)):
+                mejor = min(mejor, puntos(plano, fila, butaca, n))
+    return mejor
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Mediana en microsegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--planos", nargs="+", default=["20x20", "50x60", "100x100", "200x250"],
+                        help="filas x butacas por fila")
+    parser.add_argument("--n", type=int, default=4, help="butacas juntas")
+    parser.add_argument("--ocupacion", type=float, default=0.6, help="fracción de butacas ocupadas")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    azar = random.Random(args.semilla)
+    print(f"n={args.n} ocupacion={args.ocupacion:.0%}")
+    print(f"{'plano':>9} {'butacas':>8} {'huecos µs':>10} {'construir µs':>13} {'barrido µs':>11} {'x':>7}")
+    fallos = 0
+    for texto in args.planos:
+        filas, butacas_por_fila = (int(x) for x in texto.lower().split("x"))
+        mapa = llenar(filas, butacas_por_fila, args.ocupacion, azar)
+        plano = Plano(filas, butacas_por_fila, mapa)
+        plano.huecos, plano.hueco_maximo  # calculados una vez, como en la copia en memoria
+
+        bloque = mejor_bloque(plano, args.n)
+        elegido = math.inf
+        if bloque is not None:
+            fila, butaca = posiciones(bloque)[0]
+            elegido = puntos(plano, fila, butaca, args.n)
+        esperado = barrido(plano, args.n)
+        if not math.isclose(elegido, esperado):
+            print(f"FALLO en {texto}: los huecos eligen {bloque} ({elegido} puntos) y el barrido {esperado}")
+            fallos += 1
+
+        us_huecos = medir(lambda: mejor_bloque(plano, args.n), args.repeticiones)
+        us_construir = medir(lambda: Plano(filas, butacas_por_fila, mapa).huecos, args.repeticiones)
+        us_barrido = medir(lambda: barrido(plano, args.n), max(1, args.repeticiones // 10))
+        print(
+            f"{texto:>9} {filas * butacas_por_fila:>8} {us_huecos:>10.1f} {us_construir:>13.1f} "
+            f"{us_barrido:>11.1f} {us_barrido / us_huecos:>6.0f}x"
+        )
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
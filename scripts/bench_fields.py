@@ -0,0 +1,116 @@
+"""
+Benchmark de ?fields= / ?exclude= (app/campos.py): bytes y latencia por petición
+"""
+# scripts/bench_fields.py
+# Levanta la aplicación con uvicorn sobre una base de datos temporal con muchas
+# filas y, para cada listado/detalle, compara la respuesta completa con la
+# misma petición pidiendo sólo algunos campos:
+#   - bytes: tamaño del cuerpo JSON
+#   - ms: mediana de la latencia de la petición completa (HTTP incluido)
+#
+# Las variantes sin la relación anidada (horario, sala) además se ahorran el
+# JOIN; en películas el género ya está en la caché del catálogo y sólo cambia
+# la serialización.
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/bench_fields.py --filas 5000 --repeticiones 50
+#   CARTELERA_API_STACK=async python scripts/bench_fields.py
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_fields_")
+DB_PATH = Path(TMP_DIR) / "fields.db"
+os.environ["CARTELERA_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["CARTELERA_DB_ECHO"] = "false"
+os.chdir(ROOT)
+
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+from scripts._servidor import arrancar_servidor, parar_servidor, peticion  # noqa: E402
+
+# (ruta completa, [variantes con selección de campos])
+CASOS = [
+    ("/api/ventas?limit=1000", ["/api/ventas?limit=1000&exclude=horario", "/api/ventas?limit=1000&fields=id,precio_total"]),
+    ("/api/horarios?limit=1000", ["/api/horarios?limit=1000&exclude=sala", "/api/horarios?limit=1000&fields=id,hora"]),
+    ("/api/peliculas?limit=1000", ["/api/peliculas?limit=1000&exclude=genero", "/api/peliculas?limit=1000&fields=id,titulo"]),
+    ("/api/ventas/10", ["/api/ventas/10?fields=id,precio_total"]),
+]
+
+
+def poblar(filas: int) -> None:
+    con = sqlite3.connect(DB_PATH)
+    with con:
+        con.executemany(
+            "INSERT INTO salas (nombre, capacidad, tipo, precio) VALUES (?, ?, ?, ?)",
+            [(f"Sala {i}", 100, "2D", 8.5) for i in range(filas)],
+        )
+        con.executemany(
+            "INSERT INTO peliculas (titulo, genero_id, duracion, disponible) VALUES (?, ?, ?, ?)",
+            [(f"Película {i}", i % 7 + 1, 90 + i % 60, True) for i in range(filas)],
+        )
+        con.executemany(
+            "INSERT INTO horarios (pelicula_id, sala_id, hora, disponible) VALUES (?, ?, ?, ?)",
+            [(i % filas + 1, i % filas + 1, f"{i % 24:02d}:00", True) for i in range(filas)],
+        )
+        con.executemany(
+            "INSERT INTO ventas (horario_id, precio_total, cantidad, metodo_pago) VALUES (?, ?, ?, ?)",
+            [(i % filas + 1, 17.0, 2, "TARJETA") for i in range(filas)],
+        )
+        con.execute("ANALYZE")
+    con.close()
+
+
+def medir(url: str, repeticiones: int) -> tuple[int, float]:
+    """
+    Devuelve (bytes del cuerpo, mediana en ms). La primera petición es de calentamiento.
+    """
+    status, _, cuerpo = peticion(url)
+    if status != 200:
+        raise RuntimeError(f"{url} devolvió {status}: {cuerpo[:200]!r}")
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        peticion(url)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return len(cuerpo), statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=5000, help="filas por tabla")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--puerto", type=int, default=8767)
+    args = parser.parse_args()
+
+    database.init_db()  # esquema y semilla (normalmente lo hace el lifespan al arrancar)
+    poblar(args.filas)
+
+    server = arrancar_servidor(app, args.puerto)
+    base = f"http://127.0.0.1:{args.puerto}"
+    try:
+        print(f"{'petición':<48} {'bytes':>9} {'ahorro':>7} {'ms':>8} {'ahorro':>7}")
+        for completa, variantes in CASOS:
+            bytes_ref, ms_ref = medir(base + completa, args.repeticiones)
+            print(f"{completa:<48} {bytes_ref:>9} {'':>7} {ms_ref:>8.2f} {'':>7}")
+            for variante in variantes:
+                n_bytes, ms = medir(base + variante, args.repeticiones)
+                print(
+                    f"  {variante.split('?', 1)[1]:<46} {n_bytes:>9} {(1 - n_bytes / bytes_ref) * 100:>6.1f}%"
+                    f" {ms:>8.2f} {(1 - ms / ms_ref) * 100:>6.1f}%"
+                )
+    finally:
+        parar_servidor(server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Microbenchmark de app/queries.py: select construido en cada llamada vs lambda_stmt
+"""
+# scripts/bench_queries.py
+# Para cada consulta compartida por los routers compara:
+#   - construir: montar la sentencia y calcular su clave de caché, que es el
+#     trabajo en Python que SQLAlchemy hace en cada petición antes de buscar
+#     el SQL compilado en su caché
+#   - ejecutar: db.execute(...) completo contra una base de datos SQLite
+#     temporal (incluye el acceso a la base de datos y crear los objetos ORM)
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/bench_queries.py --iteraciones 20000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TMP_DIR = tempfile.mkdtemp(prefix="bench_queries_")
+os.environ["CARTELERA_DATABASE_URL"] = f"sqlite:///{TMP_DIR}/queries.db"
+os.environ["CARTELERA_DB_ECHO"] = "false"
+os.chdir(ROOT)
+
+from sqlalchemy import exists, select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app import queries  # noqa: E402
+from app.database import SessionLocal, init_db  # noqa: E402
+from app.models import Genre, Horario, Pelicula, Venta  # noqa: E402
+
+# (nombre, sentencia construida a mano como antes, sentencia de app/queries.py, cómo leer el resultado)
+CASOS = [
+    (
+        "pelicula_por_id",
+        lambda id: select(Pelicula).where(Pelicula.id == id).options(joinedload(Pelicula.genero)),
+        queries.pelicula_por_id,
+        lambda r: r.scalar_one_or_none(),
+    ),
+    (
+        "venta_por_id",
+        lambda id: select(Venta).where(Venta.id == id).options(joinedload(Venta.horario).joinedload(Horario.sala)),
+        queries.venta_por_id,
+        lambda r: r.scalar_one_or_none(),
+    ),
+    (
+        "por_id(Genre)",
+        lambda id: select(Genre).where(Genre.id == id),
+        lambda id: queries.por_id(Genre, id),
+        lambda r: r.scalar_one_or_none(),
+    ),
+    (
+        "horarios",
+        lambda id: select(Horario).options(joinedload(Horario.sala)),
+        lambda id: queries.horarios(),
+        lambda r: r.scalars().unique().all(),
+    ),
+    (
+        "existe(Genre)",
+        lambda id: select(exists().where(Genre.id == id)),
+        lambda id: queries.existe(Genre, id),
+        lambda r: r.scalar(),
+    ),
+]
+
+
+def medir_construccion(fabrica, iteraciones: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(iteraciones):
+        fabrica(i % 3 + 1)._generate_cache_key()
+    return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def medir_ejecucion(fabrica, leer, iteraciones: int) -> float:
+    with SessionLocal() as db:
+        inicio = time.perf_counter()
+        for i in range(iteraciones):
+            leer(db.execute(fabrica(i % 3 + 1)))
+            db.expunge_all()
+        return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iteraciones", type=int, default=20000)
+    args = parser.parse_args()
+
+    init_db()
+    n_construir = args.iteraciones
+    n_ejecutar = max(1, args.iteraciones // 10)
+
+    print(f"{'consulta':<18} {'construir µs':>13} {'lambda µs':>10} {'ahorro µs':>10}   {'ejecutar µs':>12} {'lambda µs':>10} {'ahorro':>7}")
+    for nombre, clasica, lambda_, leer in CASOS:
+        # calentamiento: la primera llamada analiza la lambda y compila el SQL
+        for fabrica in (clasica, lambda_):
+            with SessionLocal() as db:
+                leer(db.execute(fabrica(1)))
+
+        c_clasica = medir_construccion(clasica, n_construir)
+        c_lambda = medir_construccion(lambda_, n_construir)
+        e_clasica = medir_ejecucion(clasica, leer, n_ejecutar)
+        e_lambda = medir_ejecucion(lambda_, leer, n_ejecutar)
+        print(
+            f"{nombre:<18} {c_clasica:>13.1f} {c_lambda:>10.1f} {c_clasica - c_lambda:>10.1f}"
+            f"   {e_clasica:>12.1f} {e_lambda:>10.1f} {(1 - e_lambda / e_clasica) * 100:>6.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark de lecturas/escrituras concurrentes contra /api/ventas
+"""
+# scripts/bench_ventas_concurrentes.py
+# Compara el rendimiento de la base de datos SIN los PRAGMAs de app/settings.py
+# ("antes": journal por defecto, synchronous=FULL), CON ellos ("despues": WAL, etc.)
+# y con los PRAGMAs más la escritura agrupada de ventas ("lotes", ver
+# app/services/venta_writer.py).
+#
+# Para cada escenario levanta la aplicación real con uvicorn sobre una base de
+# datos temporal y lanza a la vez:
+#   - hilos escritores que hacen POST /api/ventas
+#   - hilos lectores que hacen GET /api/peliculas
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/bench_ventas_concurrentes.py --segundos 10 --escritores 8 --lectores 8
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# La aplicación no debe tocar cartelera.db al importarse
+TMP_DIR = tempfile.mkdtemp(prefix="bench_ventas_")
+os.environ.setdefault("CARTELERA_DATABASE_URL", f"sqlite:///{TMP_DIR}/import.db")
+os.environ.setdefault("CARTELERA_DB_ECHO", "false")
+os.chdir(ROOT)
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, create_db_engine, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Genre, Horario, Pelicula, SalaORM  # noqa: E402
+from app.routers.api import ventas as ventas_router  # noqa: E402
+from app.services.venta_writer import venta_write_queue  # noqa: E402
+from app.settings import Settings, SQLitePragmas, settings  # noqa: E402
+from scripts._servidor import arrancar_servidor, parar_servidor, peticion  # noqa: E402
+
+
+def preparar_base_datos(config: Settings):
+    engine = create_db_engine(config)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=True, expire_on_commit=False)
+    with Session() as db:
+        db.add(Genre(id=1, name_genre="Acción"))
+        db.add_all([
+            Pelicula(titulo=f"Película {i}", genero_id=1, duracion=100, disponible=True)
+            for i in range(1, 201)
+        ])
+        # aforo de sobra: aquí se mide el rendimiento, no el límite de butacas
+        db.add(SalaORM(nombre="Sala1", capacidad=10**9, tipo="2D", precio=8.90))
+        db.add(Horario(pelicula_id=1, sala_id=1, hora="20:00", disponible=True))
+        db.commit()
+    return engine, Session
+
+
+def trabajador(url: str, metodo: str, cuerpo: bytes | None, fin: float, resultados: list, errores: list):
+    hechos = 0
+    fallos = 0
+    while time.perf_counter() < fin:
+        try:
+            status, _, _ = peticion(url, metodo, cuerpo, {"Content-Type": "application/json"})
+        except Exception:
+            status = 0
+        if 200 <= status < 300:
+            hechos += 1
+        else:
+            fallos += 1
+    resultados.append(hechos)
+    errores.append(fallos)
+
+
+def ejecutar_escenario(nombre: str, pragmas: SQLitePragmas | None, group_commit: bool, args) -> dict:
+    db_path = Path(TMP_DIR) / f"{nombre}.db"
+    config = Settings(
+        env="bench",
+        database_url=f"sqlite:///{db_path}",
+        echo=False,
+        pool_size=args.escritores + args.lectores,
+        max_overflow=10,
+        pragmas=pragmas,
+    )
+    engine, Session = preparar_base_datos(config)
+
+    def get_db_bench():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = get_db_bench
+    ventas_router.settings = dataclasses.replace(settings, ventas_group_commit=group_commit)
+    venta_write_queue.session_factory = Session
+    venta_write_queue.lotes = venta_write_queue.ventas = 0
+    server = arrancar_servidor(app, args.puerto)
+    base = f"http://127.0.0.1:{args.puerto}"
+    venta = json.dumps({"horario_id": 1, "cantidad": 2, "metodo_pago": "tarjeta"}).encode()
+
+    escrituras, errores_escritura = [], []
+    lecturas, errores_lectura = [], []
+    fin = time.perf_counter() + args.segundos
+    hilos = [
+        threading.Thread(target=trabajador, args=(f"{base}/api/ventas", "POST", venta, fin, escrituras, errores_escritura))
+        for _ in range(args.escritores)
+    ] + [
+        threading.Thread(target=trabajador, args=(f"{base}/api/peliculas", "GET", None, fin, lecturas, errores_lectura))
+        for _ in range(args.lectores)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    parar_servidor(server)
+    venta_write_queue.stop()
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+    return {
+        "escenario": nombre,
+        "escrituras_s": sum(escrituras) / args.segundos,
+        "lecturas_s": sum(lecturas) / args.segundos,
+        "errores": sum(errores_escritura) + sum(errores_lectura),
+        "media_lote": venta_write_queue.media_lote if group_commit else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--escritores", type=int, default=8)
+    parser.add_argument("--lectores", type=int, default=8)
+    parser.add_argument("--puerto", type=int, default=8765)
+    args = parser.parse_args()
+
+    resultados = [
+        ejecutar_escenario("antes", None, False, args),
+        ejecutar_escenario("despues", SQLitePragmas(), False, args),
+        ejecutar_escenario("lotes", SQLitePragmas(), True, args),
+    ]
+
+    print(f"{'escenario':<10} {'POST ventas/s':>14} {'GET peliculas/s':>16} {'errores':>8} {'ventas/lote':>12}")
+    for r in resultados:
+        print(f"{r['escenario']:<10} {r['escrituras_s']:>14.1f} {r['lecturas_s']:>16.1f} {r['errores']:>8} {r['media_lote']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
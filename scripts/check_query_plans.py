@@ -0,0 +1,379 @@
+"""
+Verificación de planes de consulta (EXPLAIN QUERY PLAN) de los routers
+"""
+# scripts/check_query_plans.py
+# Levanta la aplicación sobre una base de datos temporal con muchas filas,
+# recorre los endpoints de la API y de la web capturando cada sentencia SQL que
+# emiten (evento before_cursor_execute) y después ejecuta EXPLAIN QUERY PLAN
+# sobre cada una.
+#
+# Falla (código de salida 1) si alguna consulta recorre entera (SCAN) una tabla
+# con más filas que el umbral, tenga WHERE o no, y también si el recorrido es
+# sobre un índice (USING INDEX / USING COVERING INDEX): lee igualmente todas
+# las filas. Los recorridos intencionados están en PERMITIDOS, cada uno con su
+# motivo.
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/check_query_plans.py --filas 5000 --umbral 1000
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TMP_DIR = tempfile.mkdtemp(prefix="query_plans_")
+DB_PATH = Path(TMP_DIR) / "planes.db"
+os.environ["CARTELERA_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["CARTELERA_DB_ECHO"] = "false"
+os.chdir(ROOT)
+
+from sqlalchemy import event  # noqa: E402
+
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+from scripts._servidor import arrancar_servidor, parar_servidor, peticion  # noqa: E402
+
+
+def _formulario(campos: dict) -> tuple[bytes, dict]:
+    # cuerpo y cabeceras de un formulario web
+    return urlencode(campos).encode(), {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def _fichero(nombre: str, contenido: bytes, tipo: str) -> tuple[bytes, dict]:
+    # cuerpo y cabeceras de una subida de fichero (campo file de /import/csv y /import/json)
+    frontera = "check-query-plans"
+    cuerpo = (
+        f"--{frontera}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{nombre}\"\r\n"
+        f"Content-Type: {tipo}\r\n\r\n"
+    ).encode() + contenido + f"\r\n--{frontera}--\r\n".encode()
+    return cuerpo, {"Content-Type": f"multipart/form-data; boundary={frontera}"}
+
+
+# Endpoints que se recorren, en orden: (método, ruta, cuerpo[, cabeceras]). Los ids
+# apuntan a filas que existen tras poblar la base de datos o que crean las
+# peticiones anteriores (las reservas 1 y 2). Todas las rutas de app.routes
+# tienen que aparecer aquí o en SIN_RECORRER: si no, el script falla.
+RUTAS = [
+    # API
+    ("GET", "/api/peliculas", None),
+    ("GET", "/api/peliculas/10", None),
+    ("POST", "/api/peliculas", {
+        "titulo": "Película nueva", "duracion": 100, "disponible": True, "genero_id": 5,
+        "genero": {"id": 5, "name_genre": "Género 5"},
+    }),
+    ("PATCH", "/api/peliculas/10", {"duracion": 99}),
+    ("GET", "/api/genres", None),
+    ("GET", "/api/genres/10", None),
+    ("POST", "/api/genres", {"name_genre": "Género nuevo"}),
+    ("PATCH", "/api/genres/10", {"name_genre": "Género editado"}),
+    ("GET", "/api/salas/salas", None),
+    ("GET", "/api/salas/salas/10", None),
+    ("POST", "/api/salas/salas", {"nombre": "Sala nueva", "capacidad": 50, "tipo": "2D", "precio": 7.5}),
+    ("PATCH", "/api/salas/salas/10", {"nombre": "Sala 10", "capacidad": 60, "tipo": "3D", "precio": 9.0}),
+    ("GET", "/api/horarios", None),
+    ("GET", "/api/horarios/10", None),
+    ("POST", "/api/horarios", {"pelicula_id": 10, "sala_id": 10, "hora": "17:00", "disponible": True}),
+    ("PATCH", "/api/horarios/10", {"hora": "18:15"}),
+    ("GET", "/api/ventas", None),
+    ("GET", "/api/ventas/10", None),
+    ("POST", "/api/ventas", {"horario_id": 10, "cantidad": 2, "metodo_pago": "tarjeta"}),
+    ("PATCH", "/api/ventas/10", {"cantidad": 3}),
+    ("DELETE", "/api/ventas/11", None),
+    # páginas siguientes (cursor de app/paginacion.py: [100] y ["12:00", 100])
+    ("GET", "/api/ventas?limit=50&after=WzEwMF0", None),
+    ("GET", "/api/horarios?limit=50&after=WzEwMF0", None),
+    ("GET", "/api/cartelera", None),
+    ("GET", "/api/cartelera?limit=50&after=WyIxMjowMCIsMTAwXQ", None),
+    # selección de campos (app/campos.py): consultas sin joinedload
+    ("GET", "/api/ventas?exclude=horario", None),
+    ("GET", "/api/ventas/10?fields=id,precio_total", None),
+    ("GET", "/api/horarios?fields=id,hora", None),
+    ("GET", "/api/horarios/10?exclude=sala", None),
+    # plano de butacas (app/services/asientos.py): el horario 3 de la semilla tiene plano
+    ("GET", "/api/horarios/3/asientos", None),
+    ("POST", "/api/horarios/3/asientos", {"asientos": ["A1", "A2"]}),
+    ("POST", "/api/horarios/3/allocate?n=4", None),
+    # reservas (app/services/reservas.py): la 1 se confirma y la 2 se cancela
+    ("POST", "/api/reservas", {"horario_id": 20, "cantidad": 2}),
+    ("POST", "/api/reservas", {"horario_id": 3, "asientos": ["E1", "E2"]}),
+    ("GET", "/api/reservas/2", None),
+    ("POST", "/api/reservas/1/confirmar", {"metodo_pago": "tarjeta"}),
+    ("DELETE", "/api/reservas/2", None),
+    # lotes (app/lotes.py)
+    ("POST", "/api/horarios/batch", [
+        {"pelicula_id": 30, "sala_id": 30, "hora": "20:00", "disponible": True},
+        {"pelicula_id": 31, "sala_id": 31, "hora": "22:30", "disponible": True},
+    ]),
+    ("POST", "/api/ventas/batch", [
+        {"horario_id": 30, "cantidad": 1, "metodo_pago": "tarjeta"},
+        {"horario_id": 31, "cantidad": 2, "metodo_pago": "efectivo"},
+    ]),
+    # NDJSON (app/streaming.py)
+    ("GET", "/api/ventas/stream", None),
+    ("GET", "/api/ventas/stream?after=100", None),
+    ("GET", "/api/horarios/stream", None),
+    # exportación e importación del catálogo (app/services/exportacion.py e importacion.py)
+    ("GET", "/api/peliculas/export/csv", None),
+    ("GET", "/api/peliculas/export/csv?q=cula", None),
+    ("GET", "/api/peliculas/export/json?q=cula&genero_id=3&duracion_max=120&disponible=true", None),
+    ("POST", "/api/peliculas/import", [
+        {"titulo": "Película 7", "duracion": 95, "genero_nombre": "Género 8"},
+        {"titulo": "Importada nueva", "duracion": 100, "genero_nombre": "Género importado"},
+    ]),
+    ("POST", "/api/peliculas/import/csv", *_fichero(
+        "catalogo.csv", "titulo,duracion,genero_nombre\nImportada CSV,110,Género 9\n".encode(), "text/csv",
+    )),
+    ("POST", "/api/peliculas/import/json", *_fichero(
+        "catalogo.json", '[{"titulo": "Importada JSON", "duracion": 120, "genero_id": 9}]'.encode(),
+        "application/json",
+    )),
+    # PUT y DELETE del resto de recursos
+    ("PUT", "/api/peliculas/12", {
+        "titulo": "Película 12 editada", "duracion": 100, "disponible": True, "genero_id": 5,
+        "genero": {"id": 5, "name_genre": "Género 5"},
+    }),
+    ("PUT", "/api/genres/12", {"name_genre": "Género 12 editado"}),
+    ("PUT", "/api/horarios/12", {"pelicula_id": 12, "sala_id": 12, "hora": "21:00", "disponible": True}),
+    ("PUT", "/api/ventas/12", {"horario_id": 12, "cantidad": 1, "metodo_pago": "efectivo", "precio_total": 8.5}),
+    ("DELETE", "/api/horarios/13", None),
+    ("DELETE", "/api/peliculas/14", None),
+    ("DELETE", "/api/salas/salas/15", None),
+    ("DELETE", "/api/genres/60", None),
+    ("GET", "/api/estadisticas", None),
+    ("DELETE", "/api/estadisticas", None),
+    # Web
+    ("GET", "/", None),
+    ("GET", "/peliculas", None),
+    ("GET", "/peliculas/10", None),
+    ("GET", "/peliculas/new", None),
+    ("GET", "/genres", None),
+    ("GET", "/genres/10", None),
+    ("GET", "/salas", None),
+    ("GET", "/salas/10", None),
+    ("GET", "/horarios", None),
+    ("GET", "/horarios/10", None),
+    ("GET", "/ventas", None),
+    ("GET", "/ventas/10", None),
+    # formularios web
+    ("GET", "/genres/new", None),
+    ("POST", "/genres/new", *_formulario({"name_genre": "Género web"})),
+    ("GET", "/genres/16/edit", None),
+    ("POST", "/genres/16/edit", *_formulario({"name_genre": "Género 16 web"})),
+    ("POST", "/genres/61/delete", None),
+    ("POST", "/peliculas/new", *_formulario({"titulo": "Película web", "genero_id": 4, "duracion": 95})),
+    ("GET", "/peliculas/16/edit", None),
+    ("POST", "/peliculas/16/edit", *_formulario({
+        "titulo": "Película 16 web", "genero_id": 4, "duracion": 95, "disponible": "on",
+    })),
+    ("POST", "/peliculas/17/delete", None),
+    ("GET", "/salas/new", None),
+    ("POST", "/salas/new", *_formulario({"nombre": "Sala web", "capacidad": 80, "tipo": "2D", "precio": 8})),
+    ("GET", "/salas/16/edit", None),
+    ("POST", "/salas/16/edit", *_formulario({"nombre": "Sala 16 web", "capacidad": 90, "tipo": "3D", "precio": 9})),
+    ("POST", "/salas/17/delete", None),
+    ("GET", "/horarios/new", None),
+    ("POST", "/horarios/new", *_formulario({"pelicula_id": 16, "sala_id": 16, "hora": "16:30", "disponible": "on"})),
+    ("GET", "/horarios/16/edit", None),
+    ("POST", "/horarios/16/edit", *_formulario({"pelicula_id": 16, "sala_id": 16, "hora": "17:30"})),
+    ("POST", "/horarios/18/delete", None),
+    ("GET", "/ventas/new", None),
+    ("POST", "/ventas/new", *_formulario({"horario_id": 16, "cantidad": 2, "metodo_pago": "tarjeta"})),
+    ("GET", "/ventas/16/edit", None),
+    ("POST", "/ventas/16/edit", *_formulario({"horario_id": 16, "cantidad": 1, "metodo_pago": "efectivo"})),
+    ("POST", "/ventas/19/delete", None),
+]
+
+# rutas de app.routes que no se recorren: la documentación de FastAPI no consulta la base de datos
+SIN_RECORRER = {"/docs", "/docs/oauth2-redirect", "/openapi.json", "/redoc"}
+
+
+# Recorridos completos intencionados: (expresión regular sobre la sentencia con
+# los espacios normalizados, motivo). Sólo cubren la sentencia exacta que los
+# necesita; una consulta nueva que recorra una tabla grande falla hasta que se
+# añada aquí con su motivo o se le dé un índice.
+PERMITIDOS = [
+    (r"^SELECT EXISTS \(SELECT peliculas\.id FROM peliculas\) AS anon_1$",
+     "init_db: comprueba si hay que sembrar; EXISTS se para en la primera fila"),
+    (r"^SELECT horarios\.id, salas\.precio FROM horarios JOIN salas ON salas\.id = horarios\.sala_id$",
+     "app/services/precios.py: carga la tabla horario -> precio en memoria una vez al arrancar"),
+    (r" FROM peliculas LEFT OUTER JOIN genres AS genres_1 ON genres_1\.id = peliculas\.genero_id "
+     r"ORDER BY peliculas\.id DESC LIMIT \? OFFSET \?$",
+     "portada (últimas películas): recorre por id hacia atrás y se para en el LIMIT"),
+    (r" FROM peliculas LEFT OUTER JOIN genres AS genres_1 ON genres_1\.id = peliculas\.genero_id$",
+     "web /peliculas: la página lista el catálogo entero (HTML en html_cache)"),
+    (r"^SELECT genres\.id, genres\.name_genre FROM genres$",
+     "web /genres y desplegable de géneros de los formularios web (html_cache y catalogo_cache)"),
+    (r"^SELECT salas\.[\w., ]+ FROM salas$",
+     "web /salas y desplegable de salas de los formularios web (html_cache y catalogo_cache)"),
+    (r"^SELECT horarios\.[\w., ]+ FROM horarios$",
+     "desplegable de horarios de los formularios web de ventas"),
+    (r" FROM horarios LEFT OUTER JOIN salas AS salas_1 ON salas_1\.id = horarios\.sala_id$",
+     "web /horarios: la página lista todos los horarios (HTML en html_cache)"),
+    (r"^SELECT ventas\.[\w., ]+ FROM ventas$",
+     "web /ventas: la página lista todas las ventas (HTML en html_cache)"),
+    (r" FROM peliculas LEFT OUTER JOIN genres AS genres_1 ON genres_1\.id = peliculas\.genero_id "
+     r"ORDER BY peliculas\.id$",
+     "/api/peliculas/export sin filtros: exporta el catálogo entero, en lotes con yield_per"),
+    (r" FROM peliculas LEFT OUTER JOIN genres AS genres_1 ON genres_1\.id = peliculas\.genero_id "
+     r"WHERE \(lower\(peliculas\.titulo\) LIKE '%' \|\| \? \|\| '%' ESCAPE '/'\) ORDER BY peliculas\.id$",
+     "/api/peliculas/export?q=: buscar una subcadena (LIKE '%q%') no puede usar un índice B-tree"),
+    (r"^SELECT peliculas\.titulo_normalizado FROM peliculas$",
+     "importación: carga los títulos existentes una vez por importación, no una consulta por fila"),
+]
+
+
+def permitido(sql: str) -> str | None:
+    """Motivo de PERMITIDOS que cubre la sentencia, o None."""
+    for patron, motivo in PERMITIDOS:
+        if re.search(patron, sql):
+            return motivo
+    return None
+
+
+def poblar(filas: int) -> None:
+    con = sqlite3.connect(DB_PATH)
+    with con:
+        inicio = con.execute("SELECT COALESCE(MAX(id), 0) FROM genres").fetchone()[0] + 1
+        con.executemany(
+            "INSERT INTO genres (id, name_genre) VALUES (?, ?)",
+            [(i, f"Género {i}") for i in range(inicio, filas + 1)],
+        )
+        con.executemany(
+            "INSERT INTO salas (nombre, capacidad, tipo, precio) VALUES (?, ?, ?, ?)",
+            [(f"Sala {i}", 100, "2D", 8.5) for i in range(filas)],
+        )
+        con.executemany(
+            "INSERT INTO peliculas (titulo, genero_id, duracion, disponible) VALUES (?, ?, ?, ?)",
+            [(f"Película {i}", i % 50 + 1, 90 + i % 60, i % 3 != 0) for i in range(filas)],
+        )
+        con.executemany(
+            "INSERT INTO horarios (pelicula_id, sala_id, hora, disponible) VALUES (?, ?, ?, ?)",
+            [(i % filas + 1, i % filas + 1, f"{i % 24:02d}:00", True) for i in range(filas)],
+        )
+        con.executemany(
+            "INSERT INTO ventas (horario_id, precio_total, cantidad, metodo_pago) VALUES (?, ?, ?, ?)",
+            [(i % filas + 1, 17.0, 2, "TARJETA") for i in range(filas)],
+        )
+        con.execute("ANALYZE")
+    con.close()
+
+
+def rutas_sin_recorrer() -> list[str]:
+    """Métodos y rutas de app.routes que no pide ninguna entrada de RUTAS."""
+    pedidas = [(metodo, urlsplit(ruta).path) for metodo, ruta, *_ in RUTAS]
+    faltan = []
+    for ruta in app.routes:
+        metodos = getattr(ruta, "methods", None)
+        if not metodos or ruta.path in SIN_RECORRER:
+            continue
+        for metodo in sorted(metodos - {"HEAD"}):
+            if not any(m == metodo and ruta.path_regex.match(p) for m, p in pedidas):
+                faltan.append(f"{metodo} {ruta.path}")
+    return faltan
+
+
+def capturar_sentencias(capturadas: dict) -> None:
+    def _capturar(conn, cursor, statement, parameters, context, executemany):
+        sql = " ".join(statement.split())
+        if not sql.upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            return
+        if executemany and parameters:
+            parameters = parameters[0]
+        capturadas.setdefault(sql, parameters)
+
+    for motor in {database.engine, database.read_engine}:
+        event.listen(motor, "before_cursor_execute", _capturar)
+
+
+def tamanos_tablas(con: sqlite3.Connection) -> dict[str, int]:
+    tablas = [r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    return {t: con.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tablas}
+
+
+def alias_de_tablas(sql: str, tablas: dict[str, int]) -> dict[str, str]:
+    alias = {t: t for t in tablas}
+    for tabla, nombre in re.findall(r"\b(\w+) AS (\w+)\b", sql):
+        if tabla in tablas:
+            alias[nombre] = tabla
+    return alias
+
+
+def analizar(capturadas: dict, umbral: int) -> int:
+    con = sqlite3.connect(DB_PATH)
+    tablas = tamanos_tablas(con)
+    errores = 0
+
+    for sql, parametros in capturadas.items():
+        plan = [fila[3] for fila in con.execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ())]
+        alias = alias_de_tablas(sql, tablas)
+
+        # cualquier SCAN cuenta, también sobre un índice: sólo SEARCH evita leer la tabla entera
+        problemas = []
+        for paso in plan:
+            m = re.match(r"SCAN (\w+)", paso)
+            if not m:
+                continue
+            tabla = alias.get(m.group(1), m.group(1))
+            filas = tablas.get(tabla, 0)
+            if filas > umbral:
+                problemas.append(f"{paso} ({tabla}: {filas} filas)")
+
+        motivo = permitido(sql) if problemas else None
+        if motivo:
+            estado = "perm."
+        elif problemas:
+            errores += 1
+            estado = "FALLO"
+        else:
+            estado = "ok"
+
+        print(f"[{estado:<5}] {sql[:150]}")
+        for paso in plan:
+            print(f"          {paso}")
+        if motivo:
+            print(f"          permitido: {motivo}")
+
+    con.close()
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=5000, help="filas por tabla")
+    parser.add_argument("--umbral", type=int, default=1000, help="filas a partir de las que un SCAN es un fallo")
+    parser.add_argument("--puerto", type=int, default=8766)
+    args = parser.parse_args()
+
+    database.init_db()  # esquema y semilla (normalmente lo hace el lifespan al arrancar)
+    poblar(args.filas)
+
+    capturadas: dict = {}
+    capturar_sentencias(capturadas)
+
+    server = arrancar_servidor(app, args.puerto)
+    try:
+        for metodo, ruta, cuerpo, *cabeceras in RUTAS:
+            status, _, _ = peticion(f"http://127.0.0.1:{args.puerto}{ruta}", metodo, cuerpo, *cabeceras)
+            if status >= 500:
+                print(f"AVISO: {metodo} {ruta} devolvió {status}")
+    finally:
+        parar_servidor(server)
+
+    errores = analizar(capturadas, args.umbral)
+    print(f"\n{len(capturadas)} consultas analizadas, {errores} con recorridos completos de tablas grandes")
+
+    faltan = rutas_sin_recorrer()
+    for ruta in faltan:
+        print(f"FALTA en RUTAS: {ruta}")
+    sys.exit(1 if errores or faltan else 0)
+
+
+if __name__ == "__main__":
+    main()
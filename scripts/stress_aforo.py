@@ -0,0 +1,164 @@
+"""
+Prueba de estrés del aforo: muchas ventas a la vez sin vender de más
+"""
+# scripts/stress_aforo.py
+# Levanta la aplicación con uvicorn sobre una base de datos temporal con unos
+# pocos horarios de aforo pequeño y lanza muchos hilos que hacen POST
+# /api/ventas a la vez (cantidades de 1 a 4 butacas), pidiendo bastantes más
+# butacas de las que hay. Al terminar comprueba en la base de datos que:
+#   - ningún horario tiene vendidas más butacas que la capacidad de su sala
+#   - horarios.vendidas es igual a la suma de sus ventas (y reservas activas)
+#   - las butacas de las respuestas 201 coinciden con las ventas guardadas
+# Si algo no cuadra termina con código 1. Cualquier respuesta que no sea 201
+# ni 409 se muestra aparte.
+#
+# Uso (desde la raíz del proyecto):
+#   python scripts/stress_aforo.py --peticiones 5000 --hilos 64
+#   CARTELERA_VENTAS_GROUP_COMMIT=false python scripts/stress_aforo.py
+#   CARTELERA_API_STACK=async python scripts/stress_aforo.py
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TMP_DIR = tempfile.mkdtemp(prefix="stress_aforo_")
+DB_PATH = Path(TMP_DIR) / "aforo.db"
+os.environ["CARTELERA_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["CARTELERA_DB_ECHO"] = "false"
+# sin group commit cada petición del threadpool (40 hilos) retiene una conexión
+# de escritura; con el pool de dev (5 + 10) se agotaría antes que el aforo
+os.environ.setdefault("CARTELERA_DB_POOL_SIZE", "40")
+os.chdir(ROOT)
+
+from app import database  # noqa: E402
+from app.main import app  # noqa: E402
+from app.settings import settings  # noqa: E402
+from scripts._servidor import arrancar_servidor, parar_servidor, peticion  # noqa: E402
+
+
+def poblar(horarios: int, capacidad: int) -> list[int]:
+    con = sqlite3.connect(DB_PATH)
+    with con:
+        con.executemany(
+            "INSERT INTO salas (nombre, capacidad, tipo, precio) VALUES (?, ?, ?, ?)",
+            [(f"Sala aforo {i}", capacidad, "2D", 8.5) for i in range(horarios)],
+        )
+        sala_ids = [fila[0] for fila in con.execute("SELECT id FROM salas WHERE nombre LIKE 'Sala aforo %' ORDER BY id")]
+        con.executemany(
+            "INSERT INTO horarios (pelicula_id, sala_id, hora, disponible) VALUES (1, ?, '20:00', 1)",
+            [(sala_id,) for sala_id in sala_ids],
+        )
+        ids = [fila[0] for fila in con.execute(
+            "SELECT id FROM horarios WHERE sala_id IN (%s) ORDER BY id" % ",".join("?" * len(sala_ids)), sala_ids
+        )]
+    con.close()
+    return ids
+
+
+def comprobar(horario_ids: list[int], vendidas_ok: Counter) -> list[str]:
+    """Devuelve la lista de problemas encontrados (vacía si todo cuadra)."""
+    con = sqlite3.connect(DB_PATH)
+    problemas = []
+    for horario_id in horario_ids:
+        vendidas, capacidad, suma, retenidas = con.execute(
+            "SELECT h.vendidas, s.capacidad, "
+            "(SELECT COALESCE(SUM(v.cantidad), 0) FROM ventas v WHERE v.horario_id = h.id), "
+            "(SELECT COALESCE(SUM(r.cantidad), 0) FROM reservas r WHERE r.horario_id = h.id) "
+            "FROM horarios h JOIN salas s ON s.id = h.sala_id WHERE h.id = ?",
+            (horario_id,),
+        ).fetchone()
+        if suma + retenidas > capacidad:
+            problemas.append(f"horario {horario_id}: {suma} butacas vendidas y {retenidas} reservadas con capacidad {capacidad}")
+        # las reservas activas también cuentan en vendidas (app/services/reservas.py)
+        if vendidas != suma + retenidas:
+            problemas.append(f"horario {horario_id}: vendidas={vendidas} pero las ventas y reservas suman {suma + retenidas}")
+        if vendidas_ok[horario_id] != suma:
+            problemas.append(f"horario {horario_id}: los 201 suman {vendidas_ok[horario_id]} y las ventas {suma}")
+    con.close()
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--peticiones", type=int, default=5000, help="POST /api/ventas en total")
+    parser.add_argument("--hilos", type=int, default=64, help="peticiones a la vez")
+    parser.add_argument("--horarios", type=int, default=4)
+    parser.add_argument("--capacidad", type=int, default=500, help="butacas por sala")
+    parser.add_argument("--puerto", type=int, default=8768)
+    args = parser.parse_args()
+
+    database.init_db()  # esquema y semilla (normalmente lo hace el lifespan al arrancar)
+    horario_ids = poblar(args.horarios, args.capacidad)
+
+    server = arrancar_servidor(app, args.puerto)
+    url = f"http://127.0.0.1:{args.puerto}/api/ventas"
+
+    pendientes = iter(range(args.peticiones))
+    lock = threading.Lock()
+    estados: Counter = Counter()
+    vendidas_ok: Counter = Counter()
+
+    def trabajador(semilla: int):
+        azar = random.Random(semilla)
+        while True:
+            with lock:
+                if next(pendientes, None) is None:
+                    return
+            horario_id = azar.choice(horario_ids)
+            cantidad = azar.randint(1, 4)
+            cuerpo = json.dumps({"horario_id": horario_id, "cantidad": cantidad}).encode()
+            try:
+                status, _, _ = peticion(url, "POST", cuerpo, {"Content-Type": "application/json"})
+            except Exception:
+                status = 0
+            with lock:
+                estados[status] += 1
+                if status == 201:
+                    vendidas_ok[horario_id] += cantidad
+
+    hilos = [threading.Thread(target=trabajador, args=(i,)) for i in range(args.hilos)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    parar_servidor(server)
+
+    problemas = comprobar(horario_ids, vendidas_ok)
+    otros = {status: n for status, n in estados.items() if status not in (201, 409)}
+
+    print(
+        f"pila={settings.api_stack} group_commit={settings.ventas_group_commit} "
+        f"hilos={args.hilos} horarios={args.horarios} capacidad={args.capacidad}"
+    )
+    print(
+        f"{args.peticiones} peticiones en {segundos:.2f} s ({args.peticiones / segundos:.0f}/s): "
+        f"{estados[201]} vendidas (201), {estados[409]} sin aforo (409)"
+    )
+    print(f"butacas vendidas: {sum(vendidas_ok.values())} de {args.horarios * args.capacidad}")
+    if otros:
+        # p. ej. "database is locked" si un escritor espera más de busy_timeout
+        # (sin group commit); esas ventas se deshacen y no cuentan para el aforo
+        print(f"otras respuestas (no son ventas): {otros}")
+    if problemas:
+        print("FALLO:")
+        for problema in problemas:
+            print(f"  - {problema}")
+        sys.exit(1)
+    print("OK: ningún horario por encima de su aforo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# tests/conftest.py
+# Los tests arrancan la aplicación (lifespan incluido) sobre una base de
+# datos temporal con la semilla de init_db. La configuración se lee al
+# importar app.settings, así que las variables van antes de importar app.
+#
+# La fixture client está parametrizada con las dos pilas de la API: cada test
+# que la usa se ejecuta una vez con app/routers/api y otra con api_async.
+# Las dos comparten la base de datos de la sesión de pytest; cada test crea
+# los datos que modifica.
+#
+# Uso (desde la raíz del proyecto):
+#   python -m pytest -q
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# StaticFiles monta app/static con una ruta relativa
+os.chdir(ROOT)
+
+TMP_DIR = tempfile.mkdtemp(prefix="cartelera_tests_")
+os.environ["CARTELERA_ENV"] = "test"
+os.environ["CARTELERA_DATABASE_URL"] = f"sqlite:///{Path(TMP_DIR) / 'cartelera_test.db'}"
+os.environ["CARTELERA_DB_ECHO"] = "false"
+
+import anyio  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import crear_app  # noqa: E402
+
+
+@pytest.fixture(scope="session", params=["sync", "async"])
+def client(request):
+    with TestClient(crear_app(request.param)) as c:
+        yield c
+
+
+@pytest.fixture
+def asgi(client):
+    """
+    GET directo a la aplicación ASGI del client: devuelve (cabeceras, trozos
+    del cuerpo) tal como los envía. TestClient junta el cuerpo en uno solo, así
+    que no sirve para comprobar que una respuesta sale por trozos.
+    """
+    def get(ruta: str, query: str = "", cabeceras: dict | None = None):
+        mensajes = []
+        pedida = False
+
+        async def receive():
+            nonlocal pedida
+            if pedida:
+                await anyio.sleep_forever()  # el cliente no se desconecta
+            pedida = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(mensaje):
+            mensajes.append(mensaje)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": ruta, "raw_path": ruta.encode(),
+            "query_string": query.encode(), "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (cabeceras or {}).items()],
+            "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        client.portal.call(client.app, scope, receive, send)
+        inicio = next(m for m in mensajes if m["type"] == "http.response.start")
+        headers = {k.decode(): v.decode() for k, v in inicio["headers"]}
+        trozos = [m["body"] for m in mensajes if m["type"] == "http.response.body" and m.get("body")]
+        return inicio["status"], headers, trozos
+
+    return get
@@ -0,0 +1,49 @@
+# tests/test_aforo.py
+# Mover un horario a una sala más pequeña o reducir la capacidad de una sala
+# no puede dejar menos butacas que las ya vendidas o reservadas: 409 y no se
+# cambia nada.
+
+from uuid import uuid4
+
+import pytest
+
+
+def _horario(client, sala_id, vendidas):
+    r = client.post("/api/horarios", json={"pelicula_id": 1, "sala_id": sala_id, "hora": "12:15", "disponible": True})
+    horario = r.json()["id"]
+    assert client.post("/api/reservas", json={"horario_id": horario, "cantidad": vendidas}).status_code == 201
+    return horario
+
+
+@pytest.mark.parametrize("metodo", ["put", "patch"])
+def test_mover_horario_a_sala_pequena(client, metodo):
+    # semilla: sala 1 de 20 butacas, sala 2 de 40, sala 3 de 25
+    horario = _horario(client, 2, 22)
+    cuerpo = {"pelicula_id": 1, "sala_id": 1, "hora": "12:15", "disponible": True}
+    if metodo == "patch":
+        cuerpo = {"sala_id": 1}
+
+    r = client.request(metodo, f"/api/horarios/{horario}", json=cuerpo)
+    assert r.status_code == 409
+    assert client.get(f"/api/horarios/{horario}").json()["sala_id"] == 2
+
+    cuerpo["sala_id"] = 3
+    r = client.request(metodo, f"/api/horarios/{horario}", json=cuerpo)
+    assert r.status_code == 200
+    assert r.json()["sala_id"] == 3
+
+
+def test_reducir_capacidad(client):
+    sala = client.post("/api/salas/salas", json={
+        "nombre": f"Sala {uuid4().hex[:8]}", "capacidad": 30, "tipo": "2D", "precio": 7.5,
+    }).json()
+    _horario(client, sala["id"], 10)
+    ruta = f"/api/salas/salas/{sala['id']}"
+
+    r = client.patch(ruta, json={**sala, "capacidad": 9})
+    assert r.status_code == 409
+    assert client.get(ruta).json()["capacidad"] == 30
+
+    r = client.patch(ruta, json={**sala, "capacidad": 10})
+    assert r.status_code == 200
+    assert r.json()["capacidad"] == 10
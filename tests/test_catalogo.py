@@ -0,0 +1,38 @@
+# tests/test_catalogo.py
+# La caché del catálogo es de cada proceso: una escritura hecha por otro worker
+# no la invalida. La clave lleva la versión de cada tabla, así que en cuanto
+# cambia el ETag la respuesta sale de la base de datos y no de la caché.
+
+import sqlite3
+from uuid import uuid4
+
+from app.settings import settings
+
+
+def _otro_worker(sql: str, *parametros) -> None:
+    # conexión aparte: los triggers de tabla_versiones se disparan, pero no
+    # pasa por los eventos de Session que invalidan la caché de este proceso
+    conexion = sqlite3.connect(settings.database_url.removeprefix("sqlite:///"))
+    with conexion:
+        conexion.execute(sql, parametros)
+    conexion.close()
+
+
+def test_escritura_de_otro_worker(client):
+    nombre = f"Género {uuid4().hex[:8]}"
+    id = client.post("/api/genres", json={"name_genre": nombre}).json()["id"]
+
+    detalle = client.get(f"/api/genres/{id}")
+    listado = client.get("/api/genres", params={"limit": 1000})
+    assert detalle.json()["name_genre"] == nombre
+
+    _otro_worker("UPDATE genres SET name_genre = ? WHERE id = ?", f"{nombre} bis", id)
+
+    r = client.get(f"/api/genres/{id}", headers={"If-None-Match": detalle.headers["etag"]})
+    assert r.status_code == 200
+    assert r.headers["etag"] != detalle.headers["etag"]
+    assert r.json()["name_genre"] == f"{nombre} bis"
+
+    r = client.get("/api/genres", params={"limit": 1000})
+    assert r.headers["etag"] != listado.headers["etag"]
+    assert next(g for g in r.json() if g["id"] == id)["name_genre"] == f"{nombre} bis"
@@ -0,0 +1,28 @@
+# tests/test_errores.py
+# Un IntegrityError que no es un título repetido se registra y sale como un
+# 500 en JSON, igual en las dos pilas de la API.
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.main import crear_app
+
+
+@pytest.mark.parametrize("pila", ["sync", "async"])
+def test_error_de_integridad(pila, caplog):
+    app = crear_app(pila)
+
+    @app.get("/_integridad")
+    def integridad():
+        raise IntegrityError("INSERT INTO horarios ...", (), Exception("FOREIGN KEY constraint failed"))
+
+    # sin with: no hace falta el lifespan
+    with caplog.at_level(logging.ERROR, logger="app.main"):
+        r = TestClient(app).get("/_integridad")
+
+    assert r.status_code == 500
+    assert r.json() == {"detail": "Error de integridad en la base de datos"}
+    assert "GET /_integridad" in caplog.text
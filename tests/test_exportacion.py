@@ -0,0 +1,68 @@
+# tests/test_exportacion.py
+# GET /api/peliculas/export/{csv,json}: la respuesta sale por trozos (un lote
+# de películas cada uno) y, con Accept-Encoding: gzip, comprimida al vuelo.
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from app.services import exportacion
+
+
+@pytest.fixture
+def lotes_de_dos(monkeypatch):
+    # el catálogo de la semilla son unas pocas películas: lotes de 2 para tener varios
+    monkeypatch.setattr(exportacion, "TAMANO_LOTE", 2)
+
+
+def _ids_catalogo(client):
+    return [p["id"] for p in client.get("/api/peliculas", params={"limit": 100}).json()]
+
+
+def test_csv_por_trozos(client, asgi, lotes_de_dos):
+    status, cabeceras, trozos = asgi("/api/peliculas/export/csv")
+    assert status == 200
+    assert cabeceras["content-type"].startswith("text/csv")
+    assert "content-length" not in cabeceras
+    ids = _ids_catalogo(client)
+    # cabecera + un trozo por lote
+    assert len(trozos) == 1 + (len(ids) + 1) // 2
+
+    filas = list(csv.DictReader(io.StringIO(b"".join(trozos).decode())))
+    assert [int(f["id"]) for f in filas] == ids
+    assert list(filas[0]) == exportacion.CAMPOS_CSV
+
+
+def test_json_por_trozos(client, asgi, lotes_de_dos):
+    status, cabeceras, trozos = asgi("/api/peliculas/export/json")
+    assert status == 200
+    assert len(trozos) > 2
+    peliculas = json.loads(b"".join(trozos))
+    assert [p["id"] for p in peliculas] == _ids_catalogo(client)
+    assert "genero" in peliculas[0] and "imagen" in peliculas[0]
+
+
+@pytest.mark.parametrize("formato", ["csv", "json"])
+def test_gzip(client, asgi, lotes_de_dos, formato):
+    _, _, sin_comprimir = asgi(f"/api/peliculas/export/{formato}")
+    status, cabeceras, trozos = asgi(f"/api/peliculas/export/{formato}", cabeceras={"Accept-Encoding": "gzip, br"})
+    assert status == 200
+    assert cabeceras["content-encoding"] == "gzip"
+    assert cabeceras["vary"] == "Accept-Encoding"
+    assert "content-length" not in cabeceras
+    assert gzip.decompress(b"".join(trozos)) == b"".join(sin_comprimir)
+
+
+def test_sin_gzip_con_q0(asgi):
+    _, cabeceras, _ = asgi("/api/peliculas/export/csv", cabeceras={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in cabeceras
+
+
+def test_filtros(client):
+    r = client.get("/api/peliculas/export/json", params={"q": "FUTURO", "disponible": "true"})
+    assert r.status_code == 200
+    assert [p["titulo"] for p in r.json()] == ["Regreso al Futuro"]
+    assert client.get("/api/peliculas/export/json", params={"genero_id": 9999}).json() == []
@@ -0,0 +1,85 @@
+# tests/test_importacion.py
+# POST /api/peliculas/import: inserta las películas nuevas, actualiza por título
+# normalizado las que ya existen, crea los géneros que faltan y devuelve los
+# errores por fila sin dejar de importar el resto. Los ficheros subidos
+# (/import/csv y /import/json) se importan enteros o, si están mal formados, nada.
+
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.services import importacion
+
+
+def _peliculas(client):
+    return {p["titulo"]: p for p in client.get("/api/peliculas", params={"limit": 1000}).json()}
+
+
+def test_importar(client):
+    sufijo = uuid4().hex[:8]
+    titulo = f"Importada {sufijo}"
+    genero = f"Género {sufijo}"
+    r = client.post("/api/peliculas/import", json=[
+        {"titulo": titulo, "duracion": 100, "genero_nombre": genero},
+        # mismo título normalizado: actualiza la fila anterior
+        {"titulo": f"  IMPORTADA {sufijo}", "duracion": 120, "genero_nombre": genero.upper(),
+         "disponible": "No"},
+        {"titulo": "", "duracion": 100, "genero_id": 1},
+        {"titulo": f"Sin género {sufijo}", "duracion": 90, "genero_id": 999999},
+        "no es un objeto",
+    ])
+    assert r.status_code == 200
+    resumen = r.json()
+    assert (resumen["insertadas"], resumen["actualizadas"]) == (1, 1)
+    assert [e["fila"] for e in resumen["errores"]] == [3, 4, 5]
+
+    pelicula = _peliculas(client)[f"IMPORTADA {sufijo}"]
+    assert pelicula["duracion"] == 120
+    assert pelicula["disponible"] is False
+    assert pelicula["genero"]["name_genre"] == genero
+    assert f"Sin género {sufijo}" not in _peliculas(client)
+
+
+def test_importar_actualiza_existentes(client):
+    existente = client.get("/api/peliculas/1").json()
+    r = client.post("/api/peliculas/import", json=[
+        {"titulo": existente["titulo"].lower(), "duracion": existente["duracion"],
+         "genero_id": existente["genero_id"], "disponible": "Sí"},
+    ])
+    assert r.json() == {"insertadas": 0, "actualizadas": 1, "errores": []}
+    assert client.get("/api/peliculas/1").json()["id"] == 1
+
+
+@pytest.fixture
+def lotes_pequenos(monkeypatch):
+    # lotes de 2 filas y lecturas de 64 caracteres: el fichero se procesa en varios pasos
+    monkeypatch.setattr(importacion, "TAMANO_LOTE", 2)
+    monkeypatch.setattr(importacion, "TAMANO_LECTURA", 64)
+
+
+def test_importar_csv_exportado(client, lotes_pequenos):
+    # el CSV de /export/csv se puede volver a importar: todo son actualizaciones
+    exportado = client.get("/api/peliculas/export/csv").content
+    r = client.post("/api/peliculas/import/csv", files={"file": ("catalogo.csv", exportado, "text/csv")})
+    assert r.status_code == 200
+    assert r.json() == {"insertadas": 0, "actualizadas": exportado.count(b"\n") - 1, "errores": []}
+
+
+def test_importar_json_mal_formado(client, lotes_pequenos):
+    sufijo = uuid4().hex[:8]
+    validas = [{"titulo": f"JSON {sufijo} {i}", "duracion": 90, "genero_id": 1} for i in range(5)]
+    # el error llega después de haber escrito dos lotes
+    contenido = json.dumps(validas)[:-1] + ', {"titulo": "Cortada", "duracion": ]'
+    r = client.post("/api/peliculas/import/json",
+                    files={"file": ("catalogo.json", contenido.encode(), "application/json")})
+    assert r.status_code == 400
+    assert "JSON" in r.json()["detail"]
+    titulos = _peliculas(client)
+    assert not any(v["titulo"] in titulos for v in validas)
+
+
+def test_importar_csv_no_utf8(client):
+    r = client.post("/api/peliculas/import/csv",
+                    files={"file": ("catalogo.csv", "titulo,duracion\nAñoranza,90\n".encode("latin-1"), "text/csv")})
+    assert r.status_code == 400
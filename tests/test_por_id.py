@@ -0,0 +1,21 @@
+# tests/test_por_id.py
+# Las consultas por id (lambda_stmt de app/queries.py) no se quedan con los
+# parámetros de la primera llamada: cada petición devuelve la fila que pide.
+
+
+def test_horarios_por_id(client):
+    for id in (1, 2, 1):
+        assert client.get(f"/api/horarios/{id}").json()["id"] == id
+
+
+def test_ventas_por_id(client):
+    for id in (1, 2, 1):
+        assert client.get(f"/api/ventas/{id}").json()["id"] == id
+
+
+def test_peliculas_patch_por_id(client):
+    # PATCH carga la película por id antes y después del commit
+    for id in (1, 2, 1):
+        r = client.patch(f"/api/peliculas/{id}", json={"disponible": True})
+        assert r.status_code == 200
+        assert r.json()["id"] == id
@@ -0,0 +1,74 @@
+# tests/test_reservas.py
+# Las reservas cambian la disponibilidad de su horario: crear una o que caduque
+# cambia el ETag del plano de butacas y de la cartelera, y la cartelera las
+# cuenta como vendidas (migración v0010).
+
+import dataclasses
+import time
+
+import pytest
+
+from app.services import reservas
+
+
+@pytest.fixture
+def horario(client):
+    # sala 2 de la semilla: 5 filas x 8 butacas
+    r = client.post("/api/horarios", json={"pelicula_id": 1, "sala_id": 2, "hora": "23:45", "disponible": True})
+    return r.json()["id"]
+
+
+@pytest.fixture
+def caducan_pronto(monkeypatch):
+    monkeypatch.setattr(reservas, "settings", dataclasses.replace(reservas.settings, reserva_segundos=0.5))
+
+
+def _get(client, ruta, etag=None):
+    return client.get(ruta, params={"limit": 1000}, headers={"If-None-Match": etag} if etag else {})
+
+
+def _vendidas(client, horario):
+    filas = _get(client, "/api/cartelera").json()
+    return next(f["vendidas"] for f in filas if f["horario_id"] == horario)
+
+
+def test_reserva_cambia_etag(client, horario):
+    plano = f"/api/horarios/{horario}/asientos"
+    etag_plano = _get(client, plano).headers["etag"]
+    etag_cartelera = _get(client, "/api/cartelera").headers["etag"]
+    assert _get(client, plano, etag_plano).status_code == 304
+
+    r = client.post("/api/reservas", json={"horario_id": horario, "asientos": ["A1", "A2"]})
+    assert r.status_code == 201
+    reserva = r.json()["id"]
+
+    r = _get(client, plano, etag_plano)
+    assert r.status_code == 200
+    assert r.json()["plano"][0].startswith("XX")
+    assert _get(client, "/api/cartelera", etag_cartelera).status_code == 200
+    assert _vendidas(client, horario) == 2
+
+    # al confirmarla, la venta ocupa el sitio de la reserva en la cartelera
+    assert client.post(f"/api/reservas/{reserva}/confirmar", json={}).status_code == 201
+    assert _vendidas(client, horario) == 2
+
+
+def test_caducar_cambia_etag(client, horario, caducan_pronto):
+    plano = f"/api/horarios/{horario}/asientos"
+    r = client.post("/api/reservas", json={"horario_id": horario, "asientos": ["B1"]})
+    assert r.status_code == 201
+    reserva = r.json()["id"]
+    etag_plano = _get(client, plano).headers["etag"]
+    etag_cartelera = _get(client, "/api/cartelera").headers["etag"]
+    assert _vendidas(client, horario) == 1
+
+    limite = time.monotonic() + 5
+    while client.get(f"/api/reservas/{reserva}").status_code != 404:
+        assert time.monotonic() < limite, "la reserva no ha caducado"
+        time.sleep(0.05)
+
+    r = _get(client, plano, etag_plano)
+    assert r.status_code == 200
+    assert "X" not in r.json()["plano"][1]
+    assert _get(client, "/api/cartelera", etag_cartelera).status_code == 200
+    assert _vendidas(client, horario) == 0
@@ -0,0 +1,40 @@
+# tests/test_salas.py
+# PATCH /api/salas/salas/{id} cambia sólo los campos enviados. El plano de
+# butacas y la capacidad se comprueban con los valores que quedan en la sala,
+# no con los que faltan en el cuerpo.
+
+from uuid import uuid4
+
+import pytest
+
+
+@pytest.fixture
+def sala(client):
+    # plano de 3 x 4 butacas con dos de ellas vendidas
+    sala = client.post("/api/salas/salas", json={
+        "nombre": f"Sala {uuid4().hex[:8]}", "capacidad": 12, "tipo": "2D", "precio": 7.5,
+        "filas": 3, "butacas_por_fila": 4,
+    }).json()
+    horario = client.post("/api/horarios", json={
+        "pelicula_id": 1, "sala_id": sala["id"], "hora": "18:30", "disponible": True,
+    }).json()["id"]
+    assert client.post(f"/api/horarios/{horario}/allocate", params={"n": 2}).status_code == 201
+    return sala
+
+
+def test_patch_solo_precio(client, sala):
+    ruta = f"/api/salas/salas/{sala['id']}"
+    r = client.patch(ruta, json={"precio": 9.0})
+    assert r.status_code == 200
+    assert r.json() == {**sala, "precio": 9.0}
+
+
+def test_patch_solo_capacidad(client, sala):
+    ruta = f"/api/salas/salas/{sala['id']}"
+    r = client.patch(ruta, json={"capacidad": 20})
+    assert r.status_code == 422
+    assert client.get(ruta).json() == sala
+
+    # quitar el plano de una sala con butacas vendidas sigue sin poderse
+    r = client.patch(ruta, json={"filas": None, "butacas_por_fila": None, "capacidad": 20})
+    assert r.status_code == 409
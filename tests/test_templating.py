@@ -0,0 +1,34 @@
+# tests/test_templating.py
+# render_cacheado lee las versiones y los datos en la misma transacción: una
+# escritura de otro worker entre las dos lecturas no entra en el HTML guardado
+# con las versiones de antes.
+
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from app import database
+from tests.test_catalogo import _otro_worker
+
+
+def test_versiones_y_datos_de_la_misma_lectura(client):
+    nombre = f"Género {uuid4().hex[:8]}"
+    id = client.post("/api/genres", json={"name_genre": nombre}).json()["id"]
+
+    # el otro worker escribe justo después de leer tabla_versiones
+    escrito = []
+
+    def escribe(conn, cursor, sql, parametros, contexto, executemany):
+        if "FROM tabla_versiones" in sql and not escrito:
+            escrito.append(sql)
+            _otro_worker("UPDATE genres SET name_genre = ? WHERE id = ?", f"{nombre} bis", id)
+
+    event.listen(database.read_engine, "after_cursor_execute", escribe)
+    try:
+        r = client.get("/genres")
+    finally:
+        event.remove(database.read_engine, "after_cursor_execute", escribe)
+
+    assert escrito
+    assert nombre in r.text and f"{nombre} bis" not in r.text
+    assert f"{nombre} bis" in client.get("/genres").text